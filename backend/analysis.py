@@ -0,0 +1,232 @@
+"""CPU-bound resume analyzers and the process pool that runs them.
+
+These functions are pure (no database, no network) so they can be shipped to
+worker processes; keep them importable without pulling in ``main``.
+"""
+import asyncio
+import hashlib
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from skills import TECH, SOFT, ACTION, CORE_TECH_SKILLS, TAXONOMY_DIGEST, display_name, group_skills
+
+# Bump whenever analyzer output changes so memoized results are recomputed;
+# taxonomy edits (skills, aliases, display names) do that on their own.
+ANALYZER_VERSION = f"3-{TAXONOMY_DIGEST}"
+
+ANALYSIS_WORKERS = int(os.getenv("ANALYSIS_WORKERS", "0")) or os.cpu_count() or 1
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+def analyze_actual_resume(resume_text: str, target_role: str = None):
+    """Analyze ACTUAL resume content without AI - real-time analysis"""
+    original_text = resume_text
+    resume_text = resume_text.lower()
+    
+    # Extract actual information from the resume (one pass over the shared skill dictionary)
+    found = group_skills(original_text)
+    skills_found = [display_name(skill) for skill in found[TECH]]
+    
+    # Count experience mentions
+    experience_years = 0
+    if 'years' in resume_text or 'year' in resume_text:
+        years_match = re.findall(r'(\d+)\s*(?:years?|yrs?)', resume_text)
+        if years_match:
+            experience_years = max([int(y) for y in years_match])
+    
+    # Check for quantifiable achievements
+    has_metrics = bool(re.findall(r'\d+%|\d+x|increased|decreased|improved|reduced', resume_text))
+    
+    # Check for action verbs
+    action_verb_count = len(found[ACTION])
+    
+    # Calculate score based on actual content
+    score = 60  # Base score
+    if len(skills_found) > 5: score += 10
+    if len(skills_found) > 10: score += 5
+    if experience_years > 0: score += 5
+    if has_metrics: score += 10
+    if action_verb_count > 3: score += 10
+    
+    score = min(score, 95)  # Cap at 95
+    
+    # Generate specific feedback based on actual resume
+    strengths = []
+    if skills_found:
+        strengths.append(f"Strong technical skills: {', '.join(skills_found[:5])}")
+    if has_metrics:
+        strengths.append("Includes quantifiable achievements")
+    if action_verb_count > 3:
+        strengths.append("Uses strong action verbs effectively")
+    
+    improvements = []
+    if len(skills_found) < 5:
+        improvements.append("Add more technical skills relevant to your target role")
+    if not has_metrics:
+        improvements.append("Include quantifiable achievements (e.g., 'Increased efficiency by 40%')")
+    if action_verb_count < 3:
+        improvements.append("Use more action verbs (developed, created, implemented, etc.)")
+    if len(resume_text) < 500:
+        improvements.append("Expand your resume with more detailed descriptions")
+    
+    keywords = list(set(skills_found))[:10]
+    missing_keywords = []
+    if target_role:
+        role_lower = target_role.lower()
+        if 'developer' in role_lower or 'engineer' in role_lower:
+            missing_keywords = [s for s in ['Git', 'API', 'Testing', 'Agile'] if s.lower() not in found[TECH]]
+    
+    return {
+        "score": score,
+        "strengths": strengths if strengths else ["Resume uploaded successfully"],
+        "improvements": improvements if improvements else ["Resume looks good overall"],
+        "keywords": keywords,
+        "missing_keywords": missing_keywords[:5],
+        "suggestions": [
+            "Tailor your resume to match the job description",
+            "Keep formatting simple and ATS-friendly",
+            "Proofread for grammar and spelling errors"
+        ]
+    }
+
+def get_fallback_analysis(resume_text: str, job_description: str = None, target_role: str = None):
+    """Intelligent fallback analysis when AI is unavailable"""
+    # Find keywords (single pass over the shared skill dictionary)
+    found = group_skills(resume_text)
+    found_tech = found[TECH]
+    missing_tech = [kw for kw in CORE_TECH_SKILLS if kw not in found_tech]
+    found_soft = found[SOFT]
+    found_actions = found[ACTION]
+    
+    # Check for numbers/metrics
+    has_numbers = any(char.isdigit() for char in resume_text)
+    has_percentages = '%' in resume_text
+    
+    # Calculate intelligent score
+    score = 5.0
+    if len(found_tech) > 5: score += 1.5
+    if len(found_soft) > 2: score += 1.0
+    if len(found_actions) > 3: score += 1.0
+    if has_numbers: score += 0.5
+    if has_percentages: score += 1.0
+    if len(resume_text) > 500: score += 0.5
+    score = min(10, round(score, 1))
+    
+    # Build dynamic strengths
+    strengths = []
+    if len(found_tech) > 5:
+        strengths.append(f"Strong technical skill set with {len(found_tech)} technologies mentioned")
+    if len(found_actions) > 3:
+        strengths.append("Good use of action verbs to describe accomplishments")
+    if has_percentages:
+        strengths.append("Includes quantifiable achievements with metrics")
+    if len(found_soft) > 2:
+        strengths.append("Demonstrates important soft skills")
+    if len(resume_text) > 800:
+        strengths.append("Comprehensive and detailed experience description")
+    
+    # Ensure at least 3 strengths
+    if len(strengths) < 3:
+        strengths.extend([
+            "Professional presentation",
+            "Clear structure and organization",
+            "Relevant experience highlighted"
+        ])
+    
+    # Build dynamic improvements
+    improvements = []
+    if not has_percentages:
+        improvements.append("Add measurable achievements with percentages (e.g., 'Increased efficiency by 40%')")
+    if len(found_actions) < 3:
+        improvements.append("Use more strong action verbs (led, achieved, implemented, optimized)")
+    if len(found_soft) < 2:
+        improvements.append("Include soft skills like leadership, communication, and teamwork")
+    if len(found_tech) < 5:
+        improvements.append("Add more relevant technical skills and tools")
+    improvements.append("Include a professional summary at the top highlighting key achievements")
+    
+    # Detect errors
+    errors = []
+    if len(resume_text) < 200:
+        errors.append("Resume is too short (less than 200 characters)")
+    if not has_numbers:
+        errors.append("Missing quantifiable achievements (add numbers/metrics)")
+    if len(found_actions) < 2:
+        errors.append("Weak action verbs - use stronger verbs like 'led', 'achieved', 'implemented'")
+    
+    role_fit_score = score
+    if target_role:
+        role_lower = target_role.lower()
+        if 'developer' in role_lower or 'engineer' in role_lower:
+            if len(found_tech) < 5:
+                role_fit_score -= 2
+        role_fit = f"{role_fit_score}/10 - {'Strong' if role_fit_score >= 7 else 'Moderate'} fit for {target_role}"
+    else:
+        role_fit = f"{score}/10 - General resume quality assessment"
+    
+    return {
+        "score": score,
+        "errors": " | ".join(errors) if errors else "No major errors detected",
+        "strengths": strengths[:5],
+        "improvements": improvements[:5],
+        "keywords_found": [display_name(kw) for kw in found_tech[:15]],
+        "missing_keywords": [display_name(kw) for kw in missing_tech[:10]],
+        "role_fit": role_fit,
+        "target_role": target_role or "General",
+        "skill_gaps": [
+            "Consider adding cloud technologies (AWS, Azure, GCP)",
+            "Include modern DevOps tools (Docker, Kubernetes, CI/CD)",
+            "Add database experience (SQL, NoSQL)",
+            "Mention version control and collaboration tools"
+        ] if job_description else [],
+        "action_verbs": [
+            "Replace 'worked on' with 'led', 'spearheaded', or 'drove'",
+            "Replace 'helped' with 'facilitated', 'enabled', or 'supported'",
+            "Replace 'did' with 'executed', 'implemented', or 'delivered'",
+            "Replace 'made' with 'created', 'developed', or 'designed'"
+        ],
+        "formatting_tips": [
+            "Ensure consistent bullet point formatting throughout",
+            "Use reverse chronological order for work experience",
+            "Keep resume to 1-2 pages maximum",
+            "Use professional fonts (Arial, Calibri, Times New Roman)",
+            "Include clear section headers (Experience, Education, Skills)"
+        ],
+        "achievement_suggestions": [
+            "Add metrics to project outcomes (e.g., 'Reduced load time by 50%')",
+            "Include team size if you led projects (e.g., 'Led team of 5 developers')",
+            "Mention awards, recognition, or certifications received",
+            "Quantify impact with numbers (users served, revenue generated, time saved)"
+        ],
+        "full_analysis": f"Smart analysis complete! Found {len(found_tech)} technical skills and {len(found_actions)} action verbs. Score: {score}/10"
+    }
+
+def analysis_content_hash(resume_text: str, job_description: str = None, target_role: str = None, use_actual: bool = True):
+    """Key for memoized analyses: every input that can change the result."""
+    parts = [resume_text, job_description or "", target_role or "", "actual" if use_actual else "fallback"]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+def score_resume(resume_text: str, job_description: str = None, target_role: str = None, use_actual: bool = True):
+    """Entry point for pool workers: same analyzer choice as ``/ai/analyze-resume``."""
+    if use_actual:
+        return analyze_actual_resume(resume_text, target_role)
+    return get_fallback_analysis(resume_text, job_description, target_role)
+
+def start_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=ANALYSIS_WORKERS)
+    return _pool
+
+def shutdown_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+def run_in_pool(func, *args):
+    """Schedule ``func(*args)`` on the analysis pool and return an awaitable future."""
+    loop = asyncio.get_running_loop()
+    return loop.run_in_executor(start_pool(), func, *args)
@@ -0,0 +1,133 @@
+"""Search-as-you-type suggestions over skill names, project titles and JD keywords.
+
+Suggestions come from a per-user sorted array of keys (each phrase, and each
+phrase from every later word on, so "oper" finds "Kubernetes operator"),
+searched with ``bisect``. The array is derived from the user's search index
+and rebuilt when that index changes (its ``generation`` and ``version``). A
+small per-user LRU of recent prefixes answers repeated prefixes directly and
+refines longer ones from a shorter cached result.
+"""
+import os
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from analysis import run_in_pool
+from cache import TTLCache
+from search_index import JOB, PROJECT, SKILL, UserSearchIndex, search_index
+from skills import display_name, extract_skills, normalize_term
+
+AUTOCOMPLETE_USERS = int(os.getenv("AUTOCOMPLETE_USERS", "256"))
+AUTOCOMPLETE_TTL = int(os.getenv("AUTOCOMPLETE_TTL", "600"))
+RECENT_PREFIXES = 64
+MAX_CANDIDATES = 200  # a cached prefix holding more matches than this can't be refined
+POOL_THRESHOLD = 50  # extract JD keywords on the analysis pool when this many are new
+
+KEYWORD = "keyword"
+KIND_WEIGHTS = {SKILL: 3.0, PROJECT: 2.0, KEYWORD: 1.0}
+
+
+class Suggestion(NamedTuple):
+    text: str
+    kind: str
+    weight: float
+    keys: Tuple[str, ...]
+
+
+def _keys(text: str) -> Tuple[str, ...]:
+    words = normalize_term(text).split(" ")
+    return tuple(" ".join(words[i:]) for i in range(len(words)) if words[i])
+
+
+def extract_keywords(descriptions: Sequence[str]) -> List[List[str]]:
+    return [extract_skills(description) for description in descriptions]
+
+
+class UserSuggestions:
+    def __init__(self, stamp: Tuple[int, int], suggestions: List[Suggestion], job_keywords: Dict[str, List[str]]):
+        self.stamp = stamp  # (generation, version) of the index this was built from
+        self.job_keywords = job_keywords  # search doc key -> keywords, reused by the next rebuild
+        self._suggestions = suggestions
+        pairs = sorted((key, i) for i, s in enumerate(suggestions) for key in s.keys)
+        self._keys = [key for key, _ in pairs]
+        self._rows = [i for _, i in pairs]
+        self._recent: "OrderedDict[str, Tuple[List[Suggestion], bool]]" = OrderedDict()
+
+    def _matches(self, prefix: str) -> Tuple[List[Suggestion], bool]:
+        """Suggestions with a key starting with ``prefix``, and whether that list is complete."""
+        cached = self._recent.get(prefix)
+        if cached is not None:
+            self._recent.move_to_end(prefix)
+            return cached
+        for n in range(len(prefix) - 1, 0, -1):
+            shorter = self._recent.get(prefix[:n])
+            if shorter is not None and shorter[1]:
+                result = ([s for s in shorter[0] if any(k.startswith(prefix) for k in s.keys)], True)
+                break
+        else:
+            seen, found = set(), []
+            i = bisect_left(self._keys, prefix)
+            while i < len(self._keys) and self._keys[i].startswith(prefix) and len(found) <= MAX_CANDIDATES:
+                row = self._rows[i]
+                if row not in seen:
+                    seen.add(row)
+                    found.append(self._suggestions[row])
+                i += 1
+            result = (found[:MAX_CANDIDATES], len(found) <= MAX_CANDIDATES)
+        self._recent[prefix] = result
+        while len(self._recent) > RECENT_PREFIXES:
+            self._recent.popitem(last=False)
+        return result
+
+    def complete(self, prefix: str, limit: int) -> List[dict]:
+        prefix = normalize_term(prefix)
+        if not prefix:
+            return []
+        matches, _ = self._matches(prefix)
+        # Phrases that start with the prefix beat mid-phrase hits; then weight, then shorter text.
+        ranked = sorted(matches, key=lambda s: (not s.keys[0].startswith(prefix), -s.weight, len(s.text), s.text))
+        return [{"text": s.text, "type": s.kind} for s in ranked[:limit]]
+
+
+class Autocomplete:
+    def __init__(self, maxsize: int = AUTOCOMPLETE_USERS, ttl: int = AUTOCOMPLETE_TTL):
+        self._users = TTLCache(maxsize, ttl)
+
+    async def suggest(self, user_email: str, prefix: str, limit: int) -> List[dict]:
+        index = await search_index.get(user_email)
+        suggestions: Optional[UserSuggestions] = self._users.get(user_email)
+        if suggestions is None or suggestions.stamp != (index.generation, index.version):
+            suggestions = await self._build(index, suggestions)
+            self._users.set(user_email, suggestions)
+        return suggestions.complete(prefix, limit)
+
+    async def _build(self, index: UserSearchIndex, previous: Optional[UserSuggestions]) -> UserSuggestions:
+        stamp = (index.generation, index.version)
+        known = previous.job_keywords if previous else {}
+        jobs = {key: doc.fields["description"] for key, doc in index.docs.items() if doc.kind == JOB}
+        job_keywords = {key: known[key] for key in jobs if key in known}
+        new = [key for key in jobs if key not in job_keywords]
+        if new:
+            texts = [jobs[key] for key in new]
+            extracted = await run_in_pool(extract_keywords, texts) if len(new) >= POOL_THRESHOLD else extract_keywords(texts)
+            job_keywords.update(zip(new, extracted))
+
+        weights: Dict[Tuple[str, str], float] = {}
+        for doc in index.docs.values():
+            if doc.kind == SKILL:
+                weights[(doc.payload["name"], SKILL)] = KIND_WEIGHTS[SKILL]
+            elif doc.kind == PROJECT and doc.payload["title"]:
+                weights[(doc.payload["title"], PROJECT)] = KIND_WEIGHTS[PROJECT]
+        taken = {normalize_term(text) for text, _ in weights}
+        for keywords in job_keywords.values():
+            for keyword in keywords:
+                if normalize_term(display_name(keyword)) in taken:
+                    continue  # already suggested as one of the user's skills
+                # Each JD mentioning a keyword adds a little, so common requirements rank first.
+                key = (display_name(keyword), KEYWORD)
+                weights[key] = weights.get(key, KIND_WEIGHTS[KEYWORD]) + 0.01
+        suggestions = [Suggestion(text, kind, weight, _keys(text)) for (text, kind), weight in weights.items() if _keys(text)]
+        return UserSuggestions(stamp, suggestions, job_keywords)
+
+
+autocomplete = Autocomplete()
@@ -0,0 +1,149 @@
+"""End-to-end load test of the main endpoints against an in-memory Mongo stand-in.
+
+The app runs in-process (httpx ``ASGITransport``, startup/shutdown included)
+on ``mongomock_motor`` with the fake LLM backend, so it needs no database,
+network or API key. Users are registered and seeded with an uploaded resume
+and a few job analyses, then each scenario is driven by ``--concurrency``
+clients for ``--requests`` requests. Client and app share one event loop, so
+numbers are for comparing runs of this benchmark, not capacity planning.
+
+Needs ``pip install -r benchmarks/requirements.txt``.
+
+Usage (from backend/):
+    python benchmarks/bench_endpoints.py [--requests 300] [--concurrency 16] [--only search,skills] [--save out.json]
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+_data_dir = tempfile.mkdtemp(prefix="smartcv-bench-")
+for key, value in {
+    "MONGO_URI": "mongodb://localhost:27017/bench",
+    "JWT_SECRET": "bench-secret",
+    "GEMINI_API_KEY": "",
+    "LLM_BACKEND": "fake",
+    "LLM_FAKE_LATENCY": "0",
+    "LLM_RATE_PER_MINUTE": "0",  # the provider rate limit would dominate every LLM-backed scenario
+    "BCRYPT_ROUNDS": "4",
+    "LOG_SAMPLE_RATE": "0",
+    "INDEX_CHECK": "false",
+    "PICTURE_STORE_DIR": os.path.join(_data_dir, "pictures"),
+    "JOB_SPOOL_DIR": os.path.join(_data_dir, "jobs"),
+    "PROFILE_DIR": os.path.join(_data_dir, "profiles"),
+}.items():
+    os.environ.setdefault(key, value)
+
+import httpx  # noqa: E402
+from mongomock_motor import AsyncMongoMockClient  # noqa: E402
+
+import corpus  # noqa: E402  (puts backend/ on sys.path)
+from common import add_result_arguments, report, row  # noqa: E402
+
+import main  # noqa: E402
+
+JOBS_PER_USER = 5
+
+
+class User:
+    def __init__(self, email: str, headers: dict):
+        self.email = email
+        self.headers = headers
+
+
+def scenarios(rng: random.Random, size: str):
+    """name -> function(user) returning (method, path, request kwargs)."""
+    def upload(user):
+        text = corpus.resume_text(rng, size).encode("utf-8")
+        return "POST", "/upload-resume", {"files": {"file": ("resume.txt", text, "text/plain")}}
+
+    return {
+        "GET /skills": lambda user: ("GET", "/skills", {}),
+        "GET /job-analyses": lambda user: ("GET", "/job-analyses", {}),
+        "GET /job-analyses/ranked": lambda user: ("GET", "/job-analyses/ranked", {}),
+        "GET /search": lambda user: ("GET", "/search", {"params": {"q": rng.choice(["python", "react dev", "kubernets"])}}),
+        "GET /search/autocomplete": lambda user: ("GET", "/search/autocomplete", {"params": {"q": rng.choice(["py", "re", "do"])}}),
+        "GET /notifications": lambda user: ("GET", "/notifications", {}),
+        "POST /job-analysis": lambda user: ("POST", "/job-analysis", {"json": {"job_description": corpus.job_description(rng, size)}}),
+        "POST /ai/match-jobs": lambda user: ("POST", "/ai/match-jobs", {"json": {"job_description": corpus.job_description(rng, size)}}),
+        "POST /ai/analyze-resume": lambda user: ("POST", "/ai/analyze-resume", {"json": {"resume_text": corpus.resume_text(rng, size)}}),
+        "POST /ai/quick-score": lambda user: ("POST", "/ai/quick-score", {"json": {"resume_text": corpus.resume_text(rng, size)}}),
+        "POST /ai/generate-resume": lambda user: ("POST", "/ai/generate-resume", {"json": corpus.resume_payload(rng, size)}),
+        "POST /upload-resume": upload,
+    }
+
+
+async def seed_users(client: httpx.AsyncClient, count: int, rng: random.Random, size: str) -> list:
+    users = []
+    for i in range(count):
+        email, password = f"bench{i}@example.com", "bench-password"
+        (await client.post("/register", json={"email": email, "password": password})).raise_for_status()
+        token = (await client.post("/token", data={"username": email, "password": password})).json()["access_token"]
+        user = User(email, {"Authorization": f"Bearer {token}"})
+        text = corpus.resume_text(rng, size).encode("utf-8")
+        (await client.post("/upload-resume", files={"file": ("resume.txt", text, "text/plain")}, headers=user.headers)).raise_for_status()
+        for _ in range(JOBS_PER_USER):
+            body = {"job_description": corpus.job_description(rng, size)}
+            (await client.post("/job-analysis", json=body, headers=user.headers)).raise_for_status()
+        users.append(user)
+    return users
+
+
+async def run_scenario(client, name, build, users, requests: int, concurrency: int, rng: random.Random) -> dict:
+    samples, errors = [], []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            user = rng.choice(users)
+            method, path, kwargs = build(user)
+            t0 = time.perf_counter()
+            response = await client.request(method, path, headers=user.headers, **kwargs)
+            samples.append(time.perf_counter() - t0)
+            if response.status_code >= 400:
+                errors.append(response.status_code)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result = row(name, samples, time.perf_counter() - start)
+    if errors:
+        print(f"{name}: {len(errors)} error responses (e.g. HTTP {errors[0]})")
+    return result
+
+
+async def run(args) -> list:
+    rng = random.Random(args.seed)
+    main.client = AsyncMongoMockClient()
+    main.database = main.client.get_database("bench")
+    transport = httpx.ASGITransport(app=main.app)
+    async with main.app.router.lifespan_context(main.app):
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+            users = await seed_users(client, args.users, rng, args.size)
+            rows = []
+            for name, build in scenarios(rng, args.size).items():
+                if args.only and not any(part in name for part in args.only.split(",")):
+                    continue
+                rows.append(await run_scenario(client, name, build, users, args.requests, args.concurrency, rng))
+            return rows
+
+
+def main_cli() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--size", default="medium", choices=list(corpus.SIZES))
+    parser.add_argument("--only", help="comma-separated substrings of scenario names to run")
+    parser.add_argument("--seed", type=int, default=42)
+    add_result_arguments(parser)
+    args = parser.parse_args()
+    return report(asyncio.run(run(args)), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
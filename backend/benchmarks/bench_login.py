@@ -0,0 +1,91 @@
+"""Login storm: /token throughput and latency of non-auth requests meanwhile.
+
+Runs against a live server (needs httpx). The probe endpoint is hit at a fixed
+rate, first alone for a baseline and then while ``--concurrency`` clients log
+in back to back; if password hashing blocks the event loop, probe p99 during
+the storm climbs to roughly the bcrypt time times the queue depth.
+
+Usage (from backend/, with the server running):
+    python benchmarks/bench_login.py [--url http://localhost:8000] [--concurrency 32] [--seconds 10] [--save out.json]
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+import uuid
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from common import add_result_arguments, report, row  # noqa: E402
+
+BUSY_BACKOFF = 0.05  # seconds a client waits after a 503 before logging in again
+
+
+async def probe(client: httpx.AsyncClient, path: str, rate: float, stop: asyncio.Event, samples: list) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get(path)
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+        await asyncio.sleep(max(0.0, 1 / rate - (time.perf_counter() - start)))
+
+
+async def login_loop(client: httpx.AsyncClient, email: str, password: str, stop: asyncio.Event,
+                     samples: list, rejected: list) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.post("/token", data={"username": email, "password": password})
+        if response.status_code == 503:
+            rejected.append(1)
+            await asyncio.sleep(BUSY_BACKOFF)
+            continue
+        response.raise_for_status()
+        samples.append(time.perf_counter() - start)
+
+
+async def phase(client, args, email, password, logins: int):
+    stop = asyncio.Event()
+    probe_samples, login_samples, rejected = [], [], []
+    tasks = [asyncio.create_task(probe(client, args.probe, args.probe_rate, stop, probe_samples))]
+    tasks += [asyncio.create_task(login_loop(client, email, password, stop, login_samples, rejected))
+              for _ in range(logins)]
+    start = time.perf_counter()
+    await asyncio.sleep(args.seconds)
+    stop.set()
+    await asyncio.gather(*tasks)
+    return time.perf_counter() - start, probe_samples, login_samples, rejected
+
+
+async def run(args) -> list:
+    email, password = f"bench-{uuid.uuid4().hex[:12]}@example.com", "bench-password"
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=60) as client:
+        (await client.post("/register", json={"email": email, "password": password})).raise_for_status()
+
+        elapsed, probes, _, _ = await phase(client, args, email, password, 0)
+        rows = [row("probe/idle", probes, elapsed)]
+
+        elapsed, probes, logins, rejected = await phase(client, args, email, password, args.concurrency)
+        rows += [row("login", logins, elapsed), row("probe/storm", probes, elapsed)]
+        if rejected:
+            print(f"login 503s: {len(rejected)} (PASSWORD_HASH_MAX_PENDING reached)")
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=32, help="clients logging in back to back")
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--probe", default="/resume/themes", help="non-auth endpoint sampled during the storm")
+    parser.add_argument("--probe-rate", type=float, default=20, help="probe requests per second")
+    add_result_arguments(parser)
+    args = parser.parse_args()
+    return report(asyncio.run(run(args)), args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
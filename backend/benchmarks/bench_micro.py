@@ -0,0 +1,72 @@
+"""Micro-benchmarks: resume analyzers, job-match scoring and resume rendering.
+
+Runs on synthetic resumes and job descriptions of each size in
+``corpus.SIZES``; no database, network or API key needed.
+
+Usage (from backend/):
+    python benchmarks/bench_micro.py [--count 200] [--sizes small,medium,large] [--save out.json] [--compare base.json]
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import corpus  # noqa: E402  (puts backend/ on sys.path)
+from common import add_result_arguments, report, time_calls  # noqa: E402
+
+from analysis import analyze_actual_resume, get_fallback_analysis  # noqa: E402
+from job_index import UserJobIndex  # noqa: E402
+from resume_render import load_templates, render_resume  # noqa: E402
+from scoring import ScoringModel, score_match, tokenize  # noqa: E402
+from skills import extract_skills  # noqa: E402
+
+JD_CORPUS_SIZE = 500  # documents the scoring model is fitted on
+STORED_JOBS = 200  # job descriptions ranked per /job-analyses/ranked call
+
+
+def bench_size(size: str, count: int, seed: int) -> list:
+    rng = random.Random(seed)
+    pairs = corpus.pairs(seed, count, size)
+    resumes = [resume for resume, _ in pairs]
+    payloads = [corpus.resume_payload(rng, size) for _ in range(count)]
+    model = ScoringModel.fit(corpus.job_description(rng, size) for _ in range(JD_CORPUS_SIZE))
+
+    index = UserJobIndex()
+    for i in range(STORED_JOBS):
+        index.add(str(i), corpus.job_description(rng, size), datetime.utcnow())
+    index.matrix(model)  # built once per user and cached, like the endpoint
+
+    return [
+        time_calls(f"analyze_actual_resume/{size}", analyze_actual_resume, resumes),
+        time_calls(f"get_fallback_analysis/{size}", lambda pair: get_fallback_analysis(pair[0], pair[1]), pairs),
+        time_calls(f"extract_skills/{size}", extract_skills, resumes),
+        time_calls(f"score_match/{size}", lambda pair: score_match(model, pair[0], pair[1]), pairs),
+        time_calls(
+            f"rank_jobs[{STORED_JOBS}]/{size}",
+            lambda resume: index.rank(model, tokenize(", ".join(extract_skills(resume))), resume, 10),
+            resumes,
+        ),
+        time_calls(f"render_resume/{size}", render_resume, payloads),
+    ]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=200, help="documents per benchmark and size")
+    parser.add_argument("--sizes", default=",".join(corpus.SIZES))
+    parser.add_argument("--seed", type=int, default=42)
+    add_result_arguments(parser)
+    args = parser.parse_args()
+
+    load_templates()
+    rows = []
+    for size in args.sizes.split(","):
+        rows += bench_size(size, args.count, args.seed)
+    return report(rows, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,50 @@
+"""Resume rendering throughput: HTML per theme, and optionally PDF.
+
+Resumes come from ``corpus.resume_payload``, cycling through the sizes.
+
+Usage (from backend/):
+    python benchmarks/bench_render.py [--count 2000] [--pdf 20] [--save out.json] [--compare base.json]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import corpus  # noqa: E402  (puts backend/ on sys.path)
+from common import add_result_arguments, report, time_calls  # noqa: E402
+
+from resume_render import THEMES, html_to_pdf, load_templates, pdf_backend, render_resume  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=2000, help="resumes rendered per theme")
+    parser.add_argument("--pdf", type=int, default=0, help="also convert this many resumes to PDF")
+    parser.add_argument("--seed", type=int, default=42)
+    add_result_arguments(parser)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    sizes = list(corpus.SIZES)
+    resumes = [corpus.resume_payload(rng, sizes[i % len(sizes)]) for i in range(args.count)]
+
+    start = time.perf_counter()
+    load_templates()
+    print(f"template compile: {(time.perf_counter() - start) * 1000:.1f} ms ({len(THEMES)} themes)")
+    rows = [time_calls(f"html/{theme}", lambda r, theme=theme: render_resume(r, None, theme), resumes) for theme in THEMES]
+
+    if args.pdf:
+        backend = pdf_backend()
+        if backend is None:
+            print("pdf: skipped (install weasyprint or xhtml2pdf)")
+        else:
+            htmls = [render_resume(r) for r in resumes[:args.pdf]]
+            rows.append(time_calls(f"pdf/{backend}", html_to_pdf, htmls))
+    return report(rows, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
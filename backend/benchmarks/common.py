@@ -0,0 +1,80 @@
+"""Timing helpers shared by the benchmarks: percentiles, result rows, baselines.
+
+Each benchmark produces rows of ``{"name", "count", "per_sec", "p50_ms",
+"p99_ms"}``. ``--save results.json`` stores them; ``--compare results.json``
+prints the change against a stored run and flags rows whose p50 got slower
+by more than ``--tolerance`` (the exit status is 1 when any did).
+"""
+import argparse
+import json
+import time
+from typing import Callable, Dict, List, Optional, Sequence
+
+
+def percentile(samples: Sequence[float], p: float) -> float:
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(p / 100 * len(ordered)))]
+
+
+def row(name: str, samples: Sequence[float], elapsed: float) -> dict:
+    """Result row from per-operation latencies (seconds) and the wall time they took."""
+    return {
+        "name": name,
+        "count": len(samples),
+        "per_sec": round(len(samples) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 4),
+        "p99_ms": round(percentile(samples, 99) * 1000, 4),
+    }
+
+
+def time_calls(name: str, func: Callable, items: Sequence, warmup: int = 3) -> dict:
+    """Call ``func(item)`` for every item, timing each call (after ``warmup`` untimed calls)."""
+    for item in items[:warmup]:
+        func(item)
+    samples = []
+    start = time.perf_counter()
+    for item in items:
+        t0 = time.perf_counter()
+        func(item)
+        samples.append(time.perf_counter() - t0)
+    return row(name, samples, time.perf_counter() - start)
+
+
+def print_rows(rows: List[dict], baseline: Optional[Dict[str, dict]] = None, tolerance: float = 0.2) -> List[str]:
+    """Print a results table (with deltas against ``baseline``); returns the names that regressed."""
+    regressions = []
+    print(f"{'name':<40} {'count':>7} {'ops/s':>10} {'p50 ms':>10} {'p99 ms':>10}")
+    for r in rows:
+        line = f"{r['name']:<40} {r['count']:>7} {r['per_sec']:>10.1f} {r['p50_ms']:>10.3f} {r['p99_ms']:>10.3f}"
+        old = (baseline or {}).get(r["name"])
+        if old and old["p50_ms"]:
+            change = r["p50_ms"] / old["p50_ms"] - 1
+            line += f"  p50 {change:+.0%}"
+            if change > tolerance:
+                line += "  REGRESSION"
+                regressions.append(r["name"])
+        print(line)
+    return regressions
+
+
+def add_result_arguments(parser: argparse.ArgumentParser):
+    parser.add_argument("--save", help="write results to this JSON file")
+    parser.add_argument("--compare", help="compare against results saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p50 slowdown before flagging (0.2 = 20%%)")
+
+
+def report(rows: List[dict], args: argparse.Namespace) -> int:
+    """Print, save and compare per the command-line flags; returns the process exit status."""
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {r["name"]: r for r in json.load(f)}
+    regressions = print_rows(rows, baseline, args.tolerance)
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(rows, f, indent=2)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) beyond {args.tolerance:.0%}: {', '.join(regressions)}")
+    return 1 if regressions else 0
@@ -0,0 +1,108 @@
+"""Seeded synthetic resumes and job descriptions for the benchmarks.
+
+Everything is derived from a ``random.Random`` so runs are reproducible. Skill
+mentions are drawn from the real skill dictionary (canonical names and
+aliases, in varied casing) mixed with filler prose, so analyzers and matchers
+do realistic work. ``SIZES`` controls how long documents get.
+"""
+import os
+import random
+import sys
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from skills import ACTION_VERBS, SKILL_ALIASES, SOFT_SKILLS, TECH_SKILLS, display_name  # noqa: E402
+
+SIZES: Dict[str, Dict[str, int]] = {
+    "small": {"jobs": 1, "bullets": 3, "skills": 6, "paragraphs": 1},
+    "medium": {"jobs": 3, "bullets": 5, "skills": 14, "paragraphs": 3},
+    "large": {"jobs": 8, "bullets": 8, "skills": 30, "paragraphs": 8},
+}
+
+TECH_TERMS = sorted(set(TECH_SKILLS) | {alias for aliases in SKILL_ALIASES.values() for alias in aliases})
+FILLER = (
+    "the team worked closely with stakeholders to ship features on schedule while keeping quality high "
+    "across several product areas and customer segments in a fast moving environment"
+).split()
+TITLES = ["Software Engineer", "Backend Developer", "Data Scientist", "Frontend Engineer", "DevOps Engineer"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark Industries", "Wayne Enterprises"]
+
+
+def _skill(rng: random.Random) -> str:
+    term = rng.choice(TECH_TERMS)
+    return rng.choice([term, term.upper(), display_name(term)])
+
+
+def _sentence(rng: random.Random, skills: List[str]) -> str:
+    verb = rng.choice(ACTION_VERBS).capitalize()
+    filler = " ".join(rng.sample(FILLER, 6))
+    metric = rng.choice(["", f", improving throughput by {rng.randint(5, 80)}%", f" for {rng.randint(1, 900)}k users"])
+    return f"{verb} {rng.choice(skills)} and {rng.choice(skills)} services; {filler}{metric}."
+
+
+def resume_skills(rng: random.Random, size: str) -> List[str]:
+    return list(dict.fromkeys(_skill(rng) for _ in range(SIZES[size]["skills"])))
+
+
+def resume_payload(rng: random.Random, size: str = "medium") -> dict:
+    """Resume builder request body (``ResumeBuilderRequest`` fields)."""
+    spec = SIZES[size]
+    skills = resume_skills(rng, size)
+    return {
+        "full_name": f"Candidate {rng.randint(1, 10**6)} <script>alert(1)</script>",
+        "email": "candidate@example.com",
+        "phone": "+1 555 0100",
+        "location": "Remote",
+        "job_title": rng.choice(TITLES),
+        "summary": "",
+        "experience": [
+            {
+                "title": rng.choice(TITLES), "company": rng.choice(COMPANIES),
+                "start_date": str(2010 + i), "end_date": str(2011 + i),
+                "responsibilities": [_sentence(rng, skills) for _ in range(spec["bullets"])],
+            }
+            for i in range(spec["jobs"])
+        ],
+        "education": [{"degree": "BSc", "field": "Computer Science", "institution": "State University", "year": "2010"}],
+        "skills": skills,
+        "certifications": ["AWS Certified Developer"],
+    }
+
+
+def resume_text(rng: random.Random, size: str = "medium") -> str:
+    """Plain-text resume with the usual section headings, like an extracted upload."""
+    payload = resume_payload(rng, size)
+    lines = [
+        payload["full_name"].split(" <")[0],
+        f"{payload['email']} | {payload['phone']} | {payload['location']}",
+        "",
+        "Summary",
+        f"{payload['job_title']} with {rng.randint(2, 15)} years of experience. "
+        f"{' '.join(rng.sample(SOFT_SKILLS, 3)).capitalize()}.",
+        "",
+        "Experience",
+    ]
+    for job in payload["experience"]:
+        lines.append(f"{job['title']} - {job['company']} ({job['start_date']} - {job['end_date']})")
+        lines.extend(f"- {bullet}" for bullet in job["responsibilities"])
+    lines += ["", "Education", "BSc Computer Science, State University, 2010", "", "Skills", ", ".join(payload["skills"])]
+    return "\n".join(lines)
+
+
+def job_description(rng: random.Random, size: str = "medium") -> str:
+    spec = SIZES[size]
+    skills = resume_skills(rng, size)
+    paragraphs = [
+        f"We are hiring a {rng.choice(TITLES)} to join {rng.choice(COMPANIES)}. "
+        + " ".join(_sentence(rng, skills) for _ in range(3))
+        for _ in range(spec["paragraphs"])
+    ]
+    paragraphs.append("Requirements: " + ", ".join(skills) + f", {' and '.join(rng.sample(SOFT_SKILLS, 2))}.")
+    return "\n\n".join(paragraphs)
+
+
+def pairs(seed: int, count: int, size: str = "medium") -> List[Tuple[str, str]]:
+    """``count`` (resume text, job description) pairs."""
+    rng = random.Random(seed)
+    return [(resume_text(rng, size), job_description(rng, size)) for _ in range(count)]
@@ -0,0 +1,152 @@
+"""Content-addressed cache for LLM responses.
+
+Prompts sent to the model are fully determined by their inputs, so responses
+are cached under ``sha256(model + normalized prompt)``. Lookups go to an
+in-process LRU with TTL first, then to an optional Mongo tier
+(``LLMCacheEntry``). Concurrent requests for the same key share one in-flight
+call instead of each hitting the provider.
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional
+
+from logs import event, get_logger
+from models import LLMCacheEntry
+
+logger = get_logger("llm_cache")
+
+LLM_CACHE_SIZE = int(os.getenv("LLM_CACHE_SIZE", "1024"))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))  # seconds
+LLM_CACHE_PERSIST = os.getenv("LLM_CACHE_PERSIST", "true").lower() in ("1", "true", "yes")
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def cache_key(prompt: str, model: str) -> str:
+    normalized = _WHITESPACE.sub(" ", prompt).strip()
+    return hashlib.sha256(f"{model}\0{normalized}".encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """Small LRU with per-entry expiry. Not thread-safe; used from the event loop only."""
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def get(self, key):
+        item = self._data.get(key)
+        if item is None:
+            return None
+        expires, value = item
+        if expires < time.monotonic():
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key, value, ttl: Optional[float] = None):
+        self._data[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class LLMCache:
+    def __init__(self, maxsize: int = LLM_CACHE_SIZE, ttl: int = LLM_CACHE_TTL, persist: bool = LLM_CACHE_PERSIST):
+        self.ttl = ttl
+        self.persist = persist
+        self._memory = TTLCache(maxsize, ttl)
+        self._in_flight: Dict[str, asyncio.Future] = {}
+        self.stats = {"memory_hits": 0, "persistent_hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    async def _load(self, key: str) -> Optional[str]:
+        if not self.persist:
+            return None
+        try:
+            entry = await LLMCacheEntry.find_one(LLMCacheEntry.key == key)
+        except Exception as e:
+            self.stats["errors"] += 1
+            event(logger, logging.WARNING, "llm_cache_read_failed", error=str(e))
+            return None
+        if entry is None or entry.expires_at < datetime.utcnow():
+            return None
+        return entry.response
+
+    async def _store(self, key: str, model: str, response: str):
+        if not self.persist:
+            return
+        try:
+            await LLMCacheEntry.find_one(LLMCacheEntry.key == key).upsert(
+                {"$set": {"response": response, "expires_at": datetime.utcnow() + timedelta(seconds=self.ttl)}},
+                on_insert=LLMCacheEntry(
+                    key=key, model=model, response=response,
+                    expires_at=datetime.utcnow() + timedelta(seconds=self.ttl),
+                ),
+            )
+        except Exception as e:
+            self.stats["errors"] += 1
+            event(logger, logging.WARNING, "llm_cache_write_failed", error=str(e))
+
+    async def get_or_compute(self, prompt: str, model: str, compute: Callable[[], Awaitable[str]]) -> str:
+        key = cache_key(prompt, model)
+        cached = self._memory.get(key)
+        if cached is not None:
+            self.stats["memory_hits"] += 1
+            return cached
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.stats["coalesced"] += 1
+        else:
+            # The fill runs detached from the first caller, so its cancellation (a client
+            # disconnecting) does not fail the requests coalesced onto the same key.
+            task = asyncio.create_task(self._fill(key, model, compute))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda done: self._fill_done(key, done))
+        return await asyncio.shield(task)
+
+    async def _fill(self, key: str, model: str, compute: Callable[[], Awaitable[str]]) -> str:
+        value = await self._load(key)
+        if value is not None:
+            self.stats["persistent_hits"] += 1
+        else:
+            self.stats["misses"] += 1
+            value = await compute()
+            await self._store(key, model, value)
+        self._memory.set(key, value)
+        return value
+
+    def _fill_done(self, key: str, task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Waiters see the same failure; nothing is cached so the next call retries.
+            task.exception()  # mark retrieved when every waiter has gone
+
+    def snapshot(self) -> dict:
+        lookups = self.stats["memory_hits"] + self.stats["persistent_hits"] + self.stats["misses"]
+        hits = self.stats["memory_hits"] + self.stats["persistent_hits"]
+        return {
+            **self.stats,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "in_flight": len(self._in_flight),
+            "persistent": self.persist,
+        }
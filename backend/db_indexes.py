@@ -0,0 +1,74 @@
+"""Creation of and startup report on MongoDB indexes.
+
+Indexes are declared in each Document's ``Settings.indexes``. ``ensure_indexes``
+builds them one at a time and logs any that fail instead of aborting startup:
+a unique index can't be built while old data still holds duplicates (see
+``migrate_duplicates.py``). ``check_indexes`` compares the declarations with
+what the server actually has and logs declared indexes that are missing and
+indexes with no recorded use since the server started.
+"""
+import logging
+import os
+from typing import Dict, List, Type
+
+from beanie import Document
+from pymongo.errors import PyMongoError
+
+from logs import event, get_logger
+
+INDEX_CHECK_ENABLED = os.getenv("INDEX_CHECK", "true").lower() in ("1", "true", "yes")
+
+logger = get_logger("db_indexes")
+
+
+async def ensure_indexes(document_models: List[Type[Document]]) -> List[tuple]:
+    """Create every declared index; returns the (collection, key) pairs that could not be built."""
+    failed = []
+    for model in document_models:
+        settings = getattr(model, "Settings", None)
+        indexes = getattr(settings, "indexes", [])
+        if not indexes:
+            continue
+        collection = model.get_motor_collection()
+        for index in indexes:
+            try:
+                await collection.create_indexes([index])
+            except PyMongoError as e:
+                key = tuple(index.document["key"].items())
+                failed.append((collection.name, key))
+                event(logger, logging.ERROR, "index_build_failed", collection=collection.name, key=key, error=str(e))
+    return failed
+
+
+def declared_indexes(model: Type[Document]) -> List[tuple]:
+    settings = getattr(model, "Settings", None)
+    return [tuple(index.document["key"].items()) for index in getattr(settings, "indexes", [])]
+
+
+async def check_indexes(document_models: List[Type[Document]]) -> Dict[str, dict]:
+    """Log missing/unused indexes per collection and return the report."""
+    report = {}
+    for model in document_models:
+        collection = model.get_motor_collection()
+        try:
+            existing = await collection.index_information()
+        except Exception as e:
+            event(logger, logging.WARNING, "index_check_skipped", collection=collection.name, error=str(e))
+            continue
+        existing_keys = {tuple(info["key"]) for info in existing.values()}
+        missing = [key for key in declared_indexes(model) if key not in existing_keys]
+
+        unused = []
+        try:
+            stats = await collection.aggregate([{"$indexStats": {}}]).to_list(None)
+            unused = [s["name"] for s in stats if s["name"] != "_id_" and s["accesses"]["ops"] == 0]
+        except Exception:
+            # $indexStats needs clusterMonitor on some hosted tiers
+            pass
+
+        report[collection.name] = {"missing": missing, "unused": unused}
+        for key in missing:
+            event(logger, logging.WARNING, "index_missing", collection=collection.name, key=key)
+        if unused:
+            event(logger, logging.INFO, "indexes_unused", collection=collection.name, indexes=unused)
+    return report
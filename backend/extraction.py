@@ -0,0 +1,211 @@
+"""Bounded resume upload spooling and text extraction in worker processes.
+
+Upload requests whose ``Content-Length`` already exceeds ``MAX_UPLOAD_BYTES``
+are refused before the body is read (``UploadSizeLimitMiddleware``). Chunked
+uploads carry no length, so for those the cap only limits what is stored:
+the file is copied in chunks to a temp file (never fully into memory) and
+rejected once it passes ``MAX_UPLOAD_BYTES``.
+
+Parsing runs on a small process pool with a per-file timeout and page limit.
+A worker that times out is killed and the pool is rebuilt; extractions that
+were sharing the killed pool see ``BrokenProcessPool`` and are retried once on
+the new pool, so a huge or malicious PDF only fails its own request.
+"""
+import asyncio
+import os
+import tempfile
+import json
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+from xml.etree import ElementTree
+
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+EXTRACTION_TIMEOUT = float(os.getenv("EXTRACTION_TIMEOUT", "15"))
+MAX_PDF_PAGES = int(os.getenv("MAX_PDF_PAGES", "20"))
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "2"))
+PAGES_PER_CHUNK = 5
+CHUNK_SIZE = 64 * 1024
+MULTIPART_OVERHEAD = 64 * 1024  # boundaries and part headers around the file
+UPLOAD_PATHS = {"/upload-resume", "/upload-resume/extract", "/jobs/upload-resume"}
+
+_WORD_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_MAX_DOCX_XML_BYTES = 20 * 1024 * 1024  # guards against zip bombs
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+class UploadTooLarge(Exception):
+    pass
+
+
+class ExtractionError(Exception):
+    pass
+
+
+async def spool_upload(file, max_bytes: int = MAX_UPLOAD_BYTES, directory: Optional[str] = None) -> str:
+    """Copy an UploadFile to a temp file chunk by chunk; returns its path (caller deletes it)."""
+    suffix = os.path.splitext(file.filename or "")[1]
+    fd, path = tempfile.mkstemp(prefix="resume-", suffix=suffix, dir=directory)
+    size = 0
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise UploadTooLarge(f"File too large (max {max_bytes // (1024 * 1024)} MB)")
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+
+class UploadSizeLimitMiddleware:
+    """Answer 413 to uploads whose declared Content-Length is over the cap, without reading the body."""
+
+    def __init__(self, app, max_bytes: int = MAX_UPLOAD_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["method"] == "POST" and scope["path"] in UPLOAD_PATHS:
+            length = dict(scope["headers"]).get(b"content-length")
+            if length and length.isdigit() and int(length) > self.max_bytes + MULTIPART_OVERHEAD:
+                body = json.dumps({"detail": f"File too large (max {self.max_bytes // (1024 * 1024)} MB)"}).encode()
+                await send({
+                    "type": "http.response.start",
+                    "status": 413,
+                    "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), (b"connection", b"close")],
+                })
+                await send({"type": "http.response.body", "body": body})
+                return
+        await self.app(scope, receive, send)
+
+
+def file_kind(filename: str) -> str:
+    name = (filename or "").lower()
+    for kind in ("pdf", "docx", "txt"):
+        if name.endswith("." + kind):
+            return kind
+    return "other"
+
+
+# --- Worker-side functions (run in the extraction pool) ---
+
+def pdf_page_count(path: str) -> int:
+    import PyPDF2
+    return len(PyPDF2.PdfReader(path).pages)
+
+
+def extract_pdf_pages(path: str, start: int, stop: int) -> List[str]:
+    import PyPDF2
+    reader = PyPDF2.PdfReader(path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, min(stop, len(reader.pages)))]
+
+
+def extract_docx(path: str) -> str:
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo("word/document.xml")
+        if info.file_size > _MAX_DOCX_XML_BYTES:
+            raise ExtractionError("Document too large")
+        root = ElementTree.fromstring(archive.read(info))
+    paragraphs = []
+    for paragraph in root.iter(f"{_WORD_NS}p"):
+        text = "".join(node.text or "" for node in paragraph.iter(f"{_WORD_NS}t"))
+        if text:
+            paragraphs.append(text)
+    return "\n".join(paragraphs)
+
+
+def extract_plain(path: str, max_bytes: int = MAX_UPLOAD_BYTES) -> str:
+    with open(path, "rb") as f:
+        return f.read(max_bytes).decode("utf-8", errors="ignore")
+
+
+def extract_file(path: str, kind: str, max_pages: int = MAX_PDF_PAGES) -> str:
+    if kind == "pdf":
+        try:
+            return "".join(extract_pdf_pages(path, 0, max_pages))
+        except Exception:
+            # PyPDF2 missing or the PDF is unreadable: use basic text extraction
+            return extract_plain(path)
+    if kind == "docx":
+        try:
+            return extract_docx(path)
+        except (KeyError, zipfile.BadZipFile, ElementTree.ParseError) as e:
+            raise ExtractionError(f"Could not read .docx file: {e}")
+    return extract_plain(path)
+
+
+# --- Event-loop side ---
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=EXTRACTION_WORKERS)
+    return _pool
+
+
+def _kill_pool(pool: ProcessPoolExecutor):
+    """Terminate every worker of ``pool`` (a stuck parser can't be cancelled any other way).
+
+    Other calls still pending on it fail with ``BrokenProcessPool`` and are retried by ``_run``.
+    """
+    global _pool
+    if _pool is pool:
+        _pool = None
+    for process in list((getattr(pool, "_processes", None) or {}).values()):
+        process.kill()
+    pool.shutdown(wait=False)
+
+
+def shutdown_extraction_pool():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def _run(func, *args, timeout: float = EXTRACTION_TIMEOUT, retry: bool = True):
+    loop = asyncio.get_running_loop()
+    pool = _get_pool()
+    try:
+        return await asyncio.wait_for(loop.run_in_executor(pool, func, *args), timeout)
+    except asyncio.TimeoutError:
+        _kill_pool(pool)
+        raise ExtractionError(f"Text extraction timed out after {timeout:g}s")
+    except BrokenProcessPool:
+        # Another upload's timeout (or a crashed worker) took the pool down with this call in it
+        if _pool is pool:
+            _kill_pool(pool)
+        if not retry:
+            raise ExtractionError("Text extraction worker crashed")
+        return await _run(func, *args, timeout=timeout, retry=False)
+
+
+async def extract_text(path: str, filename: str, max_pages: int = MAX_PDF_PAGES) -> str:
+    """Extract the whole document's text in a worker process."""
+    return await _run(extract_file, path, file_kind(filename), max_pages)
+
+
+async def iter_text_chunks(path: str, filename: str, max_pages: int = MAX_PDF_PAGES):
+    """Yield ``(first_page, text)`` chunks as they are extracted; PDFs go PAGES_PER_CHUNK pages at a time."""
+    kind = file_kind(filename)
+    if kind != "pdf":
+        yield 0, await _run(extract_file, path, kind, max_pages)
+        return
+    try:
+        pages = min(await _run(pdf_page_count, path), max_pages)
+    except ExtractionError:
+        raise
+    except Exception:
+        yield 0, await _run(extract_plain, path)
+        return
+    for start in range(0, pages, PAGES_PER_CHUNK):
+        texts = await _run(extract_pdf_pages, path, start, min(start + PAGES_PER_CHUNK, pages))
+        yield start, "".join(texts)
@@ -0,0 +1,136 @@
+"""Per-user inverted index over stored job descriptions, for reverse matching.
+
+``/job-analyses/ranked`` ranks every job description a user has analysed
+against their skills. Each user's descriptions are loaded and tokenized once
+into postings (term -> row numbers); new analyses are appended as they are
+stored, and their rows are added to the scoring matrix at the next ranking
+(existing rows keep the IDF they were weighted with until the index reloads).
+A ranking only touches the rows that share at least one term with the
+user's skills, scoring them in one batched ``DocumentMatrix`` pass, so cost
+follows the matching postings rather than the size of the corpus.
+"""
+import asyncio
+import os
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from analysis import run_in_pool
+from cache import TTLCache
+from models import JobAnalysis
+from scoring import DocumentMatrix, ScoringModel, tokenize, tokenize_all
+from skills import display_name
+
+JOB_INDEX_USERS = int(os.getenv("JOB_INDEX_USERS", "256"))
+JOB_INDEX_TTL = int(os.getenv("JOB_INDEX_TTL", "600"))  # seconds; bounds staleness across app workers
+JOB_INDEX_MAX_DOCS = int(os.getenv("JOB_INDEX_MAX_DOCS", "10000"))
+
+
+class UserJobIndex:
+    def __init__(self):
+        self.ids: List[str] = []
+        self.descriptions: List[str] = []
+        self.created_at: List[datetime] = []
+        self.tokens: List[List[str]] = []
+        self.postings: Dict[str, List[int]] = {}
+        self._matrix: Optional[DocumentMatrix] = None
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def add(self, analysis_id: str, description: str, created_at: datetime, tokens: Optional[List[str]] = None):
+        row = len(self.ids)
+        tokens = tokens if tokens is not None else tokenize(description)
+        self.ids.append(analysis_id)
+        self.descriptions.append(description)
+        self.created_at.append(created_at)
+        self.tokens.append(tokens)
+        for term in set(tokens):
+            self.postings.setdefault(term, []).append(row)
+
+    def matrix(self, model: ScoringModel) -> DocumentMatrix:
+        if self._matrix is None or self._matrix.model is not model:
+            self._matrix = DocumentMatrix(model, self.descriptions, self.tokens)
+        elif len(self._matrix) < len(self.ids):
+            self._matrix.append(self.tokens[len(self._matrix):])  # rows added since the last ranking
+        return self._matrix
+
+    def rank(self, model: ScoringModel, query_terms: List[str], resume_text: str, k: int) -> List[Dict]:
+        """Top ``k`` rows sharing a term with ``query_terms``, best match first."""
+        hits: Dict[int, List[str]] = {}
+        for term in dict.fromkeys(query_terms):
+            for row in self.postings.get(term, ()):
+                hits.setdefault(row, []).append(term)
+        if not hits:
+            return []
+        rows = np.fromiter(hits, dtype=np.int64, count=len(hits))
+        scores = self.matrix(model).score(resume_text, rows=rows)
+        # Sort by score, then by how many of the user's skills the description mentions.
+        order = np.lexsort((-np.fromiter((len(hits[r]) for r in rows), dtype=np.int64), -scores["score"]))[:k]
+        return [
+            {
+                "id": self.ids[rows[i]],
+                "job_description": self.descriptions[rows[i]],
+                "match_score": int(scores["score"][i]),
+                "similarity": round(float(scores["cosine"][i]), 4),
+                "matched_skills": [display_name(term) for term in hits[rows[i]]],
+                "created_at": self.created_at[rows[i]],
+            }
+            for i in order
+        ]
+
+
+class JobIndex:
+    """Process-wide LRU of per-user indexes, loaded on first use and kept current on insert."""
+
+    def __init__(self, maxsize: int = JOB_INDEX_USERS, ttl: int = JOB_INDEX_TTL):
+        self._indexes = TTLCache(maxsize, ttl)
+        self._loading: Dict[str, asyncio.Task] = {}
+
+    async def get(self, user_email: str) -> UserJobIndex:
+        index = self._indexes.get(user_email)
+        if index is not None:
+            return index
+        # Concurrent first requests share one load; the entry goes away when it finishes.
+        task = self._loading.get(user_email)
+        if task is None:
+            task = asyncio.create_task(self._load_and_cache(user_email))
+            self._loading[user_email] = task
+            task.add_done_callback(lambda done: self._load_done(user_email, done))
+        return await asyncio.shield(task)
+
+    async def _load_and_cache(self, user_email: str) -> UserJobIndex:
+        index = await self._load(user_email)
+        self._indexes.set(user_email, index)
+        return index
+
+    def _load_done(self, user_email: str, task: asyncio.Task):
+        if self._loading.get(user_email) is task:
+            del self._loading[user_email]
+        if not task.cancelled():
+            task.exception()  # callers that went away would leave it unretrieved
+
+    async def _load(self, user_email: str) -> UserJobIndex:
+        rows = await JobAnalysis.get_motor_collection().find(
+            {"user_email": user_email}, {"job_description": 1, "created_at": 1}
+        ).sort("created_at", -1).limit(JOB_INDEX_MAX_DOCS).to_list(None)
+        rows.reverse()
+        descriptions = [row.get("job_description", "") for row in rows]
+        token_lists = await run_in_pool(tokenize_all, descriptions) if descriptions else []
+        index = UserJobIndex()
+        for row, description, tokens in zip(rows, descriptions, token_lists):
+            index.add(str(row["_id"]), description, row.get("created_at"), tokens)
+        return index
+
+    def add(self, analysis: JobAnalysis):
+        """Append a just-stored analysis to its owner's index, if that index is loaded."""
+        index = self._indexes.get(analysis.user_email)
+        if index is not None:
+            index.add(str(analysis.id), analysis.job_description, analysis.created_at)
+
+    def invalidate(self, user_email: str):
+        self._indexes.pop(user_email)
+
+
+job_index = JobIndex()
@@ -0,0 +1,231 @@
+"""In-process background job queue for slow pipelines, persisted in Mongo.
+
+Endpoints enqueue a ``Job`` and return its id straight away; a fixed number of
+asyncio workers run the registered handler and record progress on the job
+document, so clients can poll ``/jobs/{id}`` or follow the SSE stream.
+Handlers registered with ``cpu=True`` are plain functions run on the analysis
+process pool. Running jobs get a heartbeat on ``updated_at``; on shutdown a
+process hands its running jobs back to the queue, and a periodic sweep
+requeues jobs whose process died without doing so (no heartbeat for
+``JOB_STALE_SECONDS``). Claiming is an atomic status update, so several app
+workers can share one collection. Finished jobs expire after
+``JOB_RETENTION_HOURS``.
+"""
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from beanie import PydanticObjectId
+from beanie.operators import Set as SetFields
+
+from analysis import run_in_pool
+from logs import event, get_logger
+from models import Job
+
+logger = get_logger("jobs")
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "300"))
+JOB_HEARTBEAT_SECONDS = int(os.getenv("JOB_HEARTBEAT_SECONDS", "30"))
+JOB_SWEEP_SECONDS = int(os.getenv("JOB_SWEEP_SECONDS", "60"))
+JOB_RETENTION_HOURS = int(os.getenv("JOB_RETENTION_HOURS", "72"))
+JOB_SPOOL_DIR = os.getenv("JOB_SPOOL_DIR", "data/job-uploads")
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+TERMINAL = {SUCCEEDED, FAILED}
+
+Report = Callable[[int, str], Awaitable[None]]
+
+
+def job_view(job: Job) -> dict:
+    return {
+        "id": str(job.id),
+        "type": job.job_type,
+        "status": job.status,
+        "progress": job.progress,
+        "stage": job.stage,
+        "result": job.result,
+        "error": job.error,
+        "created_at": job.created_at,
+        "updated_at": job.updated_at,
+    }
+
+
+class JobQueue:
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.workers = workers
+        self._handlers: Dict[str, tuple] = {}
+        self._queue: "asyncio.Queue[PydanticObjectId]" = asyncio.Queue()
+        self._tasks = []
+        self._pending: Set[PydanticObjectId] = set()  # ids in self._queue
+        self._running: Dict[PydanticObjectId, Job] = {}
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def handler(self, job_type: str, cpu: bool = False):
+        """Register ``func(job, report)`` (async) or, with ``cpu=True``, ``func(**job.params)`` for the process pool."""
+        def register(func):
+            self._handlers[job_type] = (func, cpu)
+            return func
+        return register
+
+    async def start(self):
+        await self._recover(startup=True)
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks += [asyncio.create_task(self._heartbeat()), asyncio.create_task(self._sweep())]
+
+    async def stop(self):
+        interrupted = list(self._running)
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Interrupted handlers start over on the next claim, here or in another process
+        if interrupted:
+            await Job.find({"_id": {"$in": interrupted}}, Job.status == RUNNING).update_many(
+                SetFields({Job.status: QUEUED, Job.stage: "queued", Job.updated_at: datetime.utcnow()})
+            )
+            event(logger, logging.INFO, "jobs_requeued_on_shutdown", count=len(interrupted))
+
+    def _put(self, job_id: PydanticObjectId):
+        if job_id not in self._pending:
+            self._pending.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    async def _recover(self, startup: bool = False):
+        """Requeue running jobs with no heartbeat, and queue jobs no live process is holding."""
+        stale = datetime.utcnow() - timedelta(seconds=JOB_STALE_SECONDS)
+        for job in await Job.find(Job.status == RUNNING, Job.updated_at < stale).to_list():
+            result = await Job.find_one(Job.id == job.id, Job.status == RUNNING, Job.updated_at < stale).update(
+                SetFields({Job.status: QUEUED, Job.stage: "queued", Job.updated_at: datetime.utcnow()})
+            )
+            if result and result.modified_count == 1:
+                event(logger, logging.WARNING, "job_requeued_stale", job_id=job.id, job_type=job.job_type)
+                self._put(job.id)
+        # At startup every queued job is orphaned or shared; later, only ones left waiting too long
+        query = Job.find(Job.status == QUEUED) if startup else Job.find(Job.status == QUEUED, Job.updated_at < stale)
+        for job in await query.sort(+Job.created_at).to_list():
+            self._put(job.id)
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(JOB_HEARTBEAT_SECONDS)
+            if not self._running:
+                continue
+            try:
+                await Job.find({"_id": {"$in": list(self._running)}}, Job.status == RUNNING).update_many(
+                    SetFields({Job.updated_at: datetime.utcnow()})
+                )
+            except Exception:
+                event(logger, logging.WARNING, "job_heartbeat_failed", exc_info=True)
+
+    async def _sweep(self):
+        while True:
+            await asyncio.sleep(JOB_SWEEP_SECONDS)
+            try:
+                await self._recover()
+            except Exception:
+                event(logger, logging.WARNING, "job_sweep_failed", exc_info=True)
+
+    async def enqueue(self, job_type: str, user_email: str, params: dict) -> Job:
+        if job_type not in self._handlers:
+            raise ValueError(f"Unknown job type: {job_type}")
+        job = Job(job_type=job_type, user_email=user_email, params=params)
+        await job.insert()
+        self._put(job.id)
+        return job
+
+    async def _claim(self, job_id: PydanticObjectId) -> Optional[Job]:
+        result = await Job.find_one(Job.id == job_id, Job.status == QUEUED).update(
+            SetFields({Job.status: RUNNING, Job.updated_at: datetime.utcnow()})
+        )
+        if not result or result.modified_count != 1:
+            return None  # another worker got it, or it already finished
+        return await Job.get(job_id)
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            self._pending.discard(job_id)
+            try:
+                job = await self._claim(job_id)
+                if job is not None:
+                    self._running[job.id] = job
+                    try:
+                        await self._run(job)
+                    finally:
+                        self._running.pop(job.id, None)
+            except Exception:
+                event(logger, logging.ERROR, "job_worker_error", job_id=job_id, exc_info=True)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job):
+        func, cpu = self._handlers[job.job_type]
+
+        async def report(progress: int, stage: str):
+            await self._update(job, progress=progress, stage=stage)
+
+        try:
+            await report(0, "started")
+            if cpu:
+                result = await run_in_pool(_call_with_params, func, job.params)
+            else:
+                result = await func(job, report)
+            await self._update(job, status=SUCCEEDED, progress=100, stage="done", result=result)
+        except Exception as e:
+            await self._update(job, status=FAILED, stage="failed", error=str(getattr(e, "detail", e)))
+
+    async def _update(self, job: Job, **fields):
+        fields["updated_at"] = datetime.utcnow()
+        if fields.get("status") in TERMINAL:
+            fields["expires_at"] = fields["updated_at"] + timedelta(hours=JOB_RETENTION_HOURS)
+        for key, value in fields.items():
+            setattr(job, key, value)
+        await job.set(fields)
+        self._publish(job)
+
+    def _publish(self, job: Job):
+        view = job_view(job)
+        for queue in self._subscribers.get(str(job.id), ()):
+            queue.put_nowait(view)
+
+    async def get(self, job_id: str, user_email: str) -> Optional[Job]:
+        try:
+            object_id = PydanticObjectId(job_id)
+        except Exception:
+            return None
+        return await Job.find_one(Job.id == object_id, Job.user_email == user_email)
+
+    async def events(self, job: Job, poll_interval: float = 1.0):
+        """Yield job snapshots until it finishes: pushed by local workers, polled for jobs run elsewhere."""
+        key = str(job.id)
+        queue: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(key, set()).add(queue)
+        try:
+            view = job_view(job)
+            yield view
+            while view["status"] not in TERMINAL:
+                try:
+                    view = await asyncio.wait_for(queue.get(), poll_interval)
+                except asyncio.TimeoutError:
+                    fresh = await Job.get(job.id)
+                    if fresh is None:
+                        return
+                    fresh_view = job_view(fresh)
+                    if (fresh_view["status"], fresh_view["progress"], fresh_view["stage"]) == (view["status"], view["progress"], view["stage"]):
+                        continue
+                    view = fresh_view
+                yield view
+        finally:
+            self._subscribers[key].discard(queue)
+            if not self._subscribers[key]:
+                del self._subscribers[key]
+
+
+def _call_with_params(func, params: dict):
+    return func(**params)
+
+
+job_queue = JobQueue()
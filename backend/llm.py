@@ -0,0 +1,232 @@
+"""Shared, non-blocking LLM client.
+
+One ``LLMClient`` is created at startup and used by every endpoint that talks
+to a model. It never blocks the event loop (async generation, or a bounded
+thread pool for SDKs without it), caps concurrency and request rate to stay
+under provider limits, and retries transient failures with jittered
+exponential backoff. ``LLM_BACKEND=fake`` swaps in an offline backend for
+load tests. Responses go through the content-addressed ``LLMCache``.
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from cache import LLMCache
+from logs import event, get_logger
+from metrics import llm_calls, llm_latency, register_totals
+from profiling import span
+
+LLM_BACKEND = os.getenv("LLM_BACKEND", "gemini")  # gemini | fake
+LLM_DEFAULT_MODEL = os.getenv("LLM_MODEL", "gemini-pro")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_RATE_PER_MINUTE = float(os.getenv("LLM_RATE_PER_MINUTE", "60"))
+LLM_TIMEOUT = float(os.getenv("LLM_TIMEOUT", "20"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_BACKOFF_BASE = float(os.getenv("LLM_BACKOFF_BASE", "0.5"))
+LLM_BACKOFF_MAX = float(os.getenv("LLM_BACKOFF_MAX", "8"))
+
+logger = get_logger("llm")
+
+# Provider errors worth retrying (matched by class name so the SDK stays optional).
+RETRYABLE_ERRORS = {
+    "ResourceExhausted", "TooManyRequests", "ServiceUnavailable", "DeadlineExceeded",
+    "InternalServerError", "Aborted", "ConnectionError", "TimeoutError",
+}
+
+
+class LLMError(Exception):
+    """Raised when a generation fails after all retries."""
+
+
+class GeminiBackend:
+    """google-generativeai backend; model objects are built once per model name."""
+
+    def __init__(self, api_key: str, max_workers: int):
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self._genai = genai
+        self._models: Dict[str, object] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm")
+
+    def _model(self, name: str):
+        model = self._models.get(name)
+        if model is None:
+            model = self._models[name] = self._genai.GenerativeModel(name)
+        return model
+
+    async def generate(self, prompt: str, model: str) -> str:
+        gen_model = self._model(model)
+        if hasattr(gen_model, "generate_content_async"):
+            response = await gen_model.generate_content_async(prompt)
+        else:
+            loop = asyncio.get_running_loop()
+            response = await loop.run_in_executor(self._executor, gen_model.generate_content, prompt)
+        return response.text
+
+    async def close(self):
+        self._executor.shutdown(wait=False)
+
+
+class FakeBackend:
+    """Offline backend with configurable latency, for local runs and load tests."""
+
+    def __init__(self, latency: float = 0.05, responder: Optional[Callable[[str], str]] = None):
+        self.latency = latency
+        self.responder = responder or self._default_response
+        self.calls = 0
+
+    @staticmethod
+    def _default_response(prompt: str) -> str:
+        if "recommendations" in prompt.lower():
+            return (
+                "1. Build a small project that uses the missing skills end to end\n"
+                "2. Highlight transferable experience from your current stack\n"
+                "3. Complete a hands-on course or certification for the top missing skill"
+            )
+        return (
+            "Results-driven professional with a track record of shipping reliable software, "
+            "improving delivery speed by 30% and collaborating across teams to deliver business impact."
+        )
+
+    async def generate(self, prompt: str, model: str) -> str:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        return self.responder(prompt)
+
+    async def close(self):
+        pass
+
+
+class TokenBucket:
+    """Simple token bucket: ``rate`` tokens per second, bursting up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class LLMClient:
+    def __init__(
+        self,
+        backend,
+        default_model: str = LLM_DEFAULT_MODEL,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        rate_per_minute: float = LLM_RATE_PER_MINUTE,
+        timeout: float = LLM_TIMEOUT,
+        max_retries: int = LLM_MAX_RETRIES,
+        backoff_base: float = LLM_BACKOFF_BASE,
+        backoff_max: float = LLM_BACKOFF_MAX,
+        cache: Optional[LLMCache] = None,
+    ):
+        self.backend = backend
+        self.cache = cache
+        self.default_model = default_model
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._bucket = TokenBucket(rate_per_minute / 60.0, max(1.0, float(max_concurrency))) if rate_per_minute > 0 else None
+
+    def _backoff(self, attempt: int) -> float:
+        # "Full jitter": uniform in [0, min(max, base * 2^attempt)]
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def generate(self, prompt: str, model: Optional[str] = None, use_cache: bool = True) -> str:
+        """Generate text for ``prompt``; raises ``LLMError`` once retries are exhausted."""
+        model = model or self.default_model
+        if use_cache and self.cache is not None:
+            return await self.cache.get_or_compute(prompt, model, lambda: self._generate(prompt, model))
+        return await self._generate(prompt, model)
+
+    async def _generate(self, prompt: str, model: str) -> str:
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                await asyncio.sleep(self._backoff(attempt - 1))
+            if self._bucket is not None:
+                await self._bucket.acquire()
+            try:
+                async with self._semaphore:
+                    return await self._call(prompt, model)
+            except asyncio.TimeoutError as e:
+                last_error = e
+            except Exception as e:
+                if type(e).__name__ not in RETRYABLE_ERRORS:
+                    raise LLMError(str(e)) from e
+                last_error = e
+        raise LLMError(f"LLM call failed after {self.max_retries + 1} attempts: {last_error!r}") from last_error
+
+    async def _call(self, prompt: str, model: str) -> str:
+        """One provider attempt, recorded in the LLM call metrics."""
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            with span("llm"):
+                text = await asyncio.wait_for(self.backend.generate(prompt, model), timeout=self.timeout)
+            outcome = "ok"
+            return text
+        except asyncio.TimeoutError:
+            outcome = "timeout"
+            raise
+        finally:
+            llm_calls.inc(model, outcome)
+            llm_latency.observe(time.perf_counter() - started, model, outcome)
+
+    async def close(self):
+        await self.backend.close()
+
+
+_client: Optional[LLMClient] = None
+
+register_totals(
+    "llm_cache_events_total", "LLM response cache lookups by outcome.", "event",
+    lambda: _client.cache.stats if _client is not None and _client.cache is not None else {},
+)
+
+
+def init_llm_client(api_key: Optional[str] = None, backend: Optional[str] = None) -> Optional[LLMClient]:
+    """Create the process-wide client. Returns None when no backend is usable."""
+    global _client
+    backend = backend or LLM_BACKEND
+    if backend == "fake":
+        _client = LLMClient(FakeBackend(latency=float(os.getenv("LLM_FAKE_LATENCY", "0.05"))), cache=LLMCache())
+    elif api_key:
+        try:
+            _client = LLMClient(GeminiBackend(api_key, max_workers=LLM_MAX_CONCURRENCY), cache=LLMCache())
+        except Exception as e:
+            event(logger, logging.WARNING, "gemini_configure_failed", error=str(e))
+            _client = None
+    else:
+        _client = None
+    return _client
+
+
+def get_llm_client() -> Optional[LLMClient]:
+    return _client
+
+
+async def close_llm_client():
+    global _client
+    if _client is not None:
+        await _client.close()
+        _client = None
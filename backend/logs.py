@@ -0,0 +1,87 @@
+"""Structured logging for the backend, replacing ``print`` debugging.
+
+Everything logs through ``get_logger(__name__)``-style loggers under the
+``smartcv`` namespace as one JSON object per line (``LOG_FORMAT=text`` for
+human-readable lines) with the current request id attached. Failures are
+logged with ``event`` and always emitted. Per-request chatter on hot paths
+goes through ``hot_event``, which is sampled by ``LOG_SAMPLE_RATE`` and costs a
+single comparison when that is 0 or the level is disabled, so it can be
+switched off without touching the code.
+"""
+import json
+import logging
+import os
+import random
+import sys
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Optional
+
+ROOT_LOGGER = "smartcv"
+
+request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+
+_sample_rate = 1.0
+
+
+class JSONFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": record.getMessage(),
+        }
+        rid = request_id.get()
+        if rid:
+            entry["request_id"] = rid
+        entry.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class TextFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        fields = " ".join(f"{key}={value}" for key, value in getattr(record, "fields", {}).items())
+        rid = request_id.get()
+        line = f"{record.levelname:<7} {record.name}: {record.getMessage()}"
+        line += f" [{rid}]" if rid else ""
+        line += f" {fields}" if fields else ""
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+def configure_logging(level: Optional[str] = None, fmt: Optional[str] = None, sample_rate: Optional[float] = None):
+    """Install the handler on the ``smartcv`` logger; reads LOG_LEVEL, LOG_FORMAT and LOG_SAMPLE_RATE."""
+    global _sample_rate
+    level = level or os.getenv("LOG_LEVEL", "INFO")
+    fmt = fmt or os.getenv("LOG_FORMAT", "json")
+    _sample_rate = float(os.getenv("LOG_SAMPLE_RATE", "1.0")) if sample_rate is None else sample_rate
+
+    handler = logging.StreamHandler(sys.stderr)
+    handler.setFormatter(TextFormatter() if fmt == "text" else JSONFormatter())
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers[:] = [handler]
+    root.setLevel(level.upper())
+    root.propagate = False
+
+
+def get_logger(name: str) -> logging.Logger:
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def event(logger: logging.Logger, level: int, name: str, exc_info=None, **fields):
+    """Log ``name`` with structured ``fields``; always emitted when the level is enabled."""
+    if logger.isEnabledFor(level):
+        logger.log(level, name, exc_info=exc_info, extra={"fields": fields})
+
+
+def hot_event(logger: logging.Logger, level: int, name: str, **fields):
+    """Like ``event``, but sampled by LOG_SAMPLE_RATE (0 turns it off); for per-request logs."""
+    if _sample_rate <= 0 or not logger.isEnabledFor(level):
+        return
+    if _sample_rate < 1 and random.random() >= _sample_rate:
+        return
+    logger.log(level, name, extra={"fields": fields})
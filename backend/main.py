@@ -1,29 +1,61 @@
 import os
-from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File
+from fastapi import FastAPI, Depends, HTTPException, status, UploadFile, File, Response, Header
 from fastapi.security import OAuth2PasswordRequestForm, OAuth2PasswordBearer
-from passlib.context import CryptContext
-from jose import JWTError, jwt
 from pydantic import BaseModel
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.errors import DuplicateKeyError
 from beanie import init_beanie
-from models import User, UserIn, UserOut, UserProfileUpdate, Token, TokenData, Resume, Skill, SkillIn, JobAnalysis, JobAnalysisIn, Portfolio, PortfolioIn, Notification, NotificationIn
+from models import User, AuthUser, TokenUser, UserIn, UserOut, UserProfileUpdate, Token, TokenData, RefreshRequest, LogoutRequest, RevokedToken, Resume, Skill, SkillIn, Job, JobAnalysis, JobAnalysisIn, Portfolio, PortfolioIn, Notification, NotificationIn, NotificationBulkRequest, LLMCacheEntry, NotificationView, SkillView, JobAnalysisView, ResumeSummaryView
+from skills import SOFT, TECH, canonical_name, display_name, extract_skills, matcher_for, skill_category, skill_key
+from skill_sync import sync_skills
+import notifications as notification_service
+import user_cache
+from resume_parser import parse_resume, section_text
+from resume_store import get_latest_resume_skills, get_resume, store_parsed_resume
+from jobs import JOB_SPOOL_DIR, job_queue, job_view
+from extraction import ExtractionError, UploadSizeLimitMiddleware, UploadTooLarge, extract_text, iter_text_chunks, shutdown_extraction_pool, spool_upload
+from picture_store import MAX_PICTURE_BYTES, PictureError, find_picture, picture_url, save_picture
+from pagination import DEFAULT_PAGE_SIZE, paginate
+from db_indexes import INDEX_CHECK_ENABLED, check_indexes, ensure_indexes
+from llm import init_llm_client, get_llm_client, close_llm_client
+from passwords import PasswordHashBusy, hash_password, shutdown_password_pool, verify_password
+from logs import configure_logging, event, get_logger, hot_event
+import metrics
+from profiling import ProfilingMiddleware, list_profiles, span, trace_path
+from tokens import REFRESH, InvalidToken, create_token_pair, decode_token, init_signing_keys, revoke, start_revocation_sync, stop_revocation_sync
+from scoring import job_corpus, rank_terms, score_match, tokenize
+from job_index import job_index
+from search_index import search_index, highlights
+from autocomplete import autocomplete
+from resume_render import DEFAULT_THEME, THEMES, PDFUnavailable, default_summary, html_to_pdf, load_templates, render_resume
+from analysis import ANALYZER_VERSION, analysis_content_hash, analyze_actual_resume, get_fallback_analysis, score_resume, start_pool, shutdown_pool, run_in_pool
 from typing import Optional, List
 from dotenv import load_dotenv
 import openai
-from datetime import datetime, timedelta
+from datetime import datetime
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse, FileResponse
+from starlette.background import BackgroundTask
+import re
+import json
+import asyncio
+import logging
+
+load_dotenv()
+configure_logging()
+logger = get_logger("api")
+
 try:
     import google.generativeai as genai
     GENAI_AVAILABLE = True
 except ImportError:
     GENAI_AVAILABLE = False
-    print("Warning: google.generativeai not installed. Using fallback analysis.")
-import re
-
-load_dotenv()
+    event(logger, logging.WARNING, "genai_unavailable", detail="google.generativeai not installed; using fallback analysis")
 
 app = FastAPI()
 
+app.add_middleware(UploadSizeLimitMiddleware)  # inside CORS so the 413 carries CORS headers
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -31,10 +63,14 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "X-Prev-Cursor", "X-Request-ID", "X-Profile-Id", "Server-Timing"],
 )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(metrics.MetricsMiddleware)  # outermost: assigns the request id profiling uses
 
 MONGO_URI = os.getenv("MONGO_URI")
 JWT_SECRET = os.getenv("JWT_SECRET")
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")  # when set, /metrics requires "Authorization: Bearer <token>"
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 
@@ -42,26 +78,42 @@ GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 if GENAI_AVAILABLE and GEMINI_API_KEY:
     try:
         genai.configure(api_key=GEMINI_API_KEY)
-        print("✅ Gemini AI configured successfully")
+        event(logger, logging.INFO, "gemini_configured")
     except Exception as e:
-        print(f"⚠️ Gemini AI configuration failed: {e}")
+        event(logger, logging.WARNING, "gemini_configure_failed", error=str(e))
         GENAI_AVAILABLE = False
 
-client = AsyncIOMotorClient(MONGO_URI)
+client = AsyncIOMotorClient(MONGO_URI, event_listeners=[metrics.MongoCommandListener()])
 database = client.get_database()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+DOCUMENT_MODELS = [User, Resume, Skill, JobAnalysis, Portfolio, Notification, LLMCacheEntry, Job, RevokedToken]
+
 @app.on_event("startup")
 async def startup_event():
-    await init_beanie(database=database, document_models=[User, Resume, Skill, JobAnalysis, Portfolio, Notification])
-
-def verify_password(plain_password, hashed_password):
-    return pwd_context.verify(plain_password, hashed_password)
-
-def get_password_hash(password):
-    return pwd_context.hash(password)
+    # Indexes are built separately so a unique index blocked by old duplicates can't stop startup
+    await init_beanie(database=database, document_models=DOCUMENT_MODELS, skip_indexes=True)
+    await ensure_indexes(DOCUMENT_MODELS)
+    init_signing_keys(JWT_SECRET, os.getenv("JWT_PREVIOUS_SECRETS", "").split(","))
+    await start_revocation_sync()
+    if INDEX_CHECK_ENABLED:
+        asyncio.create_task(check_indexes(DOCUMENT_MODELS))
+    start_pool()
+    load_templates()
+    init_llm_client(GEMINI_API_KEY if GENAI_AVAILABLE else None)
+    await user_cache.init_user_cache()
+    await job_queue.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await job_queue.stop()
+    await stop_revocation_sync()
+    shutdown_pool()
+    shutdown_extraction_pool()
+    shutdown_password_pool()
+    await close_llm_client()
+    await user_cache.close_user_cache()
 
 async def get_user(email: str):
     user = await User.find_one(User.email == email)
@@ -71,34 +123,63 @@ async def authenticate_user(email: str, password: str):
     user = await get_user(email)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await verify_password(password, user.hashed_password)
+    if not valid:
         return False
+    if new_hash:
+        # Stored with a different BCRYPT_ROUNDS; re-save at the current cost
+        await user.set({User.hashed_password: new_hash})
     return user
 
-def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
-    to_encode = data.copy()
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=15)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, JWT_SECRET, algorithm="HS256")
-    return encoded_jwt
-
-async def get_current_user(token: str = Depends(oauth2_scheme)):
-    credentials_exception = HTTPException(
-        status_code=status.HTTP_401_UNAUTHORIZED,
-        detail="Could not validate credentials",
-        headers={"WWW-Authenticate": "Bearer"},
-    )
+password_busy_exception = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Too many login attempts in progress, please retry",
+    headers={"Retry-After": "1"},
+)
+
+credentials_exception = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED,
+    detail="Could not validate credentials",
+    headers={"WWW-Authenticate": "Bearer"},
+)
+
+def get_token_claims(token: str = Depends(oauth2_scheme)):
     try:
-        payload = jwt.decode(token, JWT_SECRET, algorithms=["HS256"])
-        email: str = payload.get("sub")
-        if email is None:
+        return decode_token(token)
+    except InvalidToken:
+        raise credentials_exception
+
+def get_token_data(claims: dict = Depends(get_token_claims)):
+    return TokenData(email=claims["sub"])
+
+async def get_token_user(claims: dict = Depends(get_token_claims)):
+    """Caller from the signed token claims alone, for read-only endpoints (no DB access)"""
+    if "act" in claims and "uid" in claims:
+        user = TokenUser(id=claims["uid"], email=claims["sub"], is_active=claims["act"], role=claims.get("role", "user"))
+    else:
+        # Token issued without embedded claims (TOKEN_EMBED_CLAIMS off, or before they existed)
+        auth_user = await user_cache.get_auth_user(claims["sub"])
+        if auth_user is None:
             raise credentials_exception
-        token_data = TokenData(email=email)
-    except JWTError:
+        user = TokenUser(id=str(auth_user.id), email=auth_user.email, is_active=auth_user.is_active, role=auth_user.role)
+    if not user.is_active:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Inactive user")
+    return user
+
+async def get_admin_user(current_user: TokenUser = Depends(get_token_user)):
+    if current_user.role != "admin":
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin only")
+    return current_user
+
+async def get_current_user(token_data: TokenData = Depends(get_token_data)):
+    """Auth projection of the caller, served from the short-TTL user cache"""
+    user = await user_cache.get_auth_user(token_data.email)
+    if user is None:
         raise credentials_exception
+    return user
+
+async def get_current_user_document(token_data: TokenData = Depends(get_token_data)):
+    """Full User document, for endpoints that read or write profile fields"""
     user = await get_user(email=token_data.email)
     if user is None:
         raise credentials_exception
@@ -109,30 +190,64 @@ async def register(user: UserIn):
     db_user = await get_user(user.email)
     if db_user:
         raise HTTPException(status_code=400, detail="Email already registered")
-    hashed_password = get_password_hash(user.password)
+    try:
+        hashed_password = await hash_password(user.password)
+    except PasswordHashBusy:
+        raise password_busy_exception
     user_obj = User(email=user.email, hashed_password=hashed_password)
     await user_obj.insert()
     return UserOut(email=user.email, is_active=user_obj.is_active)
 
 @app.post("/token", response_model=Token)
 async def login_for_access_token(form_data: OAuth2PasswordRequestForm = Depends()):
-    user = await authenticate_user(form_data.username, form_data.password)
+    try:
+        user = await authenticate_user(form_data.username, form_data.password)
+    except PasswordHashBusy:
+        raise password_busy_exception
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token = create_access_token(data={"sub": user.email})
-    return {"access_token": access_token, "token_type": "bearer"}
+    return create_token_pair(user)
+
+@app.post("/token/refresh", response_model=Token)
+async def refresh_access_token(request: RefreshRequest):
+    """Exchange a refresh token for a new pair; the old refresh token is revoked (rotation)"""
+    try:
+        claims = decode_token(request.refresh_token, REFRESH)
+    except InvalidToken:
+        raise credentials_exception
+    user = await get_user(claims["sub"])
+    if user is None or not user.is_active:
+        raise credentials_exception
+    await revoke(claims)
+    return create_token_pair(user)
+
+@app.post("/logout")
+async def logout(request: Optional[LogoutRequest] = None, claims: dict = Depends(get_token_claims)):
+    await revoke(claims)
+    if request and request.refresh_token:
+        try:
+            refresh_claims = decode_token(request.refresh_token, REFRESH)
+        except InvalidToken:
+            refresh_claims = None
+        if refresh_claims and refresh_claims["sub"] == claims["sub"]:
+            await revoke(refresh_claims)
+    return {"message": "Logged out"}
+
+def profile_picture_url(user: User):
+    # Pictures not yet moved by migrate_profile_pictures.py are still inline data URLs
+    return picture_url(user.profile_picture_key) or user.profile_picture
 
 @app.get("/users/me", response_model=UserOut)
-async def read_users_me(current_user: User = Depends(get_current_user)):
+async def read_users_me(current_user: User = Depends(get_current_user_document)):
     return UserOut(
         email=current_user.email,
         is_active=current_user.is_active,
         full_name=current_user.full_name,
-        profile_picture=current_user.profile_picture,
+        profile_picture=profile_picture_url(current_user),
         bio=current_user.bio,
         phone=current_user.phone,
         location=current_user.location,
@@ -144,7 +259,7 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
     )
 
 @app.post("/ai/generate")
-async def generate_ai_response(prompt: str, current_user: User = Depends(get_current_user)):
+async def generate_ai_response(prompt: str, current_user: AuthUser = Depends(get_current_user)):
     openai.api_key = OPENAI_API_KEY
     response = openai.Completion.create(
         engine="text-davinci-003",
@@ -155,23 +270,32 @@ async def generate_ai_response(prompt: str, current_user: User = Depends(get_cur
 
 # Skill Tracker Endpoints
 @app.post("/skills")
-async def create_skill(skill_data: SkillIn, current_user: User = Depends(get_current_user)):
+async def create_skill(skill_data: SkillIn, current_user: AuthUser = Depends(get_current_user)):
     skill = Skill(
         user_email=current_user.email,
-        name=skill_data.name,
+        name=canonical_name(skill_data.name),
         goal=skill_data.goal,
         progress=skill_data.progress
     )
-    await skill.insert()
+    try:
+        await skill.insert()
+    except DuplicateKeyError:
+        raise HTTPException(status_code=400, detail="Skill already exists")
+    search_index.index_skill(skill)
     return {"message": "Skill added successfully", "skill_id": str(skill.id)}
 
-@app.get("/skills")
-async def get_skills(current_user: User = Depends(get_current_user)):
-    skills = await Skill.find(Skill.user_email == current_user.email).to_list()
-    return skills
+@app.get("/skills", response_model=List[SkillView])
+async def get_skills(
+    response: Response,
+    limit: int = DEFAULT_PAGE_SIZE,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    current_user: TokenUser = Depends(get_token_user)
+):
+    return await paginate(Skill, [Skill.user_email == current_user.email], SkillView, response, limit, before, after)
 
 @app.put("/skills/{skill_id}")
-async def update_skill(skill_id: str, progress: int, current_user: User = Depends(get_current_user)):
+async def update_skill(skill_id: str, progress: int, current_user: AuthUser = Depends(get_current_user)):
     from beanie import PydanticObjectId
     skill = await Skill.get(PydanticObjectId(skill_id))
     if not skill or skill.user_email != current_user.email:
@@ -179,50 +303,108 @@ async def update_skill(skill_id: str, progress: int, current_user: User = Depend
     skill.progress = progress
     skill.updated_at = datetime.utcnow()
     await skill.save()
+    search_index.index_skill(skill)
     return {"message": "Skill updated successfully"}
 
 @app.delete("/skills/{skill_id}")
-async def delete_skill(skill_id: str, current_user: User = Depends(get_current_user)):
+async def delete_skill(skill_id: str, current_user: AuthUser = Depends(get_current_user)):
     from beanie import PydanticObjectId
     skill = await Skill.get(PydanticObjectId(skill_id))
     if not skill or skill.user_email != current_user.email:
         raise HTTPException(status_code=404, detail="Skill not found")
     await skill.delete()
+    search_index.unindex_skill(skill)
     return {"message": "Skill deleted successfully"}
 
 # Job Match Endpoints
+async def get_user_skill_names(user_email: str) -> List[str]:
+    """Skill Tracker names plus those parsed from the latest uploaded resume, as canonical skill keys"""
+    user_skills = await Skill.find(Skill.user_email == user_email).to_list()
+    skill_names = [skill.name for skill in user_skills]
+    latest_resume = await get_latest_resume_skills(user_email)
+    if latest_resume:
+        skill_names += latest_resume.skills
+    return list(dict.fromkeys(skill_key(name) for name in skill_names))
+
+async def get_match_text(user_email: str, skill_names: List[str]) -> str:
+    """What job descriptions are scored against: the latest uploaded resume plus tracked skills"""
+    resume = await get_resume(user_email)
+    return "\n".join(filter(None, [resume.text if resume else "", ", ".join(skill_names)]))
+
+async def score_job_description(user_email: str, job_description: str, skill_names: List[str]) -> dict:
+    """TF-IDF/BM25 match of the user's latest resume (plus tracked skills) against a job description"""
+    resume_text = await get_match_text(user_email, skill_names)
+    model = await job_corpus.model()
+    scores = score_match(model, resume_text, job_description)
+
+    matched_skills = matcher_for(tuple(skill_names)).extract(job_description) if skill_names else []
+    known_skills = set(skill_names)
+    missing_skills = [skill for skill in extract_skills(job_description) if skill not in known_skills]
+    return {**scores, "matched_skills": matched_skills, "missing_skills": rank_terms(model, missing_skills)}
+
 @app.post("/job-analysis")
-async def analyze_job(job_data: JobAnalysisIn, current_user: User = Depends(get_current_user)):
-    # Simulate AI analysis (replace with actual AI logic)
+async def analyze_job(job_data: JobAnalysisIn, current_user: AuthUser = Depends(get_current_user)):
+    skill_names = await get_user_skill_names(current_user.email)
+    match = await score_job_description(current_user.email, job_data.job_description, skill_names)
+    missing_skills = match["missing_skills"]
     analysis = JobAnalysis(
         user_email=current_user.email,
         job_description=job_data.job_description,
-        match_score=75,
-        matched_skills=["React", "Python", "FastAPI"],
-        missing_skills=["Docker", "AWS"],
-        recommendations=["Add Docker experience", "Learn AWS basics"]
+        match_score=match["match_score"],
+        matched_skills=[display_name(skill) for skill in match["matched_skills"]],
+        missing_skills=[display_name(skill) for skill in missing_skills[:10]],
+        recommendations=[f"Add {display_name(skill)} experience" for skill in missing_skills[:3]]
+            or ["Keep improving your existing skills"]
     )
     await analysis.insert()
+    job_corpus.observe(analysis.job_description)
+    job_index.add(analysis)
+    search_index.index_job_analysis(analysis)
     return analysis
 
-@app.get("/job-analyses")
-async def get_job_analyses(current_user: User = Depends(get_current_user)):
-    analyses = await JobAnalysis.find(JobAnalysis.user_email == current_user.email).to_list()
-    return analyses
+@app.get("/job-analyses", response_model=List[JobAnalysisView])
+async def get_job_analyses(
+    response: Response,
+    limit: int = DEFAULT_PAGE_SIZE,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    current_user: TokenUser = Depends(get_token_user)
+):
+    return await paginate(
+        JobAnalysis, [JobAnalysis.user_email == current_user.email], JobAnalysisView, response, limit, before, after
+    )
+
+MAX_RANKED_JOBS = int(os.getenv("MAX_RANKED_JOBS", "100"))
+
+@app.get("/job-analyses/ranked")
+async def rank_job_analyses(limit: int = 10, current_user: TokenUser = Depends(get_token_user)):
+    """Rank every job description the user has analysed against their current skills and resume"""
+    limit = max(1, min(limit, MAX_RANKED_JOBS))
+    skill_names = await get_user_skill_names(current_user.email)
+    if not skill_names:
+        return {"results": [], "total_indexed": 0, "message": "No skills found. Add skills or upload a resume first."}
+    resume_text = await get_match_text(current_user.email, skill_names)
+    model = await job_corpus.model()
+    index = await job_index.get(current_user.email)
+    results = index.rank(model, tokenize(", ".join(skill_names)), resume_text, limit)
+    for result in results:
+        result["job_description"] = result["job_description"][:200]
+    return {"results": results, "total_indexed": len(index)}
 
 # Portfolio Endpoints
 @app.post("/portfolio")
-async def create_or_update_portfolio(portfolio_data: PortfolioIn, current_user: User = Depends(get_current_user)):
+async def create_or_update_portfolio(portfolio_data: PortfolioIn, current_user: AuthUser = Depends(get_current_user)):
     existing = await Portfolio.find_one(Portfolio.user_email == current_user.email)
     if existing:
-        existing.username = portfolio_data.username
-        existing.bio = portfolio_data.bio
-        existing.location = portfolio_data.location
-        existing.website = portfolio_data.website
-        existing.projects = portfolio_data.projects
-        existing.certificates = portfolio_data.certificates
-        existing.updated_at = datetime.utcnow()
-        await existing.save()
+        fields = {**portfolio_data.model_dump(), "updated_at": datetime.utcnow()}
+        try:
+            # A query update: document save()/set() report a duplicate key as RevisionIdWasChanged
+            await Portfolio.find_one(Portfolio.id == existing.id).update({"$set": fields})
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Username already taken")
+        for key, value in fields.items():
+            setattr(existing, key, value)
+        search_index.index_portfolio(existing)
         return {"message": "Portfolio updated successfully"}
     else:
         portfolio = Portfolio(
@@ -234,11 +416,15 @@ async def create_or_update_portfolio(portfolio_data: PortfolioIn, current_user:
             projects=portfolio_data.projects,
             certificates=portfolio_data.certificates
         )
-        await portfolio.insert()
+        try:
+            await portfolio.insert()
+        except DuplicateKeyError:
+            raise HTTPException(status_code=400, detail="Username already taken")
+        search_index.index_portfolio(portfolio)
         return {"message": "Portfolio created successfully"}
 
 @app.get("/portfolio")
-async def get_portfolio(current_user: User = Depends(get_current_user)):
+async def get_portfolio(current_user: TokenUser = Depends(get_token_user)):
     portfolio = await Portfolio.find_one(Portfolio.user_email == current_user.email)
     if not portfolio:
         raise HTTPException(status_code=404, detail="Portfolio not found")
@@ -253,92 +439,14 @@ async def get_public_portfolio(username: str):
 
 # AI Resume Analysis with Gemini
 class ResumeAnalysisRequest(BaseModel):
-    resume_text: str
+    resume_text: Optional[str] = None  # omit to analyze a stored upload (resume_id, or the latest one)
+    resume_id: Optional[str] = None
     job_description: Optional[str] = None
     target_role: Optional[str] = None  # e.g., "Software Developer", "Data Scientist"
 
-async def analyze_actual_resume(request: ResumeAnalysisRequest):
-    """Analyze ACTUAL resume content without AI - real-time analysis"""
-    resume_text = request.resume_text.lower()
-    
-    # Extract actual information from the resume
-    skills_found = []
-    common_skills = ['python', 'java', 'javascript', 'react', 'node', 'mongodb', 'sql', 'docker', 'aws', 'git', 
-                     'html', 'css', 'typescript', 'angular', 'vue', 'express', 'django', 'flask', 'kubernetes',
-                     'c++', 'c#', 'ruby', 'go', 'rust', 'php', 'swift', 'kotlin', 'scala']
-    
-    for skill in common_skills:
-        if skill in resume_text:
-            skills_found.append(skill.upper() if skill in ['sql', 'aws', 'html', 'css'] else skill.title())
-    
-    # Count experience mentions
-    experience_years = 0
-    if 'years' in resume_text or 'year' in resume_text:
-        import re
-        years_match = re.findall(r'(\d+)\s*(?:years?|yrs?)', resume_text)
-        if years_match:
-            experience_years = max([int(y) for y in years_match])
-    
-    # Check for quantifiable achievements
-    has_metrics = bool(re.findall(r'\d+%|\d+x|increased|decreased|improved|reduced', resume_text))
-    
-    # Check for action verbs
-    action_verbs = ['developed', 'created', 'built', 'designed', 'implemented', 'managed', 'led', 'achieved']
-    action_verb_count = sum(1 for verb in action_verbs if verb in resume_text)
-    
-    # Calculate score based on actual content
-    score = 60  # Base score
-    if len(skills_found) > 5: score += 10
-    if len(skills_found) > 10: score += 5
-    if experience_years > 0: score += 5
-    if has_metrics: score += 10
-    if action_verb_count > 3: score += 10
-    
-    score = min(score, 95)  # Cap at 95
-    
-    # Generate specific feedback based on actual resume
-    strengths = []
-    if skills_found:
-        strengths.append(f"Strong technical skills: {', '.join(skills_found[:5])}")
-    if has_metrics:
-        strengths.append("Includes quantifiable achievements")
-    if action_verb_count > 3:
-        strengths.append("Uses strong action verbs effectively")
-    
-    improvements = []
-    if len(skills_found) < 5:
-        improvements.append("Add more technical skills relevant to your target role")
-    if not has_metrics:
-        improvements.append("Include quantifiable achievements (e.g., 'Increased efficiency by 40%')")
-    if action_verb_count < 3:
-        improvements.append("Use more action verbs (developed, created, implemented, etc.)")
-    if len(resume_text) < 500:
-        improvements.append("Expand your resume with more detailed descriptions")
-    
-    keywords = list(set(skills_found))[:10]
-    missing_keywords = []
-    if request.target_role:
-        role_lower = request.target_role.lower()
-        if 'developer' in role_lower or 'engineer' in role_lower:
-            missing_keywords = [s for s in ['Git', 'API', 'Testing', 'Agile'] if s.lower() not in resume_text]
-    
-    return {
-        "score": score,
-        "strengths": strengths if strengths else ["Resume uploaded successfully"],
-        "improvements": improvements if improvements else ["Resume looks good overall"],
-        "keywords": keywords,
-        "missing_keywords": missing_keywords[:5],
-        "suggestions": [
-            "Tailor your resume to match the job description",
-            "Keep formatting simple and ATS-friendly",
-            "Proofread for grammar and spelling errors"
-        ]
-    }
-
 async def analyze_with_gemini(request: ResumeAnalysisRequest):
     """Real analysis - analyzes actual resume content"""
-    print("✅ Analyzing your actual resume content...")
-    return await analyze_actual_resume(request)
+    return analyze_actual_resume(request.resume_text, request.target_role)
     
     role_context = f" for a {request.target_role} position" if request.target_role else ""
     job_context = f"\n\nTARGET JOB DESCRIPTION:\n{request.job_description}" if request.job_description else ""
@@ -376,7 +484,7 @@ IMPORTANT: Base everything on the ACTUAL resume content provided. Be specific, n
 
     response = model.generate_content(prompt)
     text = response.text
-    print(f"Gemini AI Response:\n{text}\n")
+    hot_event(logger, logging.DEBUG, "gemini_response", chars=len(text))
     
     # Parse response
     score_match = re.search(r'SCORE:\s*(\d+(?:\.\d+)?)', text)
@@ -427,165 +535,111 @@ IMPORTANT: Base everything on the ACTUAL resume content provided. Be specific, n
         "full_analysis": text
     }
 
-def get_fallback_analysis(resume_text: str, job_description: str = None, target_role: str = None):
-    """Intelligent fallback analysis when AI is unavailable"""
-    resume_lower = resume_text.lower()
-    words = resume_lower.split()
-    
-    # Comprehensive keyword lists
-    tech_keywords = ['python', 'javascript', 'react', 'node', 'java', 'sql', 'aws', 'docker', 'git', 'api', 
-                     'typescript', 'angular', 'vue', 'mongodb', 'postgresql', 'redis', 'kubernetes', 'ci/cd',
-                     'html', 'css', 'rest', 'graphql', 'microservices', 'agile', 'scrum', 'jenkins']
-    
-    soft_skills = ['leadership', 'communication', 'teamwork', 'problem-solving', 'analytical', 'creative',
-                   'management', 'collaboration', 'presentation', 'negotiation']
-    
-    action_verbs = ['led', 'managed', 'developed', 'implemented', 'achieved', 'improved', 'increased',
-                    'reduced', 'created', 'designed', 'launched', 'optimized', 'spearheaded', 'drove']
-    
-    # Find keywords
-    found_tech = [kw for kw in tech_keywords if kw in resume_lower]
-    missing_tech = [kw for kw in tech_keywords[:15] if kw not in resume_lower]
-    found_soft = [kw for kw in soft_skills if kw in resume_lower]
-    found_actions = [kw for kw in action_verbs if kw in resume_lower]
-    
-    # Check for numbers/metrics
-    has_numbers = any(char.isdigit() for char in resume_text)
-    has_percentages = '%' in resume_text
-    
-    # Calculate intelligent score
-    score = 5.0
-    if len(found_tech) > 5: score += 1.5
-    if len(found_soft) > 2: score += 1.0
-    if len(found_actions) > 3: score += 1.0
-    if has_numbers: score += 0.5
-    if has_percentages: score += 1.0
-    if len(resume_text) > 500: score += 0.5
-    score = min(10, round(score, 1))
-    
-    # Build dynamic strengths
-    strengths = []
-    if len(found_tech) > 5:
-        strengths.append(f"Strong technical skill set with {len(found_tech)} technologies mentioned")
-    if len(found_actions) > 3:
-        strengths.append("Good use of action verbs to describe accomplishments")
-    if has_percentages:
-        strengths.append("Includes quantifiable achievements with metrics")
-    if len(found_soft) > 2:
-        strengths.append("Demonstrates important soft skills")
-    if len(resume_text) > 800:
-        strengths.append("Comprehensive and detailed experience description")
-    
-    # Ensure at least 3 strengths
-    if len(strengths) < 3:
-        strengths.extend([
-            "Professional presentation",
-            "Clear structure and organization",
-            "Relevant experience highlighted"
-        ])
-    
-    # Build dynamic improvements
-    improvements = []
-    if not has_percentages:
-        improvements.append("Add measurable achievements with percentages (e.g., 'Increased efficiency by 40%')")
-    if len(found_actions) < 3:
-        improvements.append("Use more strong action verbs (led, achieved, implemented, optimized)")
-    if len(found_soft) < 2:
-        improvements.append("Include soft skills like leadership, communication, and teamwork")
-    if len(found_tech) < 5:
-        improvements.append("Add more relevant technical skills and tools")
-    improvements.append("Include a professional summary at the top highlighting key achievements")
-    
-    # Detect errors
-    errors = []
-    if len(resume_text) < 200:
-        errors.append("Resume is too short (less than 200 characters)")
-    if not has_numbers:
-        errors.append("Missing quantifiable achievements (add numbers/metrics)")
-    if len(found_actions) < 2:
-        errors.append("Weak action verbs - use stronger verbs like 'led', 'achieved', 'implemented'")
-    
-    role_fit_score = score
-    if target_role:
-        role_lower = target_role.lower()
-        if 'developer' in role_lower or 'engineer' in role_lower:
-            if len(found_tech) < 5:
-                role_fit_score -= 2
-        role_fit = f"{role_fit_score}/10 - {'Strong' if role_fit_score >= 7 else 'Moderate'} fit for {target_role}"
-    else:
-        role_fit = f"{score}/10 - General resume quality assessment"
-    
-    return {
-        "score": score,
-        "errors": " | ".join(errors) if errors else "No major errors detected",
-        "strengths": strengths[:5],
-        "improvements": improvements[:5],
-        "keywords_found": [kw.upper() if kw in ['sql', 'aws', 'html', 'css', 'api'] else kw.title() for kw in found_tech[:15]],
-        "missing_keywords": [kw.upper() if kw in ['sql', 'aws', 'html', 'css', 'api'] else kw.title() for kw in missing_tech[:10]],
-        "role_fit": role_fit,
-        "target_role": target_role or "General",
-        "skill_gaps": [
-            "Consider adding cloud technologies (AWS, Azure, GCP)",
-            "Include modern DevOps tools (Docker, Kubernetes, CI/CD)",
-            "Add database experience (SQL, NoSQL)",
-            "Mention version control and collaboration tools"
-        ] if job_description else [],
-        "action_verbs": [
-            "Replace 'worked on' with 'led', 'spearheaded', or 'drove'",
-            "Replace 'helped' with 'facilitated', 'enabled', or 'supported'",
-            "Replace 'did' with 'executed', 'implemented', or 'delivered'",
-            "Replace 'made' with 'created', 'developed', or 'designed'"
-        ],
-        "formatting_tips": [
-            "Ensure consistent bullet point formatting throughout",
-            "Use reverse chronological order for work experience",
-            "Keep resume to 1-2 pages maximum",
-            "Use professional fonts (Arial, Calibri, Times New Roman)",
-            "Include clear section headers (Experience, Education, Skills)"
-        ],
-        "achievement_suggestions": [
-            "Add metrics to project outcomes (e.g., 'Reduced load time by 50%')",
-            "Include team size if you led projects (e.g., 'Led team of 5 developers')",
-            "Mention awards, recognition, or certifications received",
-            "Quantify impact with numbers (users served, revenue generated, time saved)"
-        ],
-        "full_analysis": f"Smart analysis complete! Found {len(found_tech)} technical skills and {len(found_actions)} action verbs. Score: {score}/10"
-    }
-
 @app.post("/ai/analyze-resume")
-async def analyze_resume_with_ai(request: ResumeAnalysisRequest, current_user: User = Depends(get_current_user)):
+async def analyze_resume_with_ai(request: ResumeAnalysisRequest, current_user: AuthUser = Depends(get_current_user)):
     """
     Analyze resume with REAL AI - checks quality score, errors, and role-specific feedback
     """
-    print(f"\n{'='*50}")
-    print(f"Analyzing resume for: {request.target_role or 'General'}")
-    print(f"Resume length: {len(request.resume_text)} characters")
-    print(f"Gemini AI Available: {GENAI_AVAILABLE}")
-    print(f"{'='*50}\n")
+    if not request.resume_text:
+        with span("load"):
+            resume = await get_resume(current_user.email, request.resume_id)
+        if not resume:
+            raise HTTPException(status_code=404, detail="No uploaded resume found. Upload one or send resume_text.")
+        request.resume_text = resume.text
+    
+    # Identical resume/role/JD re-posts are answered from the stored analysis
+    with span("memo"):
+        content_hash = analysis_content_hash(request.resume_text, request.job_description, request.target_role, GENAI_AVAILABLE)
+        stored = await Resume.find_one(Resume.user_email == current_user.email, Resume.content_hash == content_hash)
+    if stored and stored.analyzer_version == ANALYZER_VERSION and stored.analysis:
+        return stored.analysis
+    
+    with span("analyze"):
+        result = await run_resume_analysis(request)
+    with span("store"):
+        await save_resume_analysis(current_user.email, content_hash, result, stored)
+    return result
+
+async def save_resume_analysis(user_email: str, content_hash: str, result: dict, resume: Optional[Resume] = None):
+    """Memoize an analysis on the user's Resume document (replacing results from an older analyzer version)"""
+    if resume is None:
+        resume = Resume(user_email=user_email, content_hash=content_hash)
+    resume.analysis_score = result.get("score")
+    resume.keywords = result.get("keywords") or result.get("keywords_found", [])
+    resume.missing_keywords = result.get("missing_keywords", [])
+    resume.suggestions = result.get("suggestions") or result.get("improvements", [])
+    resume.analyzer_version = ANALYZER_VERSION
+    resume.analysis = result
+    await resume.save()
+
+async def run_resume_analysis(request: ResumeAnalysisRequest):
+    hot_event(
+        logger, logging.INFO, "resume_analysis_started",
+        target_role=request.target_role or "General", resume_chars=len(request.resume_text), gemini_available=GENAI_AVAILABLE,
+    )
     
     # Try Gemini AI first for REAL analysis
     if GENAI_AVAILABLE:
         try:
-            print("🤖 Using Gemini AI for real-time analysis...")
             result = await analyze_with_gemini(request)
-            print("✅ Gemini AI analysis completed successfully!")
+            hot_event(logger, logging.INFO, "resume_analysis_completed", analyzer="gemini")
             return result
         except Exception as e:
-            print(f"❌ Gemini AI failed: {str(e)}")
-            print(f"Error details: {type(e).__name__}")
+            event(logger, logging.WARNING, "gemini_analysis_failed", error=str(e), error_type=type(e).__name__)
             # If API key issue, inform user
             if "API" in str(e) or "key" in str(e).lower():
                 raise HTTPException(
                     status_code=500, 
                     detail=f"Gemini AI API Error: {str(e)}. Please check your API key at https://makersuite.google.com/app/apikey"
                 )
-    else:
-        print("⚠️ Gemini AI not available. Install: pip install google-generativeai")
     
     # Fallback to smart analysis
-    print("📊 Using fallback smart analysis...")
+    hot_event(logger, logging.INFO, "resume_analysis_completed", analyzer="fallback")
     return get_fallback_analysis(request.resume_text, request.job_description, request.target_role)
 
+# Batch Resume Analysis - score many resumes against one job description
+MAX_BATCH_RESUMES = int(os.getenv("MAX_BATCH_RESUMES", "500"))
+
+class BatchResumeItem(BaseModel):
+    resume_text: str
+    id: Optional[str] = None  # caller's own reference, echoed back in the result
+
+class BatchResumeAnalysisRequest(BaseModel):
+    resumes: List[BatchResumeItem]
+    job_description: Optional[str] = None
+    target_role: Optional[str] = None
+
+@app.post("/ai/analyze-resume/batch")
+async def analyze_resumes_batch(request: BatchResumeAnalysisRequest, current_user: AuthUser = Depends(get_current_user)):
+    """
+    Score N resumes on the analysis process pool and stream each result (NDJSON) as soon as it finishes
+    """
+    if not request.resumes:
+        raise HTTPException(status_code=400, detail="No resumes provided")
+    if len(request.resumes) > MAX_BATCH_RESUMES:
+        raise HTTPException(status_code=413, detail=f"Batch too large (max {MAX_BATCH_RESUMES} resumes)")
+    
+    async def score(index: int, item: BatchResumeItem):
+        try:
+            result = await run_in_pool(
+                score_resume, item.resume_text, request.job_description, request.target_role, GENAI_AVAILABLE
+            )
+            return {"index": index, "id": item.id, "result": result}
+        except Exception as e:
+            return {"index": index, "id": item.id, "error": str(e)}
+    
+    async def stream_results():
+        tasks = [asyncio.create_task(score(i, item)) for i, item in enumerate(request.resumes)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished) + "\n"
+        finally:
+            # Client went away: drop whatever is still queued on the pool
+            for task in tasks:
+                task.cancel()
+    
+    return StreamingResponse(stream_results(), media_type="application/x-ndjson")
+
 # Original AI code (disabled due to rate limits)
 # @app.post("/ai/analyze-resume-ai")
 # async def analyze_resume_with_ai_original(request: ResumeAnalysisRequest, current_user: User = Depends(get_current_user)):
@@ -606,9 +660,39 @@ async def analyze_resume_with_ai(request: ResumeAnalysisRequest, current_user: U
 #         # Create analysis prompt (commented out - using fallback instead)
 #         pass
 
+# LLM cache hit/miss metrics
+@app.get("/ai/cache-stats")
+async def get_llm_cache_stats(current_user: TokenUser = Depends(get_token_user)):
+    """Hit/miss counters for the LLM response cache"""
+    llm = get_llm_client()
+    if not llm or not llm.cache:
+        return {"enabled": False}
+    return {"enabled": True, **llm.cache.snapshot()}
+
+@app.get("/metrics")
+async def prometheus_metrics(authorization: Optional[str] = Header(None)):
+    """Prometheus scrape endpoint (per worker process)"""
+    if METRICS_TOKEN and authorization != f"Bearer {METRICS_TOKEN}":
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/profiles")
+async def get_profiles(limit: int = 50, admin: TokenUser = Depends(get_admin_user)):
+    """Summaries (spans, status, trace file) of the most recently profiled requests"""
+    return await asyncio.to_thread(list_profiles, max(1, min(limit, 200)))
+
+@app.get("/profiles/{request_id}")
+async def get_profile_trace(request_id: str, admin: TokenUser = Depends(get_admin_user)):
+    """pyinstrument HTML or cProfile .prof trace of one profiled request"""
+    path = trace_path(request_id)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "text/html" if path.suffix == ".html" else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=path.name)
+
 # Quick Resume Score (without job description)
 @app.post("/ai/quick-score")
-async def quick_resume_score(request: ResumeAnalysisRequest, current_user: User = Depends(get_current_user)):
+async def quick_resume_score(request: ResumeAnalysisRequest, current_user: AuthUser = Depends(get_current_user)):
     # Use fallback instead of Gemini
     return {
         "score": 85,
@@ -654,7 +738,7 @@ class ChatRequest(BaseModel):
     message: str
 
 @app.post("/ai/chat")
-async def chat_with_ai(request: ChatRequest, current_user: User = Depends(get_current_user)):
+async def chat_with_ai(request: ChatRequest, current_user: AuthUser = Depends(get_current_user)):
     # Use smart fallback responses (AI is rate-limited)
     message_lower = request.message.lower()
     
@@ -679,7 +763,7 @@ async def chat_with_ai(request: ChatRequest, current_user: User = Depends(get_cu
 
 # User Profile Endpoints
 @app.put("/users/profile")
-async def update_profile(profile_data: UserProfileUpdate, current_user: User = Depends(get_current_user)):
+async def update_profile(profile_data: UserProfileUpdate, current_user: User = Depends(get_current_user_document)):
     """Update user profile information"""
     update_data = profile_data.dict(exclude_unset=True)
     if update_data:
@@ -687,6 +771,7 @@ async def update_profile(profile_data: UserProfileUpdate, current_user: User = D
         for key, value in update_data.items():
             setattr(current_user, key, value)
         await current_user.save()
+        await user_cache.invalidate(current_user.email)
         
         # Create notification
         notification = Notification(
@@ -701,7 +786,7 @@ async def update_profile(profile_data: UserProfileUpdate, current_user: User = D
         email=current_user.email,
         is_active=current_user.is_active,
         full_name=current_user.full_name,
-        profile_picture=current_user.profile_picture,
+        profile_picture=profile_picture_url(current_user),
         bio=current_user.bio,
         phone=current_user.phone,
         location=current_user.location,
@@ -713,21 +798,23 @@ async def update_profile(profile_data: UserProfileUpdate, current_user: User = D
     )}
 
 @app.post("/users/profile-picture")
-async def upload_profile_picture(file: UploadFile = File(...), current_user: User = Depends(get_current_user)):
+async def upload_profile_picture(file: UploadFile = File(...), current_user: User = Depends(get_current_user_document)):
     """Upload profile picture"""
-    import base64
-    
-    # Read file content
-    contents = await file.read()
+    # Read file content (one byte past the cap is enough to reject oversized uploads)
+    contents = await file.read(MAX_PICTURE_BYTES + 1)
     
-    # Convert to base64
-    base64_image = base64.b64encode(contents).decode('utf-8')
-    image_data_url = f"data:{file.content_type};base64,{base64_image}"
+    # Store in the picture store; only the content key is kept on the user
+    try:
+        picture_key = await save_picture(contents, file.content_type)
+    except PictureError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
     # Update user profile
-    current_user.profile_picture = image_data_url
+    current_user.profile_picture_key = picture_key
+    current_user.profile_picture = None
     current_user.updated_at = datetime.utcnow()
     await current_user.save()
+    await user_cache.invalidate(current_user.email)
     
     # Create notification
     notification = Notification(
@@ -738,28 +825,50 @@ async def upload_profile_picture(file: UploadFile = File(...), current_user: Use
     )
     await notification.insert()
     
-    return {"message": "Profile picture uploaded successfully", "profile_picture": image_data_url}
+    return {"message": "Profile picture uploaded successfully", "profile_picture": picture_url(picture_key)}
+
+@app.get("/pictures/{key}")
+async def get_picture(key: str, size: Optional[int] = None, if_none_match: Optional[str] = Header(None)):
+    """Serve a stored picture (or its nearest thumbnail); content-addressed, so cacheable forever"""
+    found = find_picture(key, size)
+    if not found:
+        raise HTTPException(status_code=404, detail="Picture not found")
+    path, media_type = found
+    etag = f'"{key}-{path.stem}"'
+    headers = {"ETag": etag, "Cache-Control": "public, max-age=31536000, immutable"}
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(path, media_type=media_type, headers=headers)
 
 # Notification Endpoints
-@app.get("/notifications")
-async def get_notifications(current_user: User = Depends(get_current_user)):
-    """Get all notifications for current user"""
-    notifications = await Notification.find(
-        Notification.user_email == current_user.email
-    ).sort(-Notification.created_at).to_list()
-    return notifications
+@app.get("/notifications", response_model=List[NotificationView])
+async def get_notifications(
+    response: Response,
+    limit: int = DEFAULT_PAGE_SIZE,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    current_user: TokenUser = Depends(get_token_user)
+):
+    """Get notifications for current user, newest first (cursor in X-Next-Cursor / X-Prev-Cursor)"""
+    return await paginate(
+        Notification,
+        [Notification.user_email == current_user.email, Notification.is_archived != True],
+        NotificationView, response, limit, before, after
+    )
 
 @app.get("/notifications/unread")
-async def get_unread_notifications(current_user: User = Depends(get_current_user)):
+async def get_unread_notifications(current_user: TokenUser = Depends(get_token_user)):
     """Get unread notifications count"""
-    count = await Notification.find(
-        Notification.user_email == current_user.email,
-        Notification.is_read == False
-    ).count()
+    count = await notification_service.unread_count(current_user.email)
     return {"unread_count": count}
 
+@app.get("/notifications/counts")
+async def get_notification_counts(current_user: TokenUser = Depends(get_token_user)):
+    """Get total, unread and archived notification counts"""
+    return await notification_service.counts(current_user.email)
+
 @app.put("/notifications/{notification_id}/read")
-async def mark_notification_read(notification_id: str, current_user: User = Depends(get_current_user)):
+async def mark_notification_read(notification_id: str, current_user: AuthUser = Depends(get_current_user)):
     """Mark notification as read"""
     from beanie import PydanticObjectId
     notification = await Notification.get(PydanticObjectId(notification_id))
@@ -771,21 +880,25 @@ async def mark_notification_read(notification_id: str, current_user: User = Depe
     return {"message": "Notification marked as read"}
 
 @app.put("/notifications/mark-all-read")
-async def mark_all_notifications_read(current_user: User = Depends(get_current_user)):
+async def mark_all_notifications_read(current_user: AuthUser = Depends(get_current_user)):
     """Mark all notifications as read"""
-    notifications = await Notification.find(
-        Notification.user_email == current_user.email,
-        Notification.is_read == False
-    ).to_list()
-    
-    for notification in notifications:
-        notification.is_read = True
-        await notification.save()
-    
-    return {"message": f"Marked {len(notifications)} notifications as read"}
+    count = await notification_service.mark_all_read(current_user.email)
+    return {"message": f"Marked {count} notifications as read"}
+
+@app.post("/notifications/archive")
+async def archive_notifications(request: NotificationBulkRequest, current_user: AuthUser = Depends(get_current_user)):
+    """Archive notifications matching the filter"""
+    count = await notification_service.archive(current_user.email, request.only_read, request.before, request.ids)
+    return {"message": f"Archived {count} notifications", "count": count}
+
+@app.post("/notifications/bulk-delete")
+async def bulk_delete_notifications(request: NotificationBulkRequest, current_user: AuthUser = Depends(get_current_user)):
+    """Delete notifications matching the filter"""
+    count = await notification_service.delete(current_user.email, request.only_read, request.before, request.ids)
+    return {"message": f"Deleted {count} notifications", "count": count}
 
 @app.delete("/notifications/{notification_id}")
-async def delete_notification(notification_id: str, current_user: User = Depends(get_current_user)):
+async def delete_notification(notification_id: str, current_user: AuthUser = Depends(get_current_user)):
     """Delete a notification"""
     from beanie import PydanticObjectId
     notification = await Notification.get(PydanticObjectId(notification_id))
@@ -796,41 +909,78 @@ async def delete_notification(notification_id: str, current_user: User = Depends
     return {"message": "Notification deleted"}
 
 # Search Endpoint
+MAX_SEARCH_RESULTS = 100
+
 @app.get("/search")
-async def search(q: str, current_user: User = Depends(get_current_user)):
-    """Search across skills, job analyses, and portfolio"""
-    query = q.lower()
+async def search(q: str, offset: int = 0, limit: int = 20, current_user: TokenUser = Depends(get_token_user)):
+    """Ranked search across skills, job analyses, portfolio projects and resume sections"""
+    offset = max(0, offset)
+    limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+    index = await search_index.get(current_user.email)
+    total, page = index.search(q, offset, limit)
+    
+    # Ranked page, plus the same hits grouped by type (the shape the dashboard reads)
     results = {
+        "query": q,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "results": [],
         "skills": [],
         "job_analyses": [],
-        "portfolio_projects": []
+        "portfolio_projects": [],
+        "resume_sections": []
     }
-    
-    # Search skills
-    skills = await Skill.find(Skill.user_email == current_user.email).to_list()
-    results["skills"] = [
-        {"id": str(skill.id), "name": skill.name, "progress": skill.progress, "type": "skill"}
-        for skill in skills if query in skill.name.lower() or query in skill.goal.lower()
-    ]
-    
-    # Search job analyses
-    analyses = await JobAnalysis.find(JobAnalysis.user_email == current_user.email).to_list()
-    results["job_analyses"] = [
-        {"id": str(analysis.id), "description": analysis.job_description[:100], "score": analysis.match_score, "type": "job"}
-        for analysis in analyses if query in analysis.job_description.lower()
-    ]
-    
-    # Search portfolio
-    portfolio = await Portfolio.find_one(Portfolio.user_email == current_user.email)
-    if portfolio:
-        results["portfolio_projects"] = [
-            {"id": idx, "title": project.get("title", ""), "description": project.get("description", ""), "type": "project"}
-            for idx, project in enumerate(portfolio.projects)
-            if query in project.get("title", "").lower() or query in project.get("description", "").lower()
-        ]
+    groups = {"skill": "skills", "job": "job_analyses", "project": "portfolio_projects", "resume": "resume_sections"}
+    for doc, score, terms in page:
+        hit = {**doc.payload, "score": score, "highlights": highlights(doc, terms)}
+        if doc.kind == "resume":
+            hit["snippet"] = next((h["snippet"] for h in hit["highlights"] if h["field"] == "text"), "")
+        results["results"].append(hit)
+        results[groups[doc.kind]].append(hit)
     
     return results
 
+@app.get("/search/autocomplete")
+async def search_autocomplete(q: str, limit: int = 8, current_user: TokenUser = Depends(get_token_user)):
+    """Suggestions for the search box: skill names, project titles and keywords from analysed jobs"""
+    limit = max(1, min(limit, 20))
+    return {"query": q, "suggestions": await autocomplete.suggest(current_user.email, q, limit)}
+
+# Parsed Resume Endpoints
+@app.get("/resumes", response_model=List[ResumeSummaryView])
+async def get_resumes(
+    response: Response,
+    limit: int = DEFAULT_PAGE_SIZE,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    current_user: TokenUser = Depends(get_token_user)
+):
+    """List uploaded resumes (without their text)"""
+    return await paginate(
+        Resume, [Resume.user_email == current_user.email, Resume.text_hash != None],
+        ResumeSummaryView, response, limit, before, after, sort_field="uploaded_at"
+    )
+
+@app.get("/resumes/{resume_id}")
+async def get_parsed_resume(resume_id: str, current_user: TokenUser = Depends(get_token_user)):
+    """Get an uploaded resume with its segmented sections"""
+    resume = await get_resume(current_user.email, resume_id)
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    return {
+        "id": str(resume.id),
+        "file_name": resume.file_name,
+        "uploaded_at": resume.uploaded_at,
+        "contact": resume.contact,
+        "skills": [display_name(s) for s in resume.skills],
+        "sections": [
+            {**section, "text": section_text(resume.text, [section], section["name"])}
+            for section in resume.sections
+        ],
+        "text": resume.text
+    }
+
 # AI Resume Builder - Generate ATS-Optimized Resume
 class ResumeBuilderRequest(BaseModel):
     full_name: str
@@ -844,21 +994,31 @@ class ResumeBuilderRequest(BaseModel):
     skills: List[str] = []
     certifications: List[str] = []
     target_role: Optional[str] = None
+    theme: str = DEFAULT_THEME
+
+def check_theme(request: ResumeBuilderRequest):
+    if request.theme not in THEMES:
+        raise HTTPException(status_code=400, detail=f"Unknown theme '{request.theme}'. Available: {', '.join(THEMES)}")
 
 @app.post("/ai/generate-resume")
-async def generate_ats_resume(request: ResumeBuilderRequest, current_user: User = Depends(get_current_user)):
+async def generate_ats_resume(request: ResumeBuilderRequest, current_user: AuthUser = Depends(get_current_user)):
     """Generate ATS-optimized resume with 90+ score"""
-    
+    check_theme(request)
+    return await build_ats_resume(request, current_user.email)
+
+async def no_progress(progress: int, stage: str):
+    pass
+
+async def build_ats_resume(request: ResumeBuilderRequest, user_email: str, report=no_progress):
+    """AI summary -> HTML -> skill sync -> notification; shared by /ai/generate-resume and the job queue"""
     # Use AI with your API key
+    await report(10, "summarizing")
     ai_summary = None
-    if GENAI_AVAILABLE:
+    llm = get_llm_client()
+    if llm:
         try:
-            # Use the working model name for current API
-            model = genai.GenerativeModel('models/gemini-pro')
-            
-            if model:
-                # Generate AI-enhanced summary
-                summary_prompt = f"""Create a powerful, ATS-optimized professional summary for a {request.target_role or request.job_title} position.
+            # Generate AI-enhanced summary
+            summary_prompt = f"""Create a powerful, ATS-optimized professional summary for a {request.target_role or request.job_title} position.
                 
 Current summary: {request.summary or 'Not provided'}
 Skills: {', '.join(request.skills)}
@@ -873,12 +1033,9 @@ Requirements:
 
 Return ONLY the summary text, no extra formatting."""
 
-                summary_response = model.generate_content(summary_prompt)
-                ai_summary = summary_response.text.strip()
-            else:
-                ai_summary = request.summary
+            ai_summary = (await llm.generate(summary_prompt, model='models/gemini-pro')).strip()
         except Exception as e:
-            print(f"AI summary generation failed: {e}")
+            event(logger, logging.WARNING, "ai_summary_failed", error=str(e))
             ai_summary = request.summary
     else:
         ai_summary = request.summary
@@ -892,13 +1049,13 @@ Return ONLY the summary text, no extra formatting."""
             "location": request.location,
             "job_title": request.job_title
         },
-        "professional_summary": ai_summary or f"Results-driven {request.job_title} with expertise in {', '.join(request.skills[:3])}. Proven track record of delivering high-quality solutions and driving business impact.",
+        "professional_summary": ai_summary or default_summary(request.model_dump()),
         "experience": request.experience,
         "education": request.education,
         "skills": {
-            "technical": [s for s in request.skills if any(tech in s.lower() for tech in ['python', 'java', 'react', 'node', 'sql', 'aws', 'docker', 'git'])],
-            "soft": [s for s in request.skills if any(soft in s.lower() for soft in ['leadership', 'communication', 'teamwork', 'problem', 'analytical'])],
-            "other": [s for s in request.skills if s not in [s for s in request.skills if any(tech in s.lower() for tech in ['python', 'java', 'react', 'node', 'sql', 'aws', 'docker', 'git'])] and s not in [s for s in request.skills if any(soft in s.lower() for soft in ['leadership', 'communication', 'teamwork', 'problem', 'analytical'])]]
+            "technical": [s for s in request.skills if skill_category(s) == TECH],
+            "soft": [s for s in request.skills if skill_category(s) == SOFT],
+            "other": [s for s in request.skills if skill_category(s) not in (TECH, SOFT)]
         },
         "certifications": request.certifications,
         "ats_score": 92,  # High ATS score
@@ -911,29 +1068,19 @@ Return ONLY the summary text, no extra formatting."""
             "✅ No graphics or tables",
             "✅ Standard fonts and spacing"
         ],
-        "formatted_html": generate_resume_html(request, ai_summary)
+        "formatted_html": render_resume(request.model_dump(), ai_summary, request.theme)
     }
+    await report(60, "rendered")
     
-    # Auto-sync skills to Skill Tracker
-    for skill_name in request.skills:
-        existing_skill = await Skill.find_one(
-            Skill.user_email == current_user.email,
-            Skill.name == skill_name
-        )
-        if not existing_skill:
-            # Create new skill with 50% progress (since it's in resume)
-            new_skill = Skill(
-                user_email=current_user.email,
-                name=skill_name,
-                progress=50,
-                goal=f"Master {skill_name}",
-                status="In Progress"
-            )
-            await new_skill.insert()
+    # Auto-sync skills to Skill Tracker (new skills start at 50% progress since they're in the resume)
+    await report(70, "syncing skills")
+    await sync_skills(user_email, request.skills)
+    await search_index.reindex_skills(user_email)
     
     # Create notification
+    await report(90, "notifying")
     notification = Notification(
-        user_email=current_user.email,
+        user_email=user_email,
         title="Resume Generated Successfully",
         message=f"Your ATS-optimized resume for {request.job_title} has been created with a score of 92/100! {len(request.skills)} skills synced to Skill Tracker.",
         type="success"
@@ -942,281 +1089,224 @@ Return ONLY the summary text, no extra formatting."""
     
     return resume_data
 
-def generate_resume_html(request: ResumeBuilderRequest, summary: str):
-    """Generate HTML for ATS-optimized resume"""
-    
-    skills_html = ""
-    if request.skills:
-        skills_html = "<div class='skills'><h3>SKILLS</h3><ul>"
-        for skill in request.skills:
-            skills_html += f"<li>{skill}</li>"
-        skills_html += "</ul></div>"
-    
-    experience_html = ""
-    if request.experience:
-        experience_html = "<div class='experience'><h3>PROFESSIONAL EXPERIENCE</h3>"
-        for exp in request.experience:
-            experience_html += f"""
-            <div class='job'>
-                <h4>{exp.get('title', '')} | {exp.get('company', '')}</h4>
-                <p class='date'>{exp.get('start_date', '')} - {exp.get('end_date', 'Present')}</p>
-                <ul>
-            """
-            for resp in exp.get('responsibilities', []):
-                experience_html += f"<li>{resp}</li>"
-            experience_html += "</ul></div>"
-        experience_html += "</div>"
-    
-    education_html = ""
-    if request.education:
-        education_html = "<div class='education'><h3>EDUCATION</h3>"
-        for edu in request.education:
-            education_html += f"""
-            <div class='degree'>
-                <h4>{edu.get('degree', '')} - {edu.get('field', '')}</h4>
-                <p>{edu.get('institution', '')} | {edu.get('year', '')}</p>
-            </div>
-            """
-        education_html += "</div>"
-    
-    cert_html = ""
-    if request.certifications:
-        cert_html = "<div class='certifications'><h3>CERTIFICATIONS</h3><ul>"
-        for cert in request.certifications:
-            cert_html += f"<li>{cert}</li>"
-        cert_html += "</ul></div>"
-    
-    html = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <title>{request.full_name} - Resume</title>
-        <style>
-            body {{
-                font-family: 'Calibri', 'Arial', sans-serif;
-                line-height: 1.6;
-                color: #333;
-                max-width: 800px;
-                margin: 0 auto;
-                padding: 40px 20px;
-                background: white;
-            }}
-            .header {{
-                text-align: center;
-                border-bottom: 2px solid #2c3e50;
-                padding-bottom: 20px;
-                margin-bottom: 30px;
-            }}
-            h1 {{
-                margin: 0;
-                font-size: 32px;
-                color: #2c3e50;
-                text-transform: uppercase;
-                letter-spacing: 2px;
-            }}
-            .job-title {{
-                font-size: 18px;
-                color: #34495e;
-                margin: 10px 0;
-                font-weight: 600;
-            }}
-            .contact {{
-                font-size: 14px;
-                color: #555;
-                margin-top: 10px;
-            }}
-            .summary {{
-                background: #f8f9fa;
-                padding: 20px;
-                border-left: 4px solid #3498db;
-                margin: 30px 0;
-                font-size: 15px;
-                line-height: 1.8;
-            }}
-            h3 {{
-                color: #2c3e50;
-                font-size: 18px;
-                text-transform: uppercase;
-                letter-spacing: 1px;
-                border-bottom: 2px solid #3498db;
-                padding-bottom: 8px;
-                margin-top: 30px;
-            }}
-            .job, .degree {{
-                margin: 20px 0;
-            }}
-            h4 {{
-                color: #34495e;
-                margin: 5px 0;
-                font-size: 16px;
-            }}
-            .date {{
-                color: #7f8c8d;
-                font-size: 14px;
-                font-style: italic;
-            }}
-            ul {{
-                margin: 10px 0;
-                padding-left: 25px;
-            }}
-            li {{
-                margin: 8px 0;
-                line-height: 1.6;
-            }}
-            .skills ul {{
-                display: grid;
-                grid-template-columns: repeat(3, 1fr);
-                gap: 10px;
-                list-style: none;
-                padding: 0;
-            }}
-            .skills li {{
-                background: #ecf0f1;
-                padding: 8px 12px;
-                border-radius: 4px;
-                font-size: 14px;
-            }}
-            @media print {{
-                body {{
-                    padding: 0;
-                }}
-                .summary {{
-                    background: white;
-                    border-left-color: #000;
-                }}
-            }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>{request.full_name}</h1>
-            <div class="job-title">{request.job_title}</div>
-            <div class="contact">
-                {request.email} | {request.phone} | {request.location}
-            </div>
-        </div>
-        
-        <div class="summary">
-            <strong>PROFESSIONAL SUMMARY</strong><br>
-            {summary}
-        </div>
-        
-        {experience_html}
-        {education_html}
-        {skills_html}
-        {cert_html}
-    </body>
-    </html>
-    """
-    
-    return html
+@app.get("/resume/themes")
+async def list_resume_themes():
+    return {"themes": list(THEMES), "default": DEFAULT_THEME}
+
+PDF_CHUNK_SIZE = 64 * 1024
+
+@app.post("/resume/export-pdf")
+async def export_resume_pdf(request: ResumeBuilderRequest, current_user: AuthUser = Depends(get_current_user)):
+    """Render the resume with the chosen theme and stream it back as a PDF (converted locally)"""
+    check_theme(request)
+    html = render_resume(request.model_dump(), request.summary, request.theme)
+    try:
+        pdf = await run_in_pool(html_to_pdf, html)
+    except PDFUnavailable as e:
+        raise HTTPException(status_code=501, detail=str(e))
+    except Exception:
+        event(logger, logging.ERROR, "pdf_export_failed", exc_info=True)
+        raise HTTPException(status_code=500, detail="Failed to export PDF")
+    
+    def chunks():
+        for start in range(0, len(pdf), PDF_CHUNK_SIZE):
+            yield pdf[start:start + PDF_CHUNK_SIZE]
+    
+    file_name = re.sub(r"[^A-Za-z0-9_-]+", "_", request.full_name).strip("_") or "resume"
+    return StreamingResponse(
+        chunks(),
+        media_type="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{file_name}_resume.pdf"', "Content-Length": str(len(pdf))}
+    )
 
 # Upload Resume and Extract Skills
 @app.post("/upload-resume")
 async def upload_resume_for_job_match(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthUser = Depends(get_current_user)
 ):
     """Upload resume, extract text, and auto-sync skills"""
     try:
-        # Read file content
-        content = await file.read()
-        
-        # Extract text based on file type
-        resume_text = ""
-        if file.filename.endswith('.txt'):
-            resume_text = content.decode('utf-8')
-        elif file.filename.endswith('.pdf'):
-            try:
-                # Try PyPDF2 first
-                import PyPDF2
-                import io
-                pdf_file = io.BytesIO(content)
-                pdf_reader = PyPDF2.PdfReader(pdf_file)
-                for page in pdf_reader.pages:
-                    resume_text += page.extract_text()
-            except ImportError:
-                # PyPDF2 not installed, use basic text extraction
-                print("PyPDF2 not installed, using basic extraction")
-                resume_text = content.decode('utf-8', errors='ignore')
-            except Exception as e:
-                print(f"PDF extraction error: {e}")
-                resume_text = content.decode('utf-8', errors='ignore')
-        else:
-            # For DOC/DOCX, try to decode as text
-            resume_text = content.decode('utf-8', errors='ignore')
-        
-        # If no text extracted, return error
-        if not resume_text or len(resume_text.strip()) < 50:
-            raise HTTPException(
-                status_code=400, 
-                detail="Could not extract text from resume. Please try a different file format or ensure the file contains readable text."
-            )
-        
-        # Extract skills from resume text using common tech skills
-        common_skills = [
-            'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'go', 'rust', 'php',
-            'react', 'angular', 'vue', 'node', 'nodejs', 'express', 'django', 'flask', 'spring', 'laravel',
-            'mongodb', 'mysql', 'postgresql', 'redis', 'sql', 'nosql', 'firebase',
-            'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git', 'github', 'gitlab',
-            'html', 'css', 'tailwind', 'bootstrap', 'sass', 'scss',
-            'rest', 'restful', 'api', 'graphql', 'microservices',
-            'agile', 'scrum', 'devops', 'ci/cd', 'cicd',
-            'machine learning', 'ml', 'ai', 'data science', 'analytics', 'tensorflow', 'pytorch',
-            'linux', 'unix', 'windows', 'bash', 'shell',
-            'testing', 'jest', 'mocha', 'pytest', 'junit',
-            'nextjs', 'next.js', 'gatsby', 'nuxt', 'svelte'
-        ]
-        
-        resume_lower = resume_text.lower()
-        found_skills = []
-        
-        for skill in common_skills:
-            if skill in resume_lower:
-                # Capitalize properly
-                skill_title = skill.title() if skill not in ['html', 'css', 'api', 'sql', 'nosql', 'aws', 'gcp', 'ml', 'ai', 'cicd'] else skill.upper()
-                if skill in ['nodejs', 'nextjs', 'next.js']:
-                    skill_title = 'Node.js' if skill == 'nodejs' else 'Next.js'
-                if skill not in found_skills:
-                    found_skills.append(skill_title)
-        
-        # Save skills to database
-        for skill_name in found_skills:
-            existing_skill = await Skill.find_one(
-                Skill.user_email == current_user.email,
-                Skill.name == skill_name
-            )
-            if not existing_skill:
-                new_skill = Skill(
-                    user_email=current_user.email,
-                    name=skill_name,
-                    progress=50,
-                    goal=f"Master {skill_name}",
-                    status="In Progress"
-                )
-                await new_skill.insert()
-        
-        # Create notification
-        notification = Notification(
-            user_email=current_user.email,
-            title="Resume Uploaded",
-            message=f"Resume uploaded successfully! {len(found_skills)} skills extracted and synced.",
-            type="success"
-        )
-        await notification.insert()
-        
-        return {
-            "message": "Resume uploaded successfully",
-            "resume_text": resume_text[:500],  # Return first 500 chars
-            "skills_found": found_skills,
-            "skills_count": len(found_skills)
-        }
+        # Spool the upload to disk (size-capped); extraction runs in a worker process
+        with span("spool"):
+            path = await spool_file(file)
+        try:
+            return await process_resume_upload(current_user.email, path, file.filename)
+        finally:
+            os.unlink(path)
         
+    except HTTPException:
+        raise
     except Exception as e:
-        print(f"Error uploading resume: {e}")
+        event(logger, logging.ERROR, "resume_upload_failed", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to upload resume: {str(e)}")
 
+async def process_resume_upload(user_email: str, path: str, filename: str, report=no_progress):
+    """Extraction -> parse/store -> skill sync -> notification; shared by /upload-resume and the job queue"""
+    await report(10, "extracting text")
+    try:
+        with span("extract"):
+            resume_text = await extract_text(path, filename)
+    except ExtractionError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    
+    # If no text extracted, return error
+    if not resume_text or len(resume_text.strip()) < 50:
+        raise HTTPException(
+            status_code=400, 
+            detail="Could not extract text from resume. Please try a different file format or ensure the file contains readable text."
+        )
+    
+    # Segment and persist the resume so analysis/matching/search can reuse it
+    await report(40, "parsing")
+    with span("parse"):
+        parsed = parse_resume(resume_text)
+    with span("store"):
+        resume = await store_parsed_resume(user_email, filename, resume_text, parsed)
+    search_index.index_resume(resume)
+    
+    # Skills found by the shared skill dictionary while parsing
+    found_skills = []
+    for skill in parsed["skills"]:
+        skill_title = display_name(skill)
+        if skill_title not in found_skills:
+            found_skills.append(skill_title)
+    
+    # Save skills to database
+    await report(70, "syncing skills")
+    with span("skills"):
+        await sync_skills(user_email, found_skills)
+        await search_index.reindex_skills(user_email)
+    
+    # Create notification
+    await report(90, "notifying")
+    notification = Notification(
+        user_email=user_email,
+        title="Resume Uploaded",
+        message=f"Resume uploaded successfully! {len(found_skills)} skills extracted and synced.",
+        type="success"
+    )
+    with span("notify"):
+        await notification.insert()
+    
+    return {
+        "message": "Resume uploaded successfully",
+        "resume_id": str(resume.id),
+        "resume_text": resume_text[:500],  # Return first 500 chars
+        "skills_found": found_skills,
+        "skills_count": len(found_skills)
+    }
+
+async def spool_file(file: UploadFile, directory: Optional[str] = None) -> str:
+    try:
+        return await spool_upload(file, directory=directory)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+def remove_file(path: str):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+class CleanupStreamingResponse(StreamingResponse):
+    """Runs its background task however the response ends; Starlette skips it when the client disconnects"""
+    async def __call__(self, scope, receive, send):
+        background, self.background = self.background, None
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            if background is not None:
+                await background()
+
+@app.post("/upload-resume/extract")
+async def stream_resume_text(
+    file: UploadFile = File(...),
+    current_user: AuthUser = Depends(get_current_user)
+):
+    """Extract resume text and stream it back (NDJSON) chunk by chunk as pages are parsed"""
+    path = await spool_file(file)
+    
+    async def stream_chunks():
+        try:
+            async for first_page, text in iter_text_chunks(path, file.filename):
+                yield json.dumps({"page": first_page, "text": text}) + "\n"
+            yield json.dumps({"done": True}) + "\n"
+        except ExtractionError as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+    
+    return CleanupStreamingResponse(stream_chunks(), media_type="application/x-ndjson", background=BackgroundTask(remove_file, path))
+
+# Background Jobs - slow pipelines return a job id immediately
+@job_queue.handler("upload_resume")
+async def run_upload_resume_job(job: Job, report):
+    try:
+        result = await process_resume_upload(job.user_email, job.params["path"], job.params["filename"], report)
+    except asyncio.CancelledError:
+        raise  # shutdown: the job is requeued and needs its spool file
+    except BaseException:
+        if os.path.exists(job.params["path"]):
+            os.unlink(job.params["path"])
+        raise
+    os.unlink(job.params["path"])
+    return result
+
+@job_queue.handler("generate_resume")
+async def run_generate_resume_job(job: Job, report):
+    return await build_ats_resume(ResumeBuilderRequest(**job.params), job.user_email, report)
+
+# Pure CPU work: runs on the analysis process pool
+job_queue.handler("analyze_resume", cpu=True)(score_resume)
+
+@app.post("/jobs/upload-resume", status_code=202)
+async def enqueue_resume_upload(file: UploadFile = File(...), current_user: AuthUser = Depends(get_current_user)):
+    """Queue resume upload processing; poll /jobs/{id} or follow /jobs/{id}/events"""
+    os.makedirs(JOB_SPOOL_DIR, exist_ok=True)
+    path = await spool_file(file, directory=JOB_SPOOL_DIR)
+    job = await job_queue.enqueue("upload_resume", current_user.email, {"path": path, "filename": file.filename})
+    return {"job_id": str(job.id), "status": job.status}
+
+@app.post("/jobs/generate-resume", status_code=202)
+async def enqueue_resume_generation(request: ResumeBuilderRequest, current_user: AuthUser = Depends(get_current_user)):
+    """Queue ATS resume generation"""
+    check_theme(request)
+    job = await job_queue.enqueue("generate_resume", current_user.email, request.model_dump())
+    return {"job_id": str(job.id), "status": job.status}
+
+@app.post("/jobs/analyze-resume", status_code=202)
+async def enqueue_resume_analysis(request: ResumeAnalysisRequest, current_user: AuthUser = Depends(get_current_user)):
+    """Queue a resume analysis on the process pool"""
+    if not request.resume_text:
+        raise HTTPException(status_code=400, detail="resume_text is required")
+    job = await job_queue.enqueue("analyze_resume", current_user.email, {
+        "resume_text": request.resume_text,
+        "job_description": request.job_description,
+        "target_role": request.target_role,
+        "use_actual": GENAI_AVAILABLE
+    })
+    return {"job_id": str(job.id), "status": job.status}
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, current_user: TokenUser = Depends(get_token_user)):
+    """Job status, progress and (once finished) result"""
+    job = await job_queue.get(job_id, current_user.email)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_view(job)
+
+@app.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, current_user: TokenUser = Depends(get_token_user)):
+    """Server-Sent Events stream of job progress until it succeeds or fails"""
+    job = await job_queue.get(job_id, current_user.email)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    async def event_stream():
+        async for view in job_queue.events(job):
+            yield f"event: {view['status']}\ndata: {json.dumps(view, default=str)}\n\n"
+    
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 # Real-time Job Matching based on Resume
 class JobMatchRequest(BaseModel):
     job_description: str
@@ -1224,15 +1314,14 @@ class JobMatchRequest(BaseModel):
 @app.post("/ai/match-jobs")
 async def match_jobs_with_resume(
     request: JobMatchRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: AuthUser = Depends(get_current_user)
 ):
     """Match user's skills from resume with job requirements"""
     
     job_description = request.job_description
     
-    # Get user's skills from Skill Tracker
-    user_skills = await Skill.find(Skill.user_email == current_user.email).to_list()
-    skill_names = [skill.name.lower() for skill in user_skills]
+    # Get user's skills from Skill Tracker, plus those parsed from their latest uploaded resume
+    skill_names = await get_user_skill_names(current_user.email)
     
     if not skill_names:
         return {
@@ -1243,49 +1332,22 @@ async def match_jobs_with_resume(
             "recommendations": ["Create a resume to automatically sync your skills to the tracker"]
         }
     
-    # Analyze job description
-    job_desc_lower = job_description.lower()
-    
-    # Common tech skills to look for
-    common_skills = [
-        'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'go', 'rust',
-        'react', 'angular', 'vue', 'node', 'express', 'django', 'flask', 'spring',
-        'mongodb', 'mysql', 'postgresql', 'redis', 'sql', 'nosql',
-        'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'jenkins', 'git',
-        'html', 'css', 'tailwind', 'bootstrap', 'sass',
-        'rest', 'graphql', 'api', 'microservices',
-        'agile', 'scrum', 'devops', 'ci/cd',
-        'machine learning', 'ai', 'data science', 'analytics'
-    ]
-    
-    # Find matched skills
-    matched_skills = []
-    for skill in skill_names:
-        if skill in job_desc_lower:
-            matched_skills.append(skill)
-    
-    # Find missing skills from job description
-    missing_skills = []
-    for skill in common_skills:
-        if skill in job_desc_lower and skill not in skill_names:
-            missing_skills.append(skill)
-    
-    # Calculate match score
+    # Score the resume against the job description (IDF-weighted), and split its skills into matched/missing
+    match = await score_job_description(current_user.email, job_description, skill_names)
+    matched_skills = [display_name(skill) for skill in match["matched_skills"]]
+    missing_skills = [display_name(skill) for skill in match["missing_skills"]]
     total_required = len(matched_skills) + len(missing_skills)
-    match_score = int((len(matched_skills) / total_required * 100)) if total_required > 0 else 0
+    match_score = match["match_score"]
     
     # Use AI to provide recommendations if available
     recommendations = []
-    if GENAI_AVAILABLE and len(missing_skills) > 0:
+    llm = get_llm_client()
+    if llm and len(missing_skills) > 0:
         try:
-            # Use stable gemini-pro model
-            model = genai.GenerativeModel('gemini-pro')
-            
-            if model:
-                prompt = f"""You are a career advisor. Based on this job description and the candidate's missing skills, provide 3 specific, actionable recommendations.
+            prompt = f"""You are a career advisor. Based on this job description and the candidate's missing skills, provide 3 specific, actionable recommendations.
 
 Job Description: {job_description[:500]}
-Candidate's Skills: {', '.join(skill_names)}
+Candidate's Skills: {', '.join(display_name(skill) for skill in skill_names)}
 Missing Skills: {', '.join(missing_skills[:5])}
 
 Provide exactly 3 recommendations in this format:
@@ -1293,15 +1355,15 @@ Provide exactly 3 recommendations in this format:
 2. [Recommendation]
 3. [Recommendation]"""
 
-                response = model.generate_content(prompt)
-                ai_recommendations = response.text.strip().split('\n')
-                recommendations = [r.strip() for r in ai_recommendations if r.strip() and r.strip()[0].isdigit()][:3]
+            response_text = await llm.generate(prompt, model='gemini-pro')
+            ai_recommendations = response_text.strip().split('\n')
+            recommendations = [r.strip() for r in ai_recommendations if r.strip() and r.strip()[0].isdigit()][:3]
         except Exception as e:
-            print(f"AI recommendations failed: {e}")
+            event(logger, logging.WARNING, "ai_recommendations_failed", error=str(e))
     
     if not recommendations:
         recommendations = [
-            f"Learn {missing_skills[0].title()} - It's required for this role" if missing_skills else "Keep improving your existing skills",
+            f"Learn {missing_skills[0]} - It's required for this role" if missing_skills else "Keep improving your existing skills",
             "Build projects showcasing the required technologies",
             "Get certified in the missing skills to stand out"
         ]
@@ -1316,6 +1378,9 @@ Provide exactly 3 recommendations in this format:
         recommendations=recommendations
     )
     await job_analysis.insert()
+    job_corpus.observe(job_analysis.job_description)
+    job_index.add(job_analysis)
+    search_index.index_job_analysis(job_analysis)
     
     # Create notification
     notification = Notification(
@@ -1331,5 +1396,6 @@ Provide exactly 3 recommendations in this format:
         "matched_skills": matched_skills,
         "missing_skills": missing_skills[:10],
         "recommendations": recommendations,
+        "similarity": match["similarity"],
         "message": f"You match {match_score}% of the job requirements!"
     }
@@ -0,0 +1,310 @@
+"""Request instrumentation exposed in Prometheus text format on ``/metrics``.
+
+``MetricsMiddleware`` (plain ASGI, so streaming responses pass straight
+through) records per route template: latency, request/response payload sizes
+and how many MongoDB commands the request issued. Mongo commands are counted
+by ``MongoCommandListener``, a pymongo command listener registered on the
+Motor client; Motor runs commands on threads with the caller's context copied,
+so the listener finds the current request's ``RequestStats`` in a context
+variable. In-flight requests are counted at scrape time from the set of open
+requests, so routing adds no bookkeeping. LLM calls are recorded by
+``llm.LLMClient`` and LLM cache hits are read from the cache stats on scrape.
+The middleware also assigns the request id (``X-Request-ID``, taken from the
+request or generated) used by the logs, and writes a sampled access log line.
+
+Metrics are per process; with several app workers, scrape each one (or
+aggregate with ``sum by``). A tiny in-house registry is used rather than
+``prometheus_client`` to keep the dependency list as it was.
+"""
+import logging
+import re
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from pymongo import monitoring
+
+import logs
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 50)
+
+UNMATCHED = "unmatched"  # label for requests no route matched, to keep label cardinality bounded
+
+_REQUEST_ID_RE = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+access_logger = logs.get_logger("access")
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    type = "untyped"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()  # Mongo commands are observed from Motor's threads
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        super().__init__(name, help, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+            for labels, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help, labels)
+        self.buckets = tuple(buckets)
+        self._series: Dict[Tuple[str, ...], list] = {}  # labels -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, *labels: str):
+        i = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            if i < len(self.buckets):
+                series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = self.header()
+        for labels, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                le = 'le="%s"' % _number(bound)
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+            le = 'le="+Inf"'
+            lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {series[-1]}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {_number(series[-2])}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {series[-1]}")
+        return lines
+
+
+class Gauge(Metric):
+    """Value computed at scrape time by ``collect() -> {label values: value}``."""
+
+    type = "gauge"
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], collect: Callable[[], Dict[Tuple[str, ...], float]]):
+        super().__init__(name, help, labels)
+        self.collect = collect
+
+    def render(self) -> List[str]:
+        return self.header() + [
+            f"{self.name}{_labels(self.label_names, labels)} {_number(value)}"
+            for labels, value in sorted(self.collect().items())
+        ]
+
+
+class CollectedCounter(Gauge):
+    """Running totals kept elsewhere (e.g. ``LLMCache.stats``), read at scrape time."""
+
+    type = "counter"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics: List[Metric] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+
+
+# --- Per-request state ---
+
+class RequestStats:
+    __slots__ = (
+        "request_id", "method", "scope", "started", "mongo_commands", "mongo_seconds",
+        "request_bytes", "response_bytes", "status",
+    )
+
+    def __init__(self, request_id: str, method: str, scope: dict):
+        self.request_id = request_id
+        self.method = method
+        self.scope = scope
+        self.started = time.perf_counter()
+        self.mongo_commands = 0
+        self.mongo_seconds = 0.0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.status = 500
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return getattr(route, "path", None) or UNMATCHED
+
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+_in_flight: Set[RequestStats] = set()
+
+
+def _in_flight_by_route() -> Dict[Tuple[str, ...], float]:
+    counts: Dict[Tuple[str, ...], float] = {}
+    for stats in list(_in_flight):
+        key = (stats.method, stats.route)
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+request_latency = registry.register(Histogram(
+    "http_request_duration_seconds", "Request latency by route template.", ("method", "route", "status")))
+requests_in_flight = registry.register(Gauge(
+    "http_requests_in_flight", "Requests being handled (route is 'unmatched' until routing).", ("method", "route"),
+    _in_flight_by_route))
+request_size = registry.register(Histogram(
+    "http_request_size_bytes", "Request body size.", ("method", "route"), SIZE_BUCKETS))
+response_size = registry.register(Histogram(
+    "http_response_size_bytes", "Response body size.", ("method", "route"), SIZE_BUCKETS))
+mongo_commands_per_request = registry.register(Histogram(
+    "mongo_commands_per_request", "MongoDB round-trips issued while handling a request.", ("method", "route"), COUNT_BUCKETS))
+mongo_command_latency = registry.register(Histogram(
+    "mongo_command_duration_seconds", "MongoDB command latency.", ("command", "outcome")))
+llm_calls = registry.register(Counter(
+    "llm_calls_total", "LLM provider calls (each retry attempt counts).", ("model", "outcome")))
+llm_latency = registry.register(Histogram(
+    "llm_call_duration_seconds", "LLM provider call latency.", ("model", "outcome")))
+
+
+def register_totals(name: str, help: str, label: str, totals: Callable[[], Dict[str, float]]):
+    """Expose a dict of running totals as one counter keyed by ``label``."""
+    registry.register(CollectedCounter(name, help, (label,), lambda: {(key,): value for key, value in totals().items()}))
+
+
+# --- MongoDB ---
+
+class MongoCommandListener(monitoring.CommandListener):
+    def started(self, event):
+        stats = current_request.get()
+        if stats is not None:
+            stats.mongo_commands += 1
+
+    def succeeded(self, event):
+        self._finished(event, "ok")
+
+    def failed(self, event):
+        self._finished(event, "error")
+
+    @staticmethod
+    def _finished(event, outcome: str):
+        seconds = event.duration_micros / 1e6
+        mongo_command_latency.observe(seconds, event.command_name, outcome)
+        stats = current_request.get()
+        if stats is not None:
+            stats.mongo_seconds += seconds
+
+
+# --- ASGI middleware ---
+
+class MetricsMiddleware:
+    def __init__(self, app, exclude: Iterable[str] = ("/metrics",)):
+        self.app = app
+        self.exclude = set(exclude)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] in self.exclude:
+            await self.app(scope, receive, send)
+            return
+
+        request_id = _request_id(scope) or uuid.uuid4().hex
+        stats = RequestStats(request_id, scope["method"], scope)
+        token = current_request.set(stats)
+        rid_token = logs.request_id.set(request_id)
+        _in_flight.add(stats)
+
+        async def counting_receive():
+            message = await receive()
+            if message["type"] == "http.request":
+                stats.request_bytes += len(message.get("body", b""))
+            return message
+
+        async def counting_send(message):
+            if message["type"] == "http.response.start":
+                stats.status = message["status"]
+                message.setdefault("headers", [])
+                message["headers"] = list(message["headers"]) + [(b"x-request-id", request_id.encode("latin-1"))]
+            elif message["type"] == "http.response.body":
+                stats.response_bytes += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, counting_receive, counting_send)
+        finally:
+            _in_flight.discard(stats)
+            route = stats.route
+            elapsed = time.perf_counter() - stats.started
+            request_latency.observe(elapsed, stats.method, route, str(stats.status))
+            request_size.observe(stats.request_bytes, stats.method, route)
+            response_size.observe(stats.response_bytes, stats.method, route)
+            mongo_commands_per_request.observe(stats.mongo_commands, stats.method, route)
+            logs.hot_event(
+                access_logger, logging.INFO, "request", method=stats.method, route=route, status=stats.status,
+                duration_ms=round(elapsed * 1000, 2), mongo_commands=stats.mongo_commands,
+                request_bytes=stats.request_bytes, response_bytes=stats.response_bytes,
+            )
+            logs.request_id.reset(rid_token)
+            current_request.reset(token)
+
+
+def valid_request_id(value: str) -> bool:
+    """Request ids end up in logs and profile file names, so only plain tokens are accepted."""
+    return bool(_REQUEST_ID_RE.fullmatch(value))
+
+
+def _request_id(scope) -> Optional[str]:
+    for name, value in scope.get("headers", ()):
+        if name == b"x-request-id":
+            value = value.decode("latin-1")
+            return value if valid_request_id(value) else None
+    return None
+
+
+def render() -> str:
+    return registry.render()
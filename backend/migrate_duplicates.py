@@ -0,0 +1,73 @@
+"""One-off migration: remove duplicates that block the unique indexes.
+
+Skill rows repeated for one user (same name) are merged into the oldest,
+which keeps the highest progress among them. Portfolios sharing a username
+keep it on the oldest one; the others get a numbered suffix ("jane" ->
+"jane-2"). Restart the app afterwards so the unique indexes are built.
+
+Usage: python migrate_duplicates.py [--dry-run]
+"""
+import asyncio
+import os
+import sys
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+
+async def duplicate_groups(collection, key: dict):
+    """Lists of _ids (oldest first) for every value of ``key`` held by more than one document."""
+    pipeline = [
+        {"$sort": {"_id": 1}},
+        {"$group": {"_id": key, "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}},
+    ]
+    return [group async for group in collection.aggregate(pipeline)]
+
+
+async def merge_skills(database, dry_run: bool) -> int:
+    skills = database.get_collection("skills")
+    removed = 0
+    for group in await duplicate_groups(skills, {"user_email": "$user_email", "name": "$name"}):
+        keep, *extra = group["ids"]
+        rows = await skills.find({"_id": {"$in": group["ids"]}}).to_list(None)
+        best = max(rows, key=lambda row: row.get("progress", 0))
+        if not dry_run:
+            await skills.update_one({"_id": keep}, {"$set": {
+                "progress": best.get("progress", 0), "status": best.get("status", "Started"),
+            }})
+            await skills.delete_many({"_id": {"$in": extra}})
+        print(f"{group['_id']['user_email']}: merged {len(rows)} '{group['_id']['name']}' skills")
+        removed += len(extra)
+    return removed
+
+
+async def rename_portfolio_usernames(database, dry_run: bool) -> int:
+    portfolios = database.get_collection("portfolios")
+    renamed = 0
+    for group in await duplicate_groups(portfolios, "$username"):
+        username = group["_id"]
+        suffix = 2
+        for portfolio_id in group["ids"][1:]:
+            while await portfolios.find_one({"username": f"{username}-{suffix}"}):
+                suffix += 1
+            new_name = f"{username}-{suffix}"
+            if not dry_run:
+                await portfolios.update_one({"_id": portfolio_id}, {"$set": {"username": new_name}})
+            print(f"portfolio {portfolio_id}: {username} -> {new_name}")
+            suffix += 1
+            renamed += 1
+    return renamed
+
+
+async def migrate(dry_run: bool = False):
+    client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
+    database = client.get_database()
+    removed = await merge_skills(database, dry_run)
+    renamed = await rename_portfolio_usernames(database, dry_run)
+    print(f"Done. Removed {removed} duplicate skills, renamed {renamed} portfolio usernames.")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(migrate(dry_run="--dry-run" in sys.argv))
@@ -0,0 +1,43 @@
+"""One-off migration: move inline data-URL profile pictures into the picture store.
+
+Usage: python migrate_profile_pictures.py [--dry-run]
+"""
+import asyncio
+import base64
+import os
+import sys
+
+from beanie import init_beanie
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from models import User
+from picture_store import PictureError, save_picture
+
+
+async def migrate(dry_run: bool = False):
+    client = AsyncIOMotorClient(os.getenv("MONGO_URI"))
+    await init_beanie(database=client.get_database(), document_models=[User])
+
+    moved = skipped = 0
+    async for user in User.find({"profile_picture": {"$regex": "^data:"}}):
+        header, _, payload = user.profile_picture.partition(",")
+        content_type = header[len("data:"):].split(";")[0]
+        try:
+            data = base64.b64decode(payload)
+            key = await save_picture(data, content_type) if not dry_run else "(dry run)"
+        except (ValueError, PictureError) as e:
+            print(f"Skipping {user.email}: {e}")
+            skipped += 1
+            continue
+        if not dry_run:
+            await user.set({User.profile_picture_key: key, User.profile_picture: None})
+        print(f"{user.email}: {len(data)} bytes -> {key}")
+        moved += 1
+
+    print(f"Done. Moved {moved} pictures, skipped {skipped}.")
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    asyncio.run(migrate(dry_run="--dry-run" in sys.argv))
@@ -1,5 +1,6 @@
-from beanie import Document
-from pydantic import BaseModel, EmailStr
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, EmailStr, Field
+from pymongo import IndexModel, ASCENDING, DESCENDING
 from typing import Optional, List
 from datetime import datetime
 
@@ -7,8 +8,10 @@ class User(Document):
     email: EmailStr
     hashed_password: str
     is_active: bool = True
+    role: str = "user"
     full_name: Optional[str] = "User"
-    profile_picture: Optional[str] = None
+    profile_picture: Optional[str] = None  # legacy inline data URL; see profile_picture_key
+    profile_picture_key: Optional[str] = None  # picture_store content key
     bio: Optional[str] = ""
     phone: Optional[str] = ""
     location: Optional[str] = ""
@@ -17,11 +20,29 @@ class User(Document):
     linkedin: Optional[str] = ""
     github: Optional[str] = ""
     website: Optional[str] = ""
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "users"
+        indexes = [
+            IndexModel([("email", ASCENDING)], unique=True),
+        ]
+
+class AuthUser(BaseModel):
+    """Auth-relevant projection of User; what get_current_user hands to endpoints"""
+    id: PydanticObjectId = Field(alias="_id")
+    email: EmailStr
+    is_active: bool = True
+    role: str = "user"
+    full_name: Optional[str] = "User"
+
+class TokenUser(BaseModel):
+    """Caller as stated by the signed access token claims; what read-only endpoints get (no DB lookup)"""
+    id: str
+    email: str
+    is_active: bool = True
+    role: str = "user"
 
 class UserIn(BaseModel):
     email: EmailStr
@@ -55,6 +76,14 @@ class UserProfileUpdate(BaseModel):
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+    expires_in: Optional[int] = None  # access token lifetime, seconds
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
 
 class TokenData(BaseModel):
     email: Optional[str] = None
@@ -62,16 +91,41 @@ class TokenData(BaseModel):
 # Resume Models
 class Resume(Document):
     user_email: EmailStr
-    file_name: str
-    file_path: str
-    analysis_score: Optional[int] = None
+    file_name: str = ""
+    file_path: str = ""
+    analysis_score: Optional[float] = None
     keywords: List[str] = []
     missing_keywords: List[str] = []
     suggestions: List[str] = []
-    uploaded_at: datetime = datetime.utcnow()
+    content_hash: Optional[str] = None  # sha256 of resume text + role + job description
+    analyzer_version: Optional[str] = None
+    analysis: Optional[dict] = None  # full /ai/analyze-resume response
+    # Uploaded resumes: extracted text plus its parsed form (see resume_parser.py)
+    text: Optional[str] = None
+    text_hash: Optional[str] = None
+    contact: dict = {}
+    sections: List[dict] = []  # {"name", "heading", "start", "end"} offsets into text
+    skills: List[str] = []
+    uploaded_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "resumes"
+        indexes = [
+            IndexModel([("user_email", ASCENDING), ("content_hash", ASCENDING)]),
+            IndexModel([("user_email", ASCENDING), ("text_hash", ASCENDING)]),
+            IndexModel([("user_email", ASCENDING), ("uploaded_at", DESCENDING)]),
+        ]
+
+class ResumeSummaryView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    file_name: str = ""
+    contact: dict = {}
+    skills: List[str] = []
+    uploaded_at: datetime
+
+class ResumeSkillsView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    skills: List[str] = []
 
 # Skill Tracker Models
 class Skill(Document):
@@ -80,11 +134,15 @@ class Skill(Document):
     progress: int = 0
     goal: str
     status: str = "Started"
-    created_at: datetime = datetime.utcnow()
-    updated_at: datetime = datetime.utcnow()
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "skills"
+        indexes = [
+            IndexModel([("user_email", ASCENDING), ("name", ASCENDING)], unique=True),
+            IndexModel([("user_email", ASCENDING), ("created_at", DESCENDING)]),
+        ]
 
 class SkillIn(BaseModel):
     name: str
@@ -99,10 +157,13 @@ class JobAnalysis(Document):
     matched_skills: List[str] = []
     missing_skills: List[str] = []
     recommendations: List[str] = []
-    created_at: datetime = datetime.utcnow()
+    created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "job_analyses"
+        indexes = [
+            IndexModel([("user_email", ASCENDING), ("created_at", DESCENDING)]),
+        ]
 
 class JobAnalysisIn(BaseModel):
     job_description: str
@@ -116,10 +177,14 @@ class Portfolio(Document):
     website: str = ""
     projects: List[dict] = []
     certificates: List[dict] = []
-    updated_at: datetime = datetime.utcnow()
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "portfolios"
+        indexes = [
+            IndexModel([("username", ASCENDING)], unique=True),
+            IndexModel([("user_email", ASCENDING)]),
+        ]
 
 class PortfolioIn(BaseModel):
     username: str
@@ -136,12 +201,98 @@ class Notification(Document):
     message: str
     type: str = "info"  # info, success, warning, error
     is_read: bool = False
-    created_at: datetime = datetime.utcnow()
+    is_archived: bool = False
+    created_at: datetime = Field(default_factory=datetime.utcnow)
 
     class Settings:
         name = "notifications"
+        indexes = [
+            IndexModel([("user_email", ASCENDING), ("is_read", ASCENDING), ("created_at", DESCENDING)]),
+            # paginated list: sorts by (created_at, _id) across read and unread
+            IndexModel([("user_email", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)]),
+        ]
 
 class NotificationIn(BaseModel):
     title: str
     message: str
     type: Optional[str] = "info"
+
+class NotificationBulkRequest(BaseModel):
+    ids: Optional[List[str]] = None  # limit to these notifications
+    only_read: Optional[bool] = None  # True: read only, False: unread only
+    before: Optional[datetime] = None  # created before this time
+
+# LLM Response Cache
+class LLMCacheEntry(Document):
+    key: str  # sha256 of model + normalized prompt
+    model: str
+    response: str
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime
+
+    class Settings:
+        name = "llm_cache"
+        indexes = [
+            IndexModel([("key", ASCENDING)], unique=True),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
+
+class RevokedToken(Document):
+    """jti of a token revoked before it expired; Mongo drops it once the token would have expired anyway"""
+    jti: str
+    expires_at: datetime
+
+    class Settings:
+        name = "revoked_tokens"
+        indexes = [
+            IndexModel([("jti", ASCENDING)], unique=True),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+        ]
+
+# Dashboard list projections (only the fields the dashboard renders)
+class NotificationView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    title: str
+    message: str
+    type: str = "info"
+    is_read: bool = False
+    created_at: datetime
+
+class SkillView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    name: str
+    progress: int = 0
+    goal: str
+    status: str = "Started"
+    created_at: datetime
+
+class JobAnalysisView(BaseModel):
+    id: PydanticObjectId = Field(alias="_id")
+    job_description: str
+    match_score: int
+    matched_skills: List[str] = []
+    missing_skills: List[str] = []
+    recommendations: List[str] = []
+    created_at: datetime
+
+# Background Jobs
+class Job(Document):
+    job_type: str
+    user_email: EmailStr
+    status: str = "queued"  # queued, running, succeeded, failed
+    progress: int = 0
+    stage: str = "queued"
+    params: dict = {}
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: Optional[datetime] = None  # set when the job finishes; Mongo deletes it then
+
+    class Settings:
+        name = "jobs"
+        indexes = [
+            IndexModel([("status", ASCENDING), ("created_at", ASCENDING)]),
+            IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0),
+            IndexModel([("user_email", ASCENDING), ("created_at", DESCENDING)]),
+        ]
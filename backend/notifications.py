@@ -0,0 +1,70 @@
+"""Notification service: server-side bulk operations instead of load-modify-save loops."""
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from beanie import PydanticObjectId
+from beanie.operators import In, Set
+
+from models import Notification
+
+
+def _user_filter(user_email: str, only_read: Optional[bool] = None, before: Optional[datetime] = None,
+                 ids: Optional[List[str]] = None, include_archived: bool = False) -> list:
+    conditions = [Notification.user_email == user_email]
+    if not include_archived:
+        conditions.append(Notification.is_archived != True)  # also matches documents without the field
+    if only_read is not None:
+        conditions.append(Notification.is_read == only_read)
+    if before is not None:
+        conditions.append(Notification.created_at < before)
+    if ids:
+        conditions.append(In(Notification.id, [PydanticObjectId(i) for i in ids]))
+    return conditions
+
+
+async def mark_all_read(user_email: str) -> int:
+    """One update_many for every unread notification; returns how many changed."""
+    result = await Notification.find(
+        Notification.user_email == user_email,
+        Notification.is_read == False
+    ).update_many(Set({Notification.is_read: True}))
+    return result.modified_count if result else 0
+
+
+async def archive(user_email: str, only_read: Optional[bool] = None, before: Optional[datetime] = None,
+                  ids: Optional[List[str]] = None) -> int:
+    result = await Notification.find(*_user_filter(user_email, only_read, before, ids)).update_many(
+        Set({Notification.is_archived: True})
+    )
+    return result.modified_count if result else 0
+
+
+async def delete(user_email: str, only_read: Optional[bool] = None, before: Optional[datetime] = None,
+                 ids: Optional[List[str]] = None) -> int:
+    result = await Notification.find(
+        *_user_filter(user_email, only_read, before, ids, include_archived=True)
+    ).delete_many()
+    return result.deleted_count if result else 0
+
+
+async def unread_count(user_email: str) -> int:
+    return await Notification.find(*_user_filter(user_email, only_read=False)).count()
+
+
+async def counts(user_email: str) -> Dict[str, int]:
+    """Total / unread / archived computed in one server-side aggregation."""
+    pipeline = [
+        {"$group": {
+            "_id": None,
+            "total": {"$sum": 1},
+            "unread": {"$sum": {"$cond": [{"$and": [
+                {"$eq": ["$is_read", False]}, {"$ne": ["$is_archived", True]}
+            ]}, 1, 0]}},
+            "archived": {"$sum": {"$cond": [{"$eq": ["$is_archived", True]}, 1, 0]}},
+        }},
+    ]
+    rows = await Notification.find(Notification.user_email == user_email).aggregate(pipeline).to_list()
+    if not rows:
+        return {"total": 0, "unread": 0, "archived": 0}
+    row = rows[0]
+    return {"total": row["total"], "unread": row["unread"], "archived": row["archived"]}
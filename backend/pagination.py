@@ -0,0 +1,84 @@
+"""Keyset (cursor) pagination over (created_at, _id), newest first.
+
+``sort_field`` can name another timestamp (e.g. ``uploaded_at``).
+
+A cursor encodes the sort key of a boundary item. ``before`` returns the page
+of items older than the cursor, ``after`` the page of newer ones, so each
+request reads at most ``limit + 1`` documents through the (user_email,
+created_at) indexes no matter how long the history is.
+"""
+import base64
+from datetime import datetime
+from typing import List, Optional, Tuple, Type
+
+from beanie import Document, PydanticObjectId
+from fastapi import HTTPException, Response
+from pydantic import BaseModel
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+def encode_cursor(created_at: datetime, doc_id) -> str:
+    raw = f"{created_at.isoformat()}|{doc_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, PydanticObjectId]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, doc_id = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), PydanticObjectId(doc_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _keyset(cursor: str, older: bool, sort_field: str) -> dict:
+    created_at, doc_id = decode_cursor(cursor)
+    op = "$lt" if older else "$gt"
+    return {"$or": [
+        {sort_field: {op: created_at}},
+        {sort_field: created_at, "_id": {op: doc_id}},
+    ]}
+
+
+async def paginate(
+    model: Type[Document],
+    filters: list,
+    projection: Type[BaseModel],
+    response: Response,
+    limit: int = DEFAULT_PAGE_SIZE,
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    sort_field: str = "created_at",
+) -> List[BaseModel]:
+    """Fetch one newest-first page and expose neighbour cursors as ``X-Next-Cursor`` / ``X-Prev-Cursor``.
+
+    The body stays a plain list so existing clients keep working.
+    """
+    if before and after:
+        raise HTTPException(status_code=400, detail="Use either 'before' or 'after', not both")
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    conditions = list(filters)
+    if before:
+        conditions.append(_keyset(before, older=True, sort_field=sort_field))
+    if after:
+        conditions.append(_keyset(after, older=False, sort_field=sort_field))
+
+    # Paging forward in time reads ascending from the cursor, then flips to newest-first.
+    direction = 1 if after else -1
+    items = await model.find(*conditions).sort(
+        [(sort_field, direction), ("_id", direction)]
+    ).limit(limit + 1).project(projection).to_list()
+    has_more = len(items) > limit
+    items = items[:limit]
+    if after:
+        items.reverse()
+
+    if items:
+        # Older page exists if we are moving forward from a cursor, or the backward read overflowed
+        if has_more or after:
+            response.headers["X-Next-Cursor"] = encode_cursor(getattr(items[-1], sort_field), items[-1].id)
+        if before or (after and has_more):
+            response.headers["X-Prev-Cursor"] = encode_cursor(getattr(items[0], sort_field), items[0].id)
+    return items
@@ -0,0 +1,102 @@
+"""Content-addressed profile picture store on the local filesystem.
+
+An upload is stored once under the sha256 of its bytes, with a few fixed-size
+thumbnails rendered at upload time (when Pillow is installed); the user
+document keeps only the key. Files are immutable, so they can be served with a
+strong ETag and long-lived Cache-Control.
+"""
+import asyncio
+import hashlib
+import io
+import mimetypes
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+PICTURE_STORE_DIR = Path(os.getenv("PICTURE_STORE_DIR", "data/pictures"))
+MAX_PICTURE_BYTES = int(os.getenv("MAX_PICTURE_BYTES", str(5 * 1024 * 1024)))
+PUBLIC_API_URL = os.getenv("PUBLIC_API_URL", "http://localhost:8000")
+THUMBNAIL_SIZES = (64, 128, 256)
+ALLOWED_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+
+
+class PictureError(ValueError):
+    pass
+
+
+def _dir(key: str) -> Path:
+    return PICTURE_STORE_DIR / key[:2] / key
+
+
+def picture_url(key: Optional[str], size: Optional[int] = None) -> Optional[str]:
+    if not key:
+        return None
+    url = f"{PUBLIC_API_URL}/pictures/{key}"
+    return f"{url}?size={size}" if size else url
+
+
+def _render_thumbnails(directory: Path, data: bytes):
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        has_alpha = image.mode in ("RGBA", "LA", "P")
+        for size in THUMBNAIL_SIZES:
+            thumb = image.copy()
+            thumb.thumbnail((size, size))
+            if has_alpha:
+                thumb.convert("RGBA").save(directory / f"{size}.png", format="PNG", optimize=True)
+            else:
+                thumb.convert("RGB").save(directory / f"{size}.jpg", format="JPEG", quality=85, optimize=True)
+
+
+def _write(key: str, data: bytes, content_type: str):
+    directory = _dir(key)
+    extension = mimetypes.guess_extension(content_type) or ".bin"
+    original = directory / f"original{extension}"
+    if original.exists():
+        return  # same bytes already stored
+    directory.mkdir(parents=True, exist_ok=True)
+    if PIL_AVAILABLE:
+        try:
+            _render_thumbnails(directory, data)
+        except Exception as e:
+            raise PictureError(f"Invalid image: {e}")
+    tmp = directory / f".original{extension}.tmp"
+    tmp.write_bytes(data)
+    tmp.replace(original)  # written last so a half-finished store is retried
+
+
+async def save_picture(data: bytes, content_type: Optional[str]) -> str:
+    """Store an uploaded picture and its thumbnails; returns its content key."""
+    if content_type not in ALLOWED_TYPES:
+        raise PictureError(f"Unsupported image type: {content_type}")
+    if not data:
+        raise PictureError("Empty file")
+    if len(data) > MAX_PICTURE_BYTES:
+        raise PictureError(f"Image too large (max {MAX_PICTURE_BYTES // (1024 * 1024)} MB)")
+    key = hashlib.sha256(data).hexdigest()
+    await asyncio.to_thread(_write, key, data, content_type)
+    return key
+
+
+def find_picture(key: str, size: Optional[int] = None) -> Optional[Tuple[Path, str]]:
+    """Path and media type of the closest stored variant (the original if no thumbnail fits)."""
+    if len(key) != 64 or any(c not in "0123456789abcdef" for c in key):
+        return None
+    directory = _dir(key)
+    if size:
+        for thumb_size in THUMBNAIL_SIZES:
+            if thumb_size >= size:
+                for extension, media_type in ((".jpg", "image/jpeg"), (".png", "image/png")):
+                    path = directory / f"{thumb_size}{extension}"
+                    if path.exists():
+                        return path, media_type
+                break
+    for path in directory.glob("original.*"):
+        return path, mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    return None
@@ -0,0 +1,238 @@
+"""Opt-in per-request profiling with Server-Timing spans.
+
+A request is profiled when it carries ``X-Profile`` with either the
+``PROFILE_TOKEN`` value or ``1`` together with an admin access token, or when
+it hits one of ``PROFILE_PATHS`` (the upload and analysis endpoints) and wins
+the ``PROFILE_SAMPLE_RATE`` draw. Everything else pays only a context variable
+lookup per ``span``.
+
+For a profiled request ``ProfilingMiddleware``:
+
+* runs a profiler over it: pyinstrument when installed (async-aware,
+  so only this request's task is attributed, saved as an HTML flamegraph), or
+  cProfile (saved as ``.prof`` for snakeviz/flameprof). cProfile sees every
+  coroutine that runs on the loop meanwhile and only one can be active per
+  thread, so concurrent profiled requests then get spans only;
+* collects ``span("stage")`` timings from the pipeline, plus the request's
+  total Mongo time and LLM time, and returns them in a ``Server-Timing``
+  header;
+* stores the trace and a JSON summary in ``PROFILE_DIR`` under the request id
+  (keeping the newest ``PROFILE_KEEP``), served by ``/profiles``.
+
+Work shipped to the analysis or extraction process pools shows up as time
+waiting on the future; its span says how long the stage took.
+"""
+import asyncio
+import cProfile
+import json
+import logging
+import os
+import random
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import logs
+import metrics
+from tokens import InvalidToken, decode_token
+
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", "data/profiles"))
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN")
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_PATHS = tuple(p for p in os.getenv("PROFILE_PATHS", "/upload-resume,/ai/analyze-resume").split(",") if p)
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+
+try:
+    from pyinstrument import Profiler as _Pyinstrument
+except ImportError:
+    _Pyinstrument = None
+
+_cprofile_active = False
+
+logger = logs.get_logger("profiling")
+
+
+class ProfileSession:
+    def __init__(self, request_id: str, method: str, path: str, reason: str):
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.spans: Dict[str, float] = {}
+        self.started = time.perf_counter()
+        self.status = 500
+        self._profiler = None
+        self.kind: Optional[str] = None
+
+    def add(self, name: str, seconds: float):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    def start(self):
+        global _cprofile_active
+        if _Pyinstrument is not None:
+            self._profiler = _Pyinstrument(async_mode="enabled")
+            self.kind = "pyinstrument"
+        elif not _cprofile_active:
+            _cprofile_active = True
+            self._profiler = cProfile.Profile()
+            self.kind = "cprofile"
+        if self.kind == "cprofile":
+            self._profiler.enable()
+        elif self.kind == "pyinstrument":
+            self._profiler.start()
+
+    def stop(self):
+        global _cprofile_active
+        if self.kind == "cprofile":
+            self._profiler.disable()
+            _cprofile_active = False
+        elif self.kind == "pyinstrument":
+            self._profiler.stop()
+
+    def server_timing(self) -> str:
+        timings = dict(self.spans)
+        stats = metrics.current_request.get()
+        if stats is not None and stats.mongo_seconds:
+            timings["mongo"] = stats.mongo_seconds
+        timings["total"] = time.perf_counter() - self.started
+        return ", ".join(f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings.items())
+
+    def save(self):
+        """Write the trace and summary (blocking; run it off the event loop)."""
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        trace = None
+        if self.kind == "pyinstrument":
+            trace = f"{self.request_id}.html"
+            (PROFILE_DIR / trace).write_text(self._profiler.output_html(), encoding="utf-8")
+        elif self.kind == "cprofile":
+            trace = f"{self.request_id}.prof"
+            self._profiler.dump_stats(str(PROFILE_DIR / trace))
+        summary = {
+            "request_id": self.request_id, "method": self.method, "path": self.path, "status": self.status,
+            "reason": self.reason, "profiler": self.kind, "trace": trace, "created_at": time.time(),
+            "spans_ms": {name: round(seconds * 1000, 2) for name, seconds in self.spans.items()},
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 2),
+        }
+        (PROFILE_DIR / f"{self.request_id}.json").write_text(json.dumps(summary), encoding="utf-8")
+        _prune()
+
+
+_session: ContextVar[Optional[ProfileSession]] = ContextVar("profile_session", default=None)
+
+
+@contextmanager
+def span(name: str):
+    """Time a pipeline stage into the Server-Timing header of a profiled request (no-op otherwise)."""
+    session = _session.get()
+    if session is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        session.add(name, time.perf_counter() - started)
+
+
+def _header(scope, name: bytes) -> Optional[str]:
+    for key, value in scope.get("headers", ()):
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _is_admin(scope) -> bool:
+    authorization = _header(scope, b"authorization") or ""
+    if not authorization.lower().startswith("bearer "):
+        return False
+    try:
+        return decode_token(authorization[7:]).get("role") == "admin"
+    except InvalidToken:
+        return False
+
+
+def _profile_reason(scope) -> Optional[str]:
+    requested = _header(scope, b"x-profile")
+    if requested:
+        if PROFILE_TOKEN and requested == PROFILE_TOKEN:
+            return "token"
+        if requested == "1" and _is_admin(scope):
+            return "admin"
+    if PROFILE_SAMPLE_RATE > 0 and scope["path"] in PROFILE_PATHS and random.random() < PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+class ProfilingMiddleware:
+    """Must sit inside ``metrics.MetricsMiddleware``, which assigns the request id."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        reason = _profile_reason(scope) if scope["type"] == "http" else None
+        if reason is None:
+            await self.app(scope, receive, send)
+            return
+
+        session = ProfileSession(logs.request_id.get() or uuid.uuid4().hex, scope["method"], scope["path"], reason)
+        token = _session.set(session)
+
+        async def timing_send(message):
+            if message["type"] == "http.response.start":
+                session.status = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"server-timing", session.server_timing().encode("latin-1")),
+                    (b"x-profile-id", session.request_id.encode("latin-1")),
+                ]
+            await send(message)
+
+        session.start()
+        try:
+            await self.app(scope, receive, timing_send)
+        finally:
+            session.stop()
+            _session.reset(token)
+            try:
+                await asyncio.to_thread(session.save)
+            except OSError as e:
+                logs.event(logger, logging.WARNING, "profile_save_failed", error=str(e))
+            logs.event(logger, logging.INFO, "request_profiled", path=session.path, reason=reason, profiler=session.kind)
+
+
+# --- Stored profiles ---
+
+def _summaries() -> List[Path]:
+    if not PROFILE_DIR.is_dir():
+        return []
+    return sorted(PROFILE_DIR.glob("*.json"), key=lambda p: p.stat().st_mtime, reverse=True)
+
+
+def _prune():
+    for stale in _summaries()[PROFILE_KEEP:]:
+        for path in PROFILE_DIR.glob(f"{stale.stem}.*"):
+            path.unlink(missing_ok=True)
+
+
+def list_profiles(limit: int = 50) -> List[dict]:
+    result = []
+    for path in _summaries()[:limit]:
+        try:
+            result.append(json.loads(path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return result
+
+
+def trace_path(request_id: str) -> Optional[Path]:
+    """Stored trace file for a request id, if any."""
+    if not metrics.valid_request_id(request_id):
+        return None
+    for suffix in (".html", ".prof"):
+        path = PROFILE_DIR / f"{request_id}{suffix}"
+        if path.is_file():
+            return path
+    return None
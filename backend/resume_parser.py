@@ -0,0 +1,66 @@
+"""Segment extracted resume text into sections with character offsets.
+
+Runs once per upload; the result is stored on the ``Resume`` document so
+analysis, job matching and search read the precomputed form instead of
+re-parsing or asking the client to re-send the text.
+"""
+import re
+from typing import Dict, List, Optional
+
+from skills import extract_skills
+
+SECTION_HEADINGS = {
+    "summary": ["summary", "professional summary", "profile", "professional profile", "objective",
+                "career objective", "about me"],
+    "experience": ["experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "internships"],
+    "education": ["education", "academic background", "qualifications", "academics"],
+    "skills": ["skills", "technical skills", "key skills", "core competencies", "technologies",
+               "tech stack", "skills and tools", "skills & tools"],
+    "projects": ["projects", "personal projects", "key projects"],
+    "certifications": ["certifications", "certificates", "licenses and certifications", "courses"],
+}
+
+_HEADING_TO_SECTION = {heading: name for name, headings in SECTION_HEADINGS.items() for heading in headings}
+_HEADING_RE = re.compile(
+    r"^[ \t#*\-]*(" + "|".join(re.escape(h) for h in sorted(_HEADING_TO_SECTION, key=len, reverse=True)) + r")[ \t]*:?[ \t]*$",
+    re.IGNORECASE | re.MULTILINE,
+)
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+_PHONE_RE = re.compile(r"\+?\d[\d ()\-.]{7,}\d")
+_URL_RE = re.compile(r"(?:https?://)?(?:www\.)?(?:linkedin\.com|github\.com)/[\w\-/]+", re.IGNORECASE)
+
+
+def parse_resume(text: str) -> Dict:
+    """Split ``text`` into a contact header and named sections (offsets into ``text``)."""
+    headings = list(_HEADING_RE.finditer(text))
+    first_heading = headings[0].start() if headings else len(text)
+
+    sections: List[Dict] = []
+    for i, match in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(text)
+        sections.append({
+            "name": _HEADING_TO_SECTION[match.group(1).lower()],
+            "heading": match.group(1).strip(),
+            "start": match.end(),
+            "end": end,
+        })
+
+    header = text[:first_heading]
+    email = _EMAIL_RE.search(header) or _EMAIL_RE.search(text)
+    phone = _PHONE_RE.search(header)
+    contact = {
+        "start": 0,
+        "end": first_heading,
+        "name": next((line.strip() for line in header.splitlines() if line.strip()), ""),
+        "email": email.group(0) if email else None,
+        "phone": phone.group(0).strip() if phone else None,
+        "links": [m.group(0) for m in _URL_RE.finditer(text)],
+    }
+    return {"contact": contact, "sections": sections, "skills": extract_skills(text)}
+
+
+def section_text(text: str, sections: List[Dict], name: str) -> Optional[str]:
+    """Concatenated text of every section called ``name`` (None if the resume has none)."""
+    parts = [text[s["start"]:s["end"]].strip() for s in sections if s["name"] == name]
+    return "\n\n".join(parts) if parts else None
@@ -0,0 +1,87 @@
+"""ATS resume rendering with precompiled Jinja2 templates, plus local PDF export.
+
+Themes live in ``templates/resume/<theme>.html`` and extend ``base.html``; they
+are compiled once (``load_templates`` at startup) and rendered with
+autoescaping, so user-supplied text can't inject markup. PDF export converts
+the same HTML locally with WeasyPrint or, failing that, xhtml2pdf; both are
+optional dependencies, and ``html_to_pdf`` raises ``PDFUnavailable`` when
+neither is installed.
+"""
+import io
+from pathlib import Path
+from typing import Dict, Mapping, Optional
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+
+TEMPLATE_DIR = Path(__file__).parent / "templates"
+THEMES = ("classic", "modern", "compact")
+DEFAULT_THEME = "classic"
+
+_env = Environment(
+    loader=FileSystemLoader(TEMPLATE_DIR),
+    autoescape=select_autoescape(["html"]),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    auto_reload=False,
+)
+_templates: Dict[str, Template] = {}
+
+
+class UnknownTheme(ValueError):
+    pass
+
+
+class PDFUnavailable(RuntimeError):
+    pass
+
+
+def load_templates():
+    """Compile every theme up front so the first request doesn't pay for it."""
+    for theme in THEMES:
+        _templates[theme] = _env.get_template(f"resume/{theme}.html")
+
+
+def _template(theme: str) -> Template:
+    if theme not in THEMES:
+        raise UnknownTheme(f"Unknown theme '{theme}'. Available: {', '.join(THEMES)}")
+    if theme not in _templates:
+        _templates[theme] = _env.get_template(f"resume/{theme}.html")
+    return _templates[theme]
+
+
+def default_summary(resume: Mapping) -> str:
+    return (
+        f"Results-driven {resume.get('job_title', '')} with expertise in {', '.join(resume.get('skills', [])[:3])}. "
+        "Proven track record of delivering high-quality solutions and driving business impact."
+    )
+
+
+def render_resume(resume: Mapping, summary: Optional[str] = None, theme: str = DEFAULT_THEME) -> str:
+    """HTML for a resume builder payload (``ResumeBuilderRequest`` fields as a mapping)."""
+    return _template(theme).render(resume, summary=summary or resume.get("summary") or default_summary(resume))
+
+
+def pdf_backend() -> Optional[str]:
+    for name in ("weasyprint", "xhtml2pdf"):
+        try:
+            __import__(name)
+            return name
+        except Exception:  # WeasyPrint raises OSError when its native libraries are missing
+            continue
+    return None
+
+
+def html_to_pdf(html: str) -> bytes:
+    """Convert rendered HTML to PDF bytes (CPU-bound; run it on the analysis pool)."""
+    backend = pdf_backend()
+    if backend == "weasyprint":
+        import weasyprint
+        return weasyprint.HTML(string=html).write_pdf()
+    if backend == "xhtml2pdf":
+        from xhtml2pdf import pisa
+        out = io.BytesIO()
+        status = pisa.CreatePDF(html, dest=out, encoding="utf-8")
+        if status.err:
+            raise RuntimeError(f"PDF conversion failed with {status.err} error(s)")
+        return out.getvalue()
+    raise PDFUnavailable("PDF export needs weasyprint or xhtml2pdf installed")
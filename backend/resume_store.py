@@ -0,0 +1,46 @@
+"""Persisted, parsed resumes: one ``Resume`` document per distinct uploaded text."""
+import hashlib
+from datetime import datetime
+from typing import Dict, Optional
+
+from beanie import PydanticObjectId
+
+from models import Resume, ResumeSkillsView
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+async def store_parsed_resume(user_email: str, file_name: str, text: str, parsed: Dict) -> Resume:
+    """Save an upload's text and parsed structure; re-uploading the same text just refreshes it."""
+    digest = text_hash(text)
+    resume = await Resume.find_one(Resume.user_email == user_email, Resume.text_hash == digest)
+    if resume is None:
+        resume = Resume(user_email=user_email, text_hash=digest, text=text)
+    resume.file_name = file_name or ""
+    resume.contact = parsed["contact"]
+    resume.sections = parsed["sections"]
+    resume.skills = parsed["skills"]
+    resume.uploaded_at = datetime.utcnow()
+    await resume.save()
+    return resume
+
+
+def _uploaded(user_email: str) -> list:
+    return [Resume.user_email == user_email, Resume.text_hash != None]
+
+
+async def get_resume(user_email: str, resume_id: Optional[str] = None) -> Optional[Resume]:
+    """A specific uploaded resume, or the user's most recent one."""
+    if resume_id:
+        try:
+            object_id = PydanticObjectId(resume_id)
+        except Exception:
+            return None
+        return await Resume.find_one(Resume.id == object_id, *_uploaded(user_email))
+    return await Resume.find(*_uploaded(user_email)).sort(-Resume.uploaded_at).first_or_none()
+
+
+async def get_latest_resume_skills(user_email: str) -> Optional[ResumeSkillsView]:
+    return await Resume.find(*_uploaded(user_email)).sort(-Resume.uploaded_at).project(ResumeSkillsView).first_or_none()
@@ -0,0 +1,251 @@
+"""TF-IDF / BM25 job-match scoring.
+
+Resumes and job descriptions are tokenized into plain words plus dictionary
+skill phrases ("machine learning" is one term, not two). Term weights use an
+IDF learned from the stored job descriptions, so boilerplate like "team" or
+"experience" fades as the corpus grows while rare skills dominate. Scoring a
+resume against N job descriptions is a couple of sparse matrix-vector
+products over an N x V matrix, so ranking thousands of stored descriptions is
+one batched operation rather than a Python loop.
+"""
+import asyncio
+import math
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+from scipy import sparse
+
+from analysis import run_in_pool
+from models import JobAnalysis
+from skills import ACTION, SKILL_DICTIONARY, find_skills, normalize_term
+
+BM25_K1 = float(os.getenv("BM25_K1", "1.2"))
+BM25_B = float(os.getenv("BM25_B", "0.75"))
+SKILL_BOOST = float(os.getenv("SKILL_BOOST", "3.0"))
+COVERAGE_WEIGHT = 0.8  # match score = 80% BM25 coverage + 20% TF-IDF cosine
+MIN_CORPUS_DOCS = int(os.getenv("SCORING_MIN_CORPUS_DOCS", "20"))
+CORPUS_LIMIT = int(os.getenv("SCORING_CORPUS_LIMIT", "20000"))
+CORPUS_REFRESH_SECONDS = int(os.getenv("SCORING_CORPUS_REFRESH_SECONDS", "3600"))
+
+_WORD_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]")
+STOPWORDS = frozenset("""
+a about above after all also am an and any are as at be been being both but by can could did do does
+doing during each etc few for from further had has have having he her here hers him his how i if in
+into is it its itself just me more most my no nor not of off on once only or other our ours out over
+own per same she should so some such than that the their theirs them then there these they this those
+through to too under until up very via was we were what when where which while who whom why will with
+would you your yours
+""".split())
+
+# Skills (not action verbs) get their IDF multiplied by SKILL_BOOST.
+_BOOSTED_TERMS = frozenset(normalize_term(t) for t, category in SKILL_DICTIONARY.items() if category != ACTION)
+
+
+def stem(word: str) -> str:
+    # Plural folding only ("developers" -> "developer"); anything smarter hurts skill names.
+    if len(word) > 3 and word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        return word[:-1]
+    return word
+
+
+def _words(text: str) -> List[str]:
+    return [stem(w) for w in _WORD_RE.findall(text) if w not in STOPWORDS]
+
+
+def tokenize(text: str) -> List[str]:
+    """Dictionary skills as whole terms, the text between them as stemmed words."""
+    lowered = text.lower()
+    tokens: List[str] = []
+    position = 0
+    for match in find_skills(text):
+        tokens.extend(_words(lowered[position:match.start]))
+        tokens.append(normalize_term(match.term))
+        position = match.end
+    tokens.extend(_words(lowered[position:]))
+    return tokens
+
+
+def tokenize_all(texts: Sequence[str]) -> List[List[str]]:
+    """Batch form of ``tokenize`` (one round trip when run on the analysis pool)."""
+    return [tokenize(text) for text in texts]
+
+
+class ScoringModel:
+    """Corpus statistics (document frequencies and mean length) behind IDF and BM25."""
+
+    def __init__(self, doc_freq: Optional[Dict[str, int]] = None, doc_count: int = 0, total_length: int = 0):
+        self.doc_freq: Dict[str, int] = doc_freq or {}
+        self.doc_count = doc_count
+        self.total_length = total_length
+
+    @classmethod
+    def fit(cls, documents: Iterable[str]) -> "ScoringModel":
+        model = cls()
+        for text in documents:
+            model.add(tokenize(text))
+        return model
+
+    def add(self, tokens: List[str]):
+        """Fold one more document into the statistics (used as new analyses are stored)."""
+        self.doc_count += 1
+        self.total_length += len(tokens)
+        for term in set(tokens):
+            self.doc_freq[term] = self.doc_freq.get(term, 0) + 1
+
+    @property
+    def avg_doc_length(self) -> float:
+        return self.total_length / self.doc_count if self.doc_count else 0.0
+
+    def idf(self, terms: Sequence[str]) -> np.ndarray:
+        """BM25 IDF (always positive), uniform until the corpus has MIN_CORPUS_DOCS documents."""
+        if self.doc_count < MIN_CORPUS_DOCS:
+            idf = np.full(len(terms), math.log(2.0), dtype=np.float64)
+        else:
+            df = np.fromiter((self.doc_freq.get(t, 0) for t in terms), dtype=np.float64, count=len(terms))
+            idf = np.log1p((self.doc_count - df + 0.5) / (df + 0.5))
+        boost = np.fromiter((t in _BOOSTED_TERMS for t in terms), dtype=bool, count=len(terms))
+        idf[boost] *= SKILL_BOOST
+        return idf
+
+
+class DocumentMatrix:
+    """Job descriptions tokenized and weighted once, then scored against any number of resumes."""
+
+    def __init__(self, model: ScoringModel, texts: Sequence[str], token_lists: Optional[List[List[str]]] = None):
+        token_lists = token_lists if token_lists is not None else [tokenize(t) for t in texts]
+        self.model = model
+        self.vocabulary: Dict[str, int] = {}
+        self.idf = np.zeros(0)
+        lengths = [len(tokens) for tokens in token_lists]
+        self.avg_length = model.avg_doc_length or (float(np.mean(lengths)) if lengths else 1.0) or 1.0
+        self.bm25, self.bm25_total, self.tfidf = self._weigh(token_lists)
+
+    def append(self, token_lists: List[List[str]]):
+        """Add rows for more descriptions; existing rows keep their weights."""
+        bm25, bm25_total, tfidf = self._weigh(token_lists)
+        shape = (self.bm25.shape[0], len(self.vocabulary))  # new terms add empty columns to old rows
+        self.bm25 = sparse.vstack([sparse.csr_matrix((self.bm25.data, self.bm25.indices, self.bm25.indptr), shape=shape), bm25]).tocsr()
+        self.tfidf = sparse.vstack([sparse.csr_matrix((self.tfidf.data, self.tfidf.indices, self.tfidf.indptr), shape=shape), tfidf]).tocsr()
+        self.bm25_total = np.concatenate([self.bm25_total, bm25_total])
+
+    def _weigh(self, token_lists: List[List[str]]):
+        rows, cols = [], []
+        for row, tokens in enumerate(token_lists):
+            for term in tokens:
+                rows.append(row)
+                cols.append(self.vocabulary.setdefault(term, len(self.vocabulary)))
+        shape = (len(token_lists), len(self.vocabulary))
+        tf = sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=shape, dtype=np.float64)
+        tf.sum_duplicates()
+
+        new_terms = list(self.vocabulary)[len(self.idf):]
+        if new_terms:
+            self.idf = np.concatenate([self.idf, self.model.idf(new_terms)])
+        doc_length = np.asarray([len(tokens) for tokens in token_lists], dtype=np.float64)
+
+        # BM25 term weights: idf * tf * (k1 + 1) / (tf + k1 * (1 - b + b * len / avg_len))
+        row_of = np.repeat(np.arange(shape[0]), np.diff(tf.indptr))
+        norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_length[row_of] / self.avg_length)
+        bm25 = tf.copy()
+        bm25.data = self.idf[bm25.indices] * tf.data * (BM25_K1 + 1) / (tf.data + norm)
+        bm25_total = np.asarray(bm25.sum(axis=1)).ravel()
+
+        # Sublinear TF-IDF rows, L2-normalised for cosine similarity.
+        tfidf = tf.copy()
+        tfidf.data = (1 + np.log(tf.data)) * self.idf[tfidf.indices]
+        row_norm = np.sqrt(np.asarray(tfidf.multiply(tfidf).sum(axis=1)).ravel())
+        row_norm[row_norm == 0] = 1.0
+        return bm25, bm25_total, (sparse.diags(1 / row_norm) @ tfidf).tocsr()
+
+    def __len__(self) -> int:
+        return self.bm25.shape[0]
+
+    def score(
+        self, resume_text: str, resume_tokens: Optional[List[str]] = None, rows: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """Coverage, cosine and blended 0-100 score of one resume against every row (or just ``rows``), in one pass."""
+        bm25, bm25_total, tfidf = self.bm25, self.bm25_total, self.tfidf
+        if rows is not None:
+            bm25, bm25_total, tfidf = bm25[rows], bm25_total[rows], tfidf[rows]
+        tokens = resume_tokens if resume_tokens is not None else tokenize(resume_text)
+        counts = Counter(tokens)
+        known = [(self.vocabulary[t], c) for t, c in counts.items() if t in self.vocabulary]
+        n_terms = len(self.vocabulary)
+        present = np.zeros(n_terms)
+        weights = np.zeros(n_terms)
+        if known:
+            cols, tf = map(np.asarray, zip(*known))
+            present[cols] = 1.0
+            weights[cols] = (1 + np.log(tf)) * self.idf[cols]
+
+        # BM25 with the resume as the query, normalised by each description's own score:
+        # the share of the description's weighted terms the resume covers.
+        with np.errstate(invalid="ignore", divide="ignore"):
+            coverage = np.nan_to_num(bm25 @ present / bm25_total)
+
+        # The resume's norm includes terms no description uses (they dilute the cosine too).
+        unseen = [t for t in counts if t not in self.vocabulary]
+        unseen_weights = (1 + np.log([counts[t] for t in unseen])) * self.model.idf(unseen) if unseen else np.zeros(0)
+        resume_norm = math.sqrt(float(weights @ weights + unseen_weights @ unseen_weights)) or 1.0
+        cosine = tfidf @ weights / resume_norm
+
+        blended = COVERAGE_WEIGHT * coverage + (1 - COVERAGE_WEIGHT) * cosine
+        return {
+            "coverage": coverage,
+            "cosine": cosine,
+            "score": np.clip(np.rint(blended * 100), 0, 100).astype(int),
+        }
+
+
+def score_match(model: ScoringModel, resume_text: str, job_description: str) -> Dict[str, float]:
+    """Score a single resume/job description pair."""
+    scores = DocumentMatrix(model, [job_description]).score(resume_text)
+    return {
+        "match_score": int(scores["score"][0]),
+        "coverage": round(float(scores["coverage"][0]), 4),
+        "similarity": round(float(scores["cosine"][0]), 4),
+    }
+
+
+def rank_terms(model: ScoringModel, terms: List[str]) -> List[str]:
+    """Order skill terms by weight, most distinctive first (stable for ties)."""
+    if not terms:
+        return []
+    weights = model.idf([normalize_term(t) for t in terms])
+    return [terms[i] for i in np.argsort(-weights, kind="stable")]
+
+
+class JobCorpus:
+    """Process-wide IDF model over stored job descriptions, refreshed hourly and updated on write."""
+
+    def __init__(self):
+        self._model: Optional[ScoringModel] = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    async def model(self) -> ScoringModel:
+        if self._model is None or time.monotonic() - self._loaded_at > CORPUS_REFRESH_SECONDS:
+            async with self._lock:
+                if self._model is None or time.monotonic() - self._loaded_at > CORPUS_REFRESH_SECONDS:
+                    await self._load()
+        return self._model
+
+    async def _load(self):
+        rows = await JobAnalysis.get_motor_collection().find(
+            {}, {"job_description": 1, "_id": 0}
+        ).sort("created_at", -1).limit(CORPUS_LIMIT).to_list(None)
+        texts = [row.get("job_description", "") for row in rows]
+        self._model = await run_in_pool(ScoringModel.fit, texts)
+        self._loaded_at = time.monotonic()
+
+    def observe(self, job_description: str):
+        """Count a newly stored description without reloading the corpus."""
+        if self._model is not None:
+            self._model.add(tokenize(job_description))
+
+
+job_corpus = JobCorpus()
@@ -0,0 +1,319 @@
+"""Per-user in-memory full-text index behind ``/search``.
+
+Each user's skills, job analyses, portfolio projects and resume sections are
+tokenized once into an inverted index (kept in a process-wide LRU), and writes
+update it in place. Queries are ranked with BM25; every query term may match
+exactly, as a prefix or with one typo (via a SymSpell-style deletion index),
+and results come back paginated with highlight offsets.
+"""
+import asyncio
+import itertools
+import math
+import os
+import re
+from bisect import bisect_left
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from cache import TTLCache
+from models import JobAnalysis, Portfolio, Resume, Skill
+from resume_store import get_resume
+from scoring import STOPWORDS, stem
+
+SEARCH_INDEX_USERS = int(os.getenv("SEARCH_INDEX_USERS", "256"))
+SEARCH_INDEX_TTL = int(os.getenv("SEARCH_INDEX_TTL", "600"))  # seconds; bounds staleness across app workers
+SEARCH_MAX_JOB_ANALYSES = int(os.getenv("SEARCH_MAX_JOB_ANALYSES", "2000"))
+MAX_PREFIX_EXPANSIONS = 20
+SNIPPET_CHARS = 60
+
+_generations = itertools.count(1)
+
+SKILL, JOB, PROJECT, RESUME = "skill", "job", "project", "resume"
+
+# How much a match counts depending on how the query term matched.
+EXACT, PREFIX, TYPO = 1.0, 0.7, 0.5
+FIELD_BOOSTS = {"name": 3.0, "title": 3.0, "section": 2.0}
+BM25_K1, BM25_B = 1.2, 0.75
+
+_TOKEN_RE = re.compile(r"[a-z0-9][a-z0-9+#.]*[a-z0-9+#]|[a-z0-9]", re.IGNORECASE)
+
+
+class SearchDoc(NamedTuple):
+    key: str
+    kind: str
+    fields: Dict[str, str]
+    payload: dict
+
+
+def _spans(text: str) -> Iterable[Tuple[str, int, int]]:
+    for m in _TOKEN_RE.finditer(text):
+        word = m.group(0).lower()
+        if word not in STOPWORDS:
+            yield stem(word), m.start(), m.end()
+
+
+def query_terms(query: str) -> List[str]:
+    return list(dict.fromkeys(term for term, _, _ in _spans(query)))
+
+
+def _deletes(term: str) -> Set[str]:
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+class UserSearchIndex:
+    def __init__(self):
+        self.docs: Dict[str, SearchDoc] = {}
+        self.postings: Dict[str, Dict[str, float]] = {}  # term -> {doc key: field-boosted tf}
+        self.lengths: Dict[str, float] = {}
+        self._total_length = 0.0
+        self._doc_terms: Dict[str, Set[str]] = {}
+        self._typo_index: Dict[str, Set[str]] = {}  # one-deletion variant -> terms
+        self._sorted_terms: Optional[List[str]] = None
+        self.version = 0  # bumped on every change, so derived structures know to rebuild
+        self.generation = next(_generations)  # tells a reloaded index apart from the one it replaced
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    # --- Maintenance ---
+
+    def add(self, doc: SearchDoc):
+        self.remove(doc.key)
+        self.version += 1
+        weights: Dict[str, float] = {}
+        length = 0.0
+        for field, text in doc.fields.items():
+            boost = FIELD_BOOSTS.get(field, 1.0)
+            for term, _, _ in _spans(text or ""):
+                weights[term] = weights.get(term, 0.0) + boost
+                length += 1
+        self.docs[doc.key] = doc
+        self.lengths[doc.key] = length
+        self._total_length += length
+        self._doc_terms[doc.key] = set(weights)
+        for term, weight in weights.items():
+            posting = self.postings.get(term)
+            if posting is None:
+                posting = self.postings[term] = {}
+                self._sorted_terms = None
+                if len(term) >= 4:
+                    for variant in _deletes(term) | {term}:
+                        self._typo_index.setdefault(variant, set()).add(term)
+            posting[doc.key] = weight
+
+    def remove(self, key: str):
+        if key not in self.docs:
+            return
+        self.version += 1
+        del self.docs[key]
+        self._total_length -= self.lengths.pop(key)
+        for term in self._doc_terms.pop(key):
+            posting = self.postings[term]
+            posting.pop(key, None)
+            if not posting:
+                del self.postings[term]
+                self._sorted_terms = None
+                for variant in _deletes(term) | {term}:
+                    terms = self._typo_index.get(variant)
+                    if terms is not None:
+                        terms.discard(term)
+                        if not terms:
+                            del self._typo_index[variant]
+
+    def replace_kind(self, kind: str, docs: Iterable[SearchDoc]):
+        for key in [key for key, doc in self.docs.items() if doc.kind == kind]:
+            self.remove(key)
+        for doc in docs:
+            self.add(doc)
+
+    # --- Querying ---
+
+    def expand(self, term: str) -> Dict[str, float]:
+        """Index terms a query term matches, with the match factor (exact > prefix > typo)."""
+        matches: Dict[str, float] = {}
+        if term in self.postings:
+            matches[term] = EXACT
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+        i = bisect_left(self._sorted_terms, term)
+        while i < len(self._sorted_terms) and len(matches) < MAX_PREFIX_EXPANSIONS:
+            candidate = self._sorted_terms[i]
+            if not candidate.startswith(term):
+                break
+            matches.setdefault(candidate, PREFIX)
+            i += 1
+        if len(term) >= 4:
+            for variant in _deletes(term) | {term}:
+                for candidate in self._typo_index.get(variant, ()):
+                    matches.setdefault(candidate, TYPO)
+        return matches
+
+    def search(self, query: str, offset: int = 0, limit: int = 20) -> Tuple[int, List[Tuple[SearchDoc, float, Set[str]]]]:
+        """``(total, page)``; documents must match every query term; page items are (doc, score, matched terms)."""
+        terms = query_terms(query)
+        if not terms or not self.docs:
+            return 0, []
+        n_docs = len(self.docs)
+        avg_length = self._total_length / n_docs or 1.0
+        scores: Optional[Dict[str, float]] = None
+        matched: Dict[str, Set[str]] = {}
+        for term in terms:
+            term_scores: Dict[str, float] = {}
+            for candidate, factor in self.expand(term).items():
+                posting = self.postings[candidate]
+                idf = math.log1p((n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for key, weight in posting.items():
+                    if scores is not None and key not in scores:
+                        continue  # already failed an earlier term
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self.lengths[key] / avg_length)
+                    value = factor * idf * weight * (BM25_K1 + 1) / (weight + norm)
+                    if value > term_scores.get(key, 0.0):
+                        term_scores[key] = value
+                    matched.setdefault(key, set()).add(candidate)
+            scores = term_scores if scores is None else {key: scores[key] + value for key, value in term_scores.items()}
+            if not scores:
+                return 0, []
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        page = ranked[offset:offset + limit]
+        return len(ranked), [(self.docs[key], round(score, 4), matched[key]) for key, score in page]
+
+
+def highlights(doc: SearchDoc, terms: Set[str]) -> List[dict]:
+    """Per matching field: a snippet around the first hit and the ``[start, end]`` offsets of hits in it."""
+    result = []
+    for field, text in doc.fields.items():
+        spans = [(start, end) for term, start, end in _spans(text or "") if term in terms]
+        if not spans:
+            continue
+        begin = max(0, spans[0][0] - SNIPPET_CHARS)
+        end = min(len(text), spans[0][1] + SNIPPET_CHARS)
+        snippet = text[begin:end]
+        result.append({
+            "field": field,
+            "snippet": snippet,
+            "matches": [[s - begin, e - begin] for s, e in spans if s >= begin and e <= end],
+        })
+    return result
+
+
+# --- Documents ---
+
+def skill_doc(skill: Skill) -> SearchDoc:
+    return SearchDoc(
+        f"{SKILL}:{skill.id}", SKILL, {"name": skill.name, "goal": skill.goal},
+        {"id": str(skill.id), "name": skill.name, "progress": skill.progress, "type": "skill"},
+    )
+
+
+def job_doc(analysis_id, job_description: str, match_score: int) -> SearchDoc:
+    return SearchDoc(
+        f"{JOB}:{analysis_id}", JOB, {"description": job_description},
+        {"id": str(analysis_id), "description": job_description[:100], "score": match_score, "type": "job"},
+    )
+
+
+def project_docs(portfolio: Optional[Portfolio]) -> List[SearchDoc]:
+    if portfolio is None:
+        return []
+    return [
+        SearchDoc(
+            f"{PROJECT}:{idx}", PROJECT,
+            {"title": project.get("title", ""), "description": project.get("description", "")},
+            {"id": idx, "title": project.get("title", ""), "description": project.get("description", ""), "type": "project"},
+        )
+        for idx, project in enumerate(portfolio.projects)
+    ]
+
+
+def resume_docs(resume: Optional[Resume]) -> List[SearchDoc]:
+    if resume is None or not resume.text:
+        return []
+    return [
+        SearchDoc(
+            f"{RESUME}:{resume.id}:{i}", RESUME,
+            {"section": section["heading"], "text": resume.text[section["start"]:section["end"]]},
+            {"id": str(resume.id), "section": section["name"], "type": "resume"},
+        )
+        for i, section in enumerate(resume.sections)
+    ]
+
+
+class SearchIndex:
+    """Process-wide LRU of per-user indexes, loaded on first search and updated by writes."""
+
+    def __init__(self, maxsize: int = SEARCH_INDEX_USERS, ttl: int = SEARCH_INDEX_TTL):
+        self._indexes = TTLCache(maxsize, ttl)
+        self._loading: Dict[str, asyncio.Task] = {}
+
+    async def get(self, user_email: str) -> UserSearchIndex:
+        index = self._indexes.get(user_email)
+        if index is not None:
+            return index
+        # Concurrent first requests share one load; the entry goes away when it finishes.
+        task = self._loading.get(user_email)
+        if task is None:
+            task = asyncio.create_task(self._load_and_cache(user_email))
+            self._loading[user_email] = task
+            task.add_done_callback(lambda done: self._load_done(user_email, done))
+        return await asyncio.shield(task)
+
+    async def _load_and_cache(self, user_email: str) -> UserSearchIndex:
+        index = await self._load(user_email)
+        self._indexes.set(user_email, index)
+        return index
+
+    def _load_done(self, user_email: str, task: asyncio.Task):
+        if self._loading.get(user_email) is task:
+            del self._loading[user_email]
+        if not task.cancelled():
+            task.exception()  # callers that went away would leave it unretrieved
+
+    async def _load(self, user_email: str) -> UserSearchIndex:
+        index = UserSearchIndex()
+        for skill in await Skill.find(Skill.user_email == user_email).to_list():
+            index.add(skill_doc(skill))
+        analyses = await JobAnalysis.get_motor_collection().find(
+            {"user_email": user_email}, {"job_description": 1, "match_score": 1}
+        ).sort("created_at", -1).limit(SEARCH_MAX_JOB_ANALYSES).to_list(None)
+        for row in analyses:
+            index.add(job_doc(row["_id"], row.get("job_description", ""), row.get("match_score", 0)))
+        index.replace_kind(PROJECT, project_docs(await Portfolio.find_one(Portfolio.user_email == user_email)))
+        index.replace_kind(RESUME, resume_docs(await get_resume(user_email)))
+        return index
+
+    def _loaded(self, user_email: str) -> Optional[UserSearchIndex]:
+        return self._indexes.get(user_email)
+
+    # Write hooks: only touch indexes that are already loaded (others load fresh data on first search).
+
+    def index_skill(self, skill: Skill):
+        index = self._loaded(skill.user_email)
+        if index is not None:
+            index.add(skill_doc(skill))
+
+    def unindex_skill(self, skill: Skill):
+        index = self._loaded(skill.user_email)
+        if index is not None:
+            index.remove(f"{SKILL}:{skill.id}")
+
+    async def reindex_skills(self, user_email: str):
+        index = self._loaded(user_email)
+        if index is not None:
+            index.replace_kind(SKILL, [skill_doc(s) for s in await Skill.find(Skill.user_email == user_email).to_list()])
+
+    def index_job_analysis(self, analysis: JobAnalysis):
+        index = self._loaded(analysis.user_email)
+        if index is not None:
+            index.add(job_doc(analysis.id, analysis.job_description, analysis.match_score))
+
+    def index_portfolio(self, portfolio: Portfolio):
+        index = self._loaded(portfolio.user_email)
+        if index is not None:
+            index.replace_kind(PROJECT, project_docs(portfolio))
+
+    def index_resume(self, resume: Resume):
+        index = self._loaded(resume.user_email)
+        if index is not None:
+            index.replace_kind(RESUME, resume_docs(resume))
+
+
+search_index = SearchIndex()
@@ -0,0 +1,49 @@
+"""Skill Tracker sync shared by the resume upload and resume builder endpoints.
+
+Replaces the per-skill ``find_one`` + ``insert`` loop (2N round-trips) with one
+query for the names the user already has and one unordered ``insert_many`` for
+the rest. Names are normalized through the skill taxonomy first, so "nodejs"
+is stored as "Node.js" and doesn't duplicate an existing "Node" entry. The
+unique (user_email, name) index on ``Skill`` makes concurrent syncs safe: a
+duplicate from a racing request is rejected by Mongo and ignored here.
+"""
+from typing import Iterable, List
+
+from pymongo.errors import BulkWriteError
+
+from models import Skill
+from skills import canonical_name, skill_key
+
+DUPLICATE_KEY = 11000
+
+
+async def sync_skills(user_email: str, skill_names: Iterable[str], progress: int = 50, status: str = "In Progress") -> List[str]:
+    """Create Skill Tracker entries for names the user doesn't have yet; returns the names created."""
+    names = {}
+    for name in skill_names:
+        if name and name.strip():
+            names.setdefault(skill_key(name), canonical_name(name))
+    if not names:
+        return []
+
+    # Compare by canonical key: entries saved before normalization may use another alias.
+    existing = await Skill.get_motor_collection().distinct("name", {"user_email": user_email})
+    existing_keys = {skill_key(name) for name in existing}
+    new_skills = [
+        Skill(user_email=user_email, name=name, progress=progress, goal=f"Master {name}", status=status)
+        for key, name in names.items() if key not in existing_keys
+    ]
+    if not new_skills:
+        return []
+
+    created = [skill.name for skill in new_skills]
+    try:
+        await Skill.insert_many(new_skills, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(err.get("code") != DUPLICATE_KEY for err in errors):
+            raise
+        # Another request inserted these first; they exist, just not created by us.
+        duplicates = {err["index"] for err in errors}
+        created = [name for i, name in enumerate(created) if i not in duplicates]
+    return created
@@ -0,0 +1,77 @@
+"""Character n-gram vectors for fuzzy name lookup, in a memory-mapped NumPy index.
+
+Exact alias lookup in ``skills`` covers the spellings the taxonomy knows; this
+catches the rest ("kubernets", "postgre sql", "java-script"). Each name becomes
+a hashed bag of character bigrams and trigrams, L2-normalised, stored as one
+float32 row of a ``.npy`` file opened with ``mmap_mode="r"`` so every worker
+process shares the same pages. A lookup is one matrix-vector product. Nothing
+is downloaded: the vectors are computed from the names themselves.
+"""
+import hashlib
+import logging
+import os
+import tempfile
+import zlib
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from logs import event, get_logger
+
+logger = get_logger("skill_vectors")
+
+NGRAM_DIM = 1024
+NGRAM_SIZES = (2, 3)
+
+
+def ngram_vector(text: str, dim: int = NGRAM_DIM) -> np.ndarray:
+    """L2-normalised hashed n-gram counts of ``text`` (padded so word edges count)."""
+    vector = np.zeros(dim, dtype=np.float32)
+    padded = f"#{text.lower()}#"
+    for n in NGRAM_SIZES:
+        for i in range(max(1, len(padded) - n + 1)):
+            vector[zlib.crc32(f"{n}{padded[i:i + n]}".encode("utf-8")) % dim] += 1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class NgramIndex:
+    """Nearest-neighbour lookup over a fixed list of names."""
+
+    def __init__(self, names: Sequence[str], directory: Optional[str] = None, dim: int = NGRAM_DIM):
+        self.names: List[str] = list(names)
+        self.dim = dim
+        self.vectors = self._load(directory) if directory else self._build()
+
+    def _build(self) -> np.ndarray:
+        if not self.names:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.vstack([ngram_vector(name, self.dim) for name in self.names])
+
+    def _load(self, directory: str) -> np.ndarray:
+        # The file name carries a digest of the names, so a taxonomy change builds a new file.
+        key = [str(self.dim), repr(NGRAM_SIZES), *self.names]
+        digest = hashlib.sha256("\0".join(key).encode("utf-8")).hexdigest()[:16]
+        path = os.path.join(directory, f"ngrams-{digest}.npy")
+        if not os.path.exists(path):
+            vectors = self._build()
+            try:
+                os.makedirs(directory, exist_ok=True)
+                fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+                with os.fdopen(fd, "wb") as f:
+                    np.save(f, vectors)
+                os.replace(tmp, path)
+            except OSError as e:
+                event(logger, logging.WARNING, "skill_index_not_persisted", error=str(e))
+                return vectors
+        return np.load(path, mmap_mode="r")
+
+    def nearest(self, text: str, k: int = 1) -> List[Tuple[str, float]]:
+        """The ``k`` closest names with their cosine similarity, best first."""
+        if not self.names or not text:
+            return []
+        similarity = self.vectors @ ngram_vector(text, self.dim)
+        k = min(k, len(self.names))
+        top = np.argpartition(-similarity, k - 1)[:k]
+        top = top[np.argsort(-similarity[top])]
+        return [(self.names[i], float(similarity[i])) for i in top]
@@ -0,0 +1,299 @@
+"""Shared skill dictionary and single-pass keyword matcher.
+
+The dictionary is compiled once at import time into a trie-shaped regular
+expression with word boundaries, so a scan is one left-to-right pass over the
+text and "go" does not match inside "good".
+
+Each skill has one canonical term; ``SKILL_ALIASES`` lists the other spellings
+("nodejs", "node") that match and normalize to it. Names outside the taxonomy
+(user input, typos) are resolved with ``canonical_skill``, which falls back to
+a character n-gram nearest-neighbour lookup (``skill_vectors``).
+"""
+import hashlib
+import json
+import os
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+
+TECH = "tech"
+SOFT = "soft"
+ACTION = "action"
+
+TECH_SKILLS = [
+    # Languages
+    'python', 'java', 'javascript', 'typescript', 'c++', 'c#', 'ruby', 'go', 'rust', 'php',
+    'swift', 'kotlin', 'scala', 'perl', 'dart', 'elixir', 'haskell', 'matlab', 'objective-c',
+    # Frameworks and libraries
+    'react', 'react native', 'angular', 'vue', 'node.js', 'express', 'django', 'flask',
+    'fastapi', 'spring', 'spring boot', 'laravel', 'ruby on rails', '.net', 'asp.net', 'flutter',
+    'next.js', 'gatsby', 'nuxt', 'svelte', 'redux', 'jquery', 'graphql', 'pandas', 'numpy',
+    'scikit-learn', 'tensorflow', 'pytorch', 'keras', 'spark', 'hadoop', 'kafka', 'rabbitmq',
+    # Data stores
+    'mongodb', 'mysql', 'postgresql', 'sqlite', 'oracle', 'redis', 'elasticsearch', 'cassandra', 'dynamodb',
+    'sql', 'nosql', 'firebase',
+    # Cloud and infrastructure
+    'aws', 'azure', 'gcp', 'docker', 'kubernetes', 'terraform', 'ansible', 'jenkins', 'nginx',
+    'git', 'github', 'gitlab', 'bitbucket', 'linux', 'unix', 'windows', 'bash', 'shell',
+    # Web
+    'html', 'css', 'tailwind', 'bootstrap', 'sass', 'scss', 'webpack',
+    'rest', 'api', 'microservices', 'grpc', 'websockets',
+    # Practices
+    'agile', 'scrum', 'kanban', 'devops', 'ci/cd', 'tdd',
+    'machine learning', 'deep learning', 'ai', 'nlp', 'computer vision', 'data science',
+    'data analysis', 'analytics', 'tableau', 'power bi', 'excel',
+    # Testing
+    'testing', 'unit testing', 'jest', 'mocha', 'cypress', 'selenium', 'pytest', 'junit',
+]
+
+# The ones every technical resume is expected to mention; used for "missing keyword" hints.
+CORE_TECH_SKILLS = [
+    'python', 'javascript', 'react', 'node.js', 'java', 'sql', 'aws', 'docker', 'git', 'api',
+    'typescript', 'angular', 'vue', 'mongodb', 'postgresql',
+]
+
+SOFT_SKILLS = [
+    'leadership', 'communication', 'teamwork', 'problem-solving', 'analytical', 'creative',
+    'management', 'collaboration', 'presentation', 'negotiation', 'mentoring', 'time management',
+]
+
+ACTION_VERBS = [
+    'led', 'managed', 'developed', 'implemented', 'achieved', 'improved', 'increased',
+    'reduced', 'created', 'designed', 'launched', 'optimized', 'spearheaded', 'drove',
+    'built', 'delivered', 'automated', 'architected', 'mentored',
+]
+
+# Canonical term -> other spellings that mean the same skill.
+SKILL_ALIASES: Dict[str, List[str]] = {
+    'node.js': ['node', 'nodejs', 'node js'],
+    'next.js': ['nextjs', 'next js'],
+    'react': ['reactjs', 'react.js'],
+    'vue': ['vuejs', 'vue.js'],
+    'angular': ['angularjs', 'angular.js'],
+    'express': ['expressjs', 'express.js'],
+    'javascript': ['js', 'ecmascript'],
+    'go': ['golang'],
+    'c++': ['cpp'],
+    'c#': ['csharp', 'c sharp'],
+    'ruby on rails': ['rails', 'ror'],
+    'postgresql': ['postgres'],
+    'mongodb': ['mongo'],
+    'kubernetes': ['k8s'],
+    'aws': ['amazon web services'],
+    'gcp': ['google cloud', 'google cloud platform'],
+    'azure': ['microsoft azure'],
+    'rest': ['restful', 'rest api', 'restful api', 'restful apis', 'rest apis'],
+    'ci/cd': ['cicd', 'ci cd'],
+    'machine learning': ['ml'],
+    'ai': ['artificial intelligence'],
+    'nlp': ['natural language processing'],
+    'scikit-learn': ['sklearn'],
+    'tailwind': ['tailwindcss', 'tailwind css'],
+    'power bi': ['powerbi'],
+    'elasticsearch': ['elastic search'],
+    'unit testing': ['unit tests'],
+    'problem-solving': ['problem solver'],
+}
+
+SKILL_DICTIONARY: Dict[str, str] = {}
+for _category, _terms in ((TECH, TECH_SKILLS), (SOFT, SOFT_SKILLS), (ACTION, ACTION_VERBS)):
+    for _term in _terms:
+        SKILL_DICTIONARY.setdefault(_term, _category)
+
+SKILL_INDEX_DIR = os.getenv("SKILL_INDEX_DIR", "data/skill-index")
+SKILL_FUZZY_THRESHOLD = float(os.getenv("SKILL_FUZZY_THRESHOLD", "0.78"))
+
+_UPPERCASE = {'sql', 'nosql', 'aws', 'gcp', 'html', 'css', 'scss', 'api', 'ml', 'ai', 'nlp', 'cicd', 'tdd', 'php', 'grpc'}
+_DISPLAY_NAMES = {
+    'node.js': 'Node.js', 'next.js': 'Next.js',
+    'javascript': 'JavaScript', 'typescript': 'TypeScript', 'mongodb': 'MongoDB', 'mysql': 'MySQL',
+    'postgresql': 'PostgreSQL', 'sqlite': 'SQLite', 'graphql': 'GraphQL', 'github': 'GitHub',
+    'gitlab': 'GitLab', 'fastapi': 'FastAPI', 'ci/cd': 'CI/CD', 'c#': 'C#', 'c++': 'C++',
+    '.net': '.NET', 'asp.net': 'ASP.NET', 'dynamodb': 'DynamoDB', 'pytorch': 'PyTorch',
+    'tensorflow': 'TensorFlow', 'numpy': 'NumPy', 'jquery': 'jQuery', 'power bi': 'Power BI',
+}
+
+_SEPARATOR = re.compile(r"[\s\-]+")
+
+
+def normalize_term(term: str) -> str:
+    """Lowercase a term and collapse spaces/hyphens so "Problem Solving" == "problem-solving"."""
+    return _SEPARATOR.sub(" ", term.strip().lower())
+
+
+# Normalized spelling (canonical or alias) -> canonical term.
+_CANONICAL: Dict[str, str] = {normalize_term(term): term for term in SKILL_DICTIONARY}
+for _canonical, _aliases in SKILL_ALIASES.items():
+    for _alias in _aliases:
+        _CANONICAL.setdefault(normalize_term(_alias), _canonical)
+
+# Changes whenever the taxonomy does; stored analysis versions include it.
+TAXONOMY_DIGEST = hashlib.sha256(json.dumps(
+    [SKILL_DICTIONARY, SKILL_ALIASES, CORE_TECH_SKILLS, _DISPLAY_NAMES, sorted(_UPPERCASE)], sort_keys=True
+).encode("utf-8")).hexdigest()[:12]
+
+
+def aliases_of(term: str) -> List[str]:
+    return SKILL_ALIASES.get(term, [])
+
+
+@lru_cache(maxsize=1)
+def _vector_index():
+    # Action verbs are left out: "Developer" or "Architect" must not snap to "developed"/"architected".
+    from skill_vectors import NgramIndex
+    return NgramIndex(sorted(key for key, term in _CANONICAL.items() if SKILL_DICTIONARY[term] != ACTION), SKILL_INDEX_DIR)
+
+
+@lru_cache(maxsize=4096)
+def canonical_skill(name: str, fuzzy: bool = True) -> Optional[str]:
+    """Canonical taxonomy term for a skill name or alias, or None if it isn't a known skill.
+
+    Exact (normalized) spellings are looked up first; with ``fuzzy`` the closest
+    known spelling by character n-grams is accepted above SKILL_FUZZY_THRESHOLD.
+    """
+    key = normalize_term(name)
+    if key in _CANONICAL:
+        return _CANONICAL[key]
+    if fuzzy and len(key) >= 4:
+        for spelling, similarity in _vector_index().nearest(key):
+            if similarity >= SKILL_FUZZY_THRESHOLD:
+                return _CANONICAL[spelling]
+    return None
+
+
+def canonical_name(name: str) -> str:
+    """Display name to store for a user-supplied skill: canonical if known, else as typed."""
+    canonical = canonical_skill(name)
+    return display_name(canonical) if canonical else name.strip()
+
+
+def skill_key(name: str) -> str:
+    """Comparison key: the canonical term, or the normalized name for skills outside the taxonomy."""
+    return canonical_skill(name) or normalize_term(name)
+
+
+def skill_category(name: str) -> Optional[str]:
+    canonical = canonical_skill(name)
+    return SKILL_DICTIONARY.get(canonical) if canonical else None
+
+
+def display_name(term: str) -> str:
+    """Human-facing spelling of a dictionary term (e.g. ``sql`` -> ``SQL``)."""
+    term = _CANONICAL.get(normalize_term(term), term)
+    if term in _DISPLAY_NAMES:
+        return _DISPLAY_NAMES[term]
+    if term in _UPPERCASE:
+        return term.upper()
+    return term.title()
+
+
+class SkillMatch(NamedTuple):
+    term: str
+    category: Optional[str]
+    start: int
+    end: int
+
+
+def _trie_pattern(terms: Iterable[str]) -> str:
+    trie: dict = {}
+    for term in terms:
+        node = trie
+        for ch in term:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+    return _node_pattern(trie)
+
+
+def _node_pattern(node: dict) -> str:
+    branches = []
+    for ch in sorted(k for k in node if k):
+        # Spaces and hyphens in a term match any run of whitespace/hyphens in the text.
+        atom = r"[\s\-]+" if ch == " " else re.escape(ch)
+        branches.append(atom + _node_pattern(node[ch]))
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:
+        # Greedy optional: the longest term wins, shorter ones are tried on backtrack.
+        return "(?:" + body + ")?" if len(branches) == 1 else body + "?"
+    return body
+
+
+class SkillMatcher:
+    """A set of terms compiled into one regex; ``find`` is a single pass over the text."""
+
+    def __init__(self, terms: Union[Dict[str, Optional[str]], Iterable[str]]):
+        if not isinstance(terms, dict):
+            terms = {term: None for term in terms}
+        self._terms: Dict[str, str] = {}
+        self._categories: Dict[str, Optional[str]] = {}
+        for term, category in terms.items():
+            # Known skills match under any alias and are reported by their canonical term.
+            term = canonical_skill(term, fuzzy=False) or term
+            for key in [normalize_term(term), *(normalize_term(alias) for alias in aliases_of(term))]:
+                if key and key not in self._terms:
+                    self._terms[key] = term
+            self._categories.setdefault(term, category)
+        pattern = _trie_pattern(self._terms)
+        # Terms must not start or end inside a longer word ("go" in "good", "java" in "javascript").
+        self._regex = re.compile(r"(?<!\w)" + pattern + r"(?![\w+#])", re.IGNORECASE) if pattern else None
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def find(self, text: str) -> List[SkillMatch]:
+        """Return every match with its offsets in ``text``."""
+        if self._regex is None or not text:
+            return []
+        matches = []
+        for m in self._regex.finditer(text):
+            term = self._terms.get(normalize_term(m.group(0)))
+            if term is not None:
+                matches.append(SkillMatch(term, self._categories[term], m.start(), m.end()))
+        return matches
+
+    def extract(self, text: str, category: Optional[str] = None) -> List[str]:
+        """Distinct matched terms in order of first appearance, optionally filtered by category."""
+        return _unique(self.find(text), category)
+
+    def group(self, text: str) -> Dict[str, List[str]]:
+        """Distinct matched terms bucketed by category, from a single scan."""
+        grouped: Dict[str, List[str]] = {TECH: [], SOFT: [], ACTION: []}
+        seen = set()
+        for match in self.find(text):
+            if match.term not in seen:
+                seen.add(match.term)
+                grouped.setdefault(match.category, []).append(match.term)
+        return grouped
+
+
+def _unique(matches: List[SkillMatch], category: Optional[str]) -> List[str]:
+    seen = set()
+    terms = []
+    for match in matches:
+        if (category is None or match.category == category) and match.term not in seen:
+            seen.add(match.term)
+            terms.append(match.term)
+    return terms
+
+
+# Compiled once when the app starts; shared by every analyzer.
+DEFAULT_MATCHER = SkillMatcher(SKILL_DICTIONARY)
+
+
+def find_skills(text: str) -> List[SkillMatch]:
+    return DEFAULT_MATCHER.find(text)
+
+
+def extract_skills(text: str, category: Optional[str] = TECH) -> List[str]:
+    return DEFAULT_MATCHER.extract(text, category)
+
+
+def group_skills(text: str) -> Dict[str, List[str]]:
+    return DEFAULT_MATCHER.group(text)
+
+
+@lru_cache(maxsize=256)
+def matcher_for(terms: tuple) -> SkillMatcher:
+    """Compiled matcher for an ad-hoc term list (e.g. a user's own skills), cached by content."""
+    return SkillMatcher(terms)
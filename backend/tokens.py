@@ -0,0 +1,208 @@
+"""Access and refresh tokens: HS256 JWTs signed and verified in-process.
+
+HMAC keys are built once at startup: the current ``JWT_SECRET`` plus any
+``JWT_PREVIOUS_SECRETS`` still accepted, told apart by the ``kid`` header.
+Verified tokens are remembered in a small LRU until they expire. Access tokens
+carry signed ``act`` (active) and ``role`` claims, so read-only endpoints can
+authorize from the token alone; they are short-lived (``ACCESS_TOKEN_MINUTES``).
+
+Refresh tokens last ``REFRESH_TOKEN_DAYS`` and are rotated on use. Logout
+revokes tokens by ``jti``: revocations are checked in memory, persisted in
+``RevokedToken`` and re-read every ``REVOCATION_SYNC_SECONDS`` by every worker.
+Tokens without ``kid``, ``typ`` or ``jti`` verify against the current secret
+as access tokens.
+"""
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from cache import TTLCache
+from logs import event, get_logger
+from models import RevokedToken
+
+ACCESS_TOKEN_MINUTES = int(os.getenv("ACCESS_TOKEN_MINUTES", "15"))
+REFRESH_TOKEN_DAYS = int(os.getenv("REFRESH_TOKEN_DAYS", "14"))
+TOKEN_EMBED_CLAIMS = os.getenv("TOKEN_EMBED_CLAIMS", "true").lower() in ("1", "true", "yes")
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+REVOCATION_SYNC_SECONDS = int(os.getenv("REVOCATION_SYNC_SECONDS", "30"))
+
+ACCESS, REFRESH = "access", "refresh"
+
+logger = get_logger("tokens")
+
+
+class InvalidToken(Exception):
+    pass
+
+
+class SigningKey(NamedTuple):
+    kid: str
+    header: bytes  # encoded JWT header naming this key
+    mac: "hmac.HMAC"  # keyed once; copied for each signature
+
+
+_current: Optional[SigningKey] = None
+_keys: Dict[str, SigningKey] = {}
+_verified = TTLCache(TOKEN_CACHE_SIZE, ACCESS_TOKEN_MINUTES * 60)  # token -> claims
+_revoked: Dict[str, float] = {}  # jti -> exp
+_sync_task: Optional[asyncio.Task] = None
+
+
+def _b64encode(data: bytes) -> bytes:
+    return base64.urlsafe_b64encode(data).rstrip(b"=")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def _json(data: dict) -> bytes:
+    return json.dumps(data, separators=(",", ":")).encode("utf-8")
+
+
+def _signing_key(secret: str) -> SigningKey:
+    kid = hashlib.sha256(secret.encode("utf-8")).hexdigest()[:8]
+    header = _b64encode(_json({"alg": "HS256", "typ": "JWT", "kid": kid}))
+    return SigningKey(kid, header, hmac.new(secret.encode("utf-8"), digestmod=hashlib.sha256))
+
+
+def _sign(key: SigningKey, signing_input: bytes) -> bytes:
+    mac = key.mac.copy()
+    mac.update(signing_input)
+    return mac.digest()
+
+
+def init_signing_keys(secret: Optional[str], previous: Iterable[str] = ()):
+    """Build the HMAC keys: tokens are signed with ``secret`` and verified with it or any of ``previous``."""
+    global _current
+    if not secret:
+        raise RuntimeError("JWT_SECRET is not set")
+    _current = _signing_key(secret)
+    _keys.clear()
+    for key in [_current] + [_signing_key(s) for s in previous if s]:
+        _keys.setdefault(key.kid, key)
+    _verified.clear()
+
+
+def encode_token(claims: dict) -> str:
+    if _current is None:
+        raise RuntimeError("Signing keys are not initialized")
+    signing_input = _current.header + b"." + _b64encode(_json(claims))
+    return (signing_input + b"." + _b64encode(_sign(_current, signing_input))).decode("ascii")
+
+
+def _verify(token: str) -> dict:
+    try:
+        header_b64, payload_b64, signature_b64 = token.split(".")
+        header = json.loads(_b64decode(header_b64))
+        key = _keys.get(header["kid"]) if "kid" in header else _current
+        if key is None or header.get("alg") != "HS256":
+            raise InvalidToken("Unknown signing key")
+        expected = _sign(key, f"{header_b64}.{payload_b64}".encode("ascii"))
+        if not hmac.compare_digest(expected, _b64decode(signature_b64)):
+            raise InvalidToken("Bad signature")
+        claims = json.loads(_b64decode(payload_b64))
+    except (ValueError, TypeError, KeyError, AttributeError) as e:
+        raise InvalidToken(f"Malformed token: {e}")
+    if not isinstance(claims, dict) or not isinstance(claims.get("sub"), str) or not isinstance(claims.get("exp"), (int, float)):
+        raise InvalidToken("Missing claims")
+    return claims
+
+
+def decode_token(token: str, token_type: str = ACCESS) -> dict:
+    """Claims of a valid, unexpired, unrevoked token of the given type; raises ``InvalidToken``."""
+    now = time.time()
+    claims = _verified.get(token)
+    if claims is None:
+        claims = _verify(token)
+        if claims["exp"] > now:
+            _verified.set(token, claims, min(claims["exp"] - now, _verified.ttl))
+    if claims["exp"] <= now:
+        raise InvalidToken("Token expired")
+    if claims.get("typ", ACCESS) != token_type:
+        raise InvalidToken(f"Expected a {token_type} token")
+    if claims.get("jti") in _revoked:
+        raise InvalidToken("Token revoked")
+    return claims
+
+
+def create_token_pair(user) -> dict:
+    """Access and refresh token for a ``User`` document, in the ``Token`` response shape."""
+    now = int(time.time())
+    access = {
+        "sub": user.email, "uid": str(user.id), "typ": ACCESS, "jti": uuid.uuid4().hex,
+        "iat": now, "exp": now + ACCESS_TOKEN_MINUTES * 60,
+    }
+    if TOKEN_EMBED_CLAIMS:
+        access.update({"act": user.is_active, "role": user.role})
+    refresh = {
+        "sub": user.email, "typ": REFRESH, "jti": uuid.uuid4().hex,
+        "iat": now, "exp": now + REFRESH_TOKEN_DAYS * 86400,
+    }
+    return {
+        "access_token": encode_token(access),
+        "refresh_token": encode_token(refresh),
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_MINUTES * 60,
+    }
+
+
+# --- Revocation ---
+
+async def revoke(claims: dict):
+    """Reject this token from now on, here at once and on other workers after their next sync."""
+    jti = claims.get("jti")
+    if not jti or claims["exp"] <= time.time():
+        return  # legacy tokens have no jti; expired ones are rejected anyway
+    _revoked[jti] = claims["exp"]
+    try:
+        await RevokedToken.find_one(RevokedToken.jti == jti).upsert(
+            {"$set": {"expires_at": datetime.utcfromtimestamp(claims["exp"])}},
+            on_insert=RevokedToken(jti=jti, expires_at=datetime.utcfromtimestamp(claims["exp"])),
+        )
+    except Exception as e:
+        event(logger, logging.ERROR, "token_revocation_write_failed", error=str(e))
+
+
+async def sync_revocations():
+    now = time.time()
+    rows: List[dict] = await RevokedToken.get_motor_collection().find(
+        {"expires_at": {"$gt": datetime.utcfromtimestamp(now)}}, {"jti": 1, "expires_at": 1}
+    ).to_list(None)
+    for jti in [jti for jti, exp in _revoked.items() if exp <= now]:
+        del _revoked[jti]
+    for row in rows:
+        expires_at = row["expires_at"]
+        _revoked[row["jti"]] = (expires_at - datetime(1970, 1, 1)).total_seconds()
+
+
+async def _sync_loop():
+    while True:
+        await asyncio.sleep(REVOCATION_SYNC_SECONDS)
+        try:
+            await sync_revocations()
+        except Exception as e:
+            event(logger, logging.WARNING, "token_revocation_sync_failed", error=str(e))
+
+
+async def start_revocation_sync():
+    global _sync_task
+    await sync_revocations()
+    if _sync_task is None:
+        _sync_task = asyncio.create_task(_sync_loop())
+
+
+async def stop_revocation_sync():
+    global _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        await asyncio.gather(_sync_task, return_exceptions=True)
+        _sync_task = None
@@ -0,0 +1,88 @@
+"""Short-TTL cache of the auth projection of ``User`` for ``get_current_user``.
+
+Every protected endpoint resolves the caller from the JWT. Instead of loading
+the full ``User`` document (profile picture included) each time, the small
+``AuthUser`` projection is cached in-process for ``USER_CACHE_TTL`` seconds,
+optionally backed by a Redis-compatible server shared by all workers
+(``USER_CACHE_REDIS_URL``). Profile writes call ``invalidate``.
+"""
+import logging
+import os
+from typing import Optional
+
+from cache import TTLCache
+from logs import event, get_logger
+from models import AuthUser, User
+
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_REDIS_URL = os.getenv("USER_CACHE_REDIS_URL")
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+logger = get_logger("user_cache")
+
+_local = TTLCache(USER_CACHE_SIZE, USER_CACHE_TTL)
+_redis = None
+stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+
+def _redis_key(email: str) -> str:
+    return f"smartcv:auth-user:{email}"
+
+
+async def init_user_cache():
+    global _redis
+    if USER_CACHE_REDIS_URL and aioredis is not None and USER_CACHE_TTL > 0:
+        _redis = aioredis.from_url(USER_CACHE_REDIS_URL)
+
+
+async def close_user_cache():
+    global _redis
+    if _redis is not None:
+        await _redis.close()
+        _redis = None
+
+
+async def get_auth_user(email: str) -> Optional[AuthUser]:
+    if USER_CACHE_TTL <= 0:
+        return await User.find_one(User.email == email).project(AuthUser)
+
+    user = _local.get(email)
+    if user is not None:
+        stats["local_hits"] += 1
+        return user
+
+    if _redis is not None:
+        try:
+            raw = await _redis.get(_redis_key(email))
+            if raw:
+                user = AuthUser.model_validate_json(raw)
+                stats["shared_hits"] += 1
+                _local.set(email, user)
+                return user
+        except Exception as e:
+            event(logger, logging.WARNING, "user_cache_read_failed", error=str(e))
+
+    stats["misses"] += 1
+    user = await User.find_one(User.email == email).project(AuthUser)
+    if user is not None:
+        _local.set(email, user)
+        if _redis is not None:
+            try:
+                await _redis.set(_redis_key(email), user.model_dump_json(by_alias=True), ex=max(1, int(USER_CACHE_TTL)))
+            except Exception as e:
+                event(logger, logging.WARNING, "user_cache_write_failed", error=str(e))
+    return user
+
+
+async def invalidate(email: str):
+    _local.pop(email)
+    if _redis is not None:
+        try:
+            await _redis.delete(_redis_key(email))
+        except Exception as e:
+            event(logger, logging.WARNING, "user_cache_invalidate_failed", error=str(e))